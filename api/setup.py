@@ -2,6 +2,7 @@
 # https://hynek.me/articles/sharing-your-labor-of-love-pypi-quick-and-dirty/
 import sys
 import codecs
+import importlib.util
 import os
 import os.path
 from setuptools import setup, find_packages
@@ -79,6 +80,30 @@ class BuildWithSharedData(build_py.build_py):
                       destination, to_include))
         return files
 
+    def run(self):
+        super().run()
+        if not self.dry_run:
+            self._build_labware_bundle()
+
+    def _build_labware_bundle(self):
+        """ Pack the labware definitions into a single file that loads
+        faster than the loose ones. The module that does this only needs the
+        standard library, so load it without importing opentrons.
+        """
+        spec = importlib.util.spec_from_file_location(
+            'labware_bundle',
+            os.path.join(HERE, 'src', 'opentrons', 'protocol_api',
+                         'labware_bundle.py'))
+        labware_bundle = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(labware_bundle)
+        definitions = os.path.join(
+            self.build_lib, 'opentrons', DEST_BASE_PATH,
+            'labware', 'definitions')
+        count = labware_bundle.build_bundle(
+            os.path.join(definitions, '2'),
+            os.path.join(definitions, '2.bundle'))
+        self.announce(f'bundled {count} labware definitions', level=2)
+
 
 def get_version():
     with open(os.path.join(HERE, 'src', 'opentrons', 'package.json')) as pkg:
@@ -7,7 +7,8 @@ from .calibration import CalibrationManager
 
 class MainRouter:
     def __init__(self, hardware=None, loop=None, lock=None):
-        topics = [Session.TOPIC, CalibrationManager.TOPIC]
+        topics = [Session.TOPIC, Session.SIMULATION_TOPIC,
+                  CalibrationManager.TOPIC]
         self._broker = Broker()
         self._notifications = Notifications(topics, self._broker, loop=loop)
 
@@ -2,7 +2,8 @@ import asyncio
 from copy import copy
 from functools import reduce, wraps
 import logging
-from time import time
+import threading
+from time import monotonic, time
 from uuid import uuid4
 
 from opentrons.broker import Broker
@@ -17,16 +18,27 @@ from opentrons.protocols.types import JsonProtocol, PythonProtocol
 from opentrons.protocols.parse import parse
 from opentrons.protocol_api import (ProtocolContext,
                                     labware)
-from opentrons.protocol_api.execute import run_protocol
-from opentrons.hardware_control import adapters, API
+from opentrons.protocol_api.execute import (ExceptionInProtocolError,
+                                            run_protocol)
+from opentrons.hardware_control import adapters
+from opentrons.hardware_control.fast_simulator import (FastSimulator,
+                                                       InlineAdapter)
 from opentrons.types import Location, Point
 
+from . import simulation_cache
 from .models import Container, Instrument, Module
 
 log = logging.getLogger(__name__)
 
 VALID_STATES = {'loaded', 'running', 'finished', 'stopped', 'paused', 'error'}
 
+#: The least time in seconds between simulation progress notifications
+PROGRESS_INTERVAL = 0.5
+
+
+class SimulationCancelled(Exception):
+    pass
+
 
 def _motion_lock(func):
     """ Decorator to make a function require a lock. Only works for instance
@@ -53,6 +65,7 @@ class SessionManager(object):
             'opentrons.server.command_logger')
         self._broker.set_logger(self._command_logger)
         self._motion_lock = lock
+        self._simulation_cancelled = threading.Event()
 
     def __del__(self):
         if isinstance(getattr(self, '_hardware', None),
@@ -75,12 +88,22 @@ class SessionManager(object):
                 hardware=self._hardware,
                 loop=self._loop,
                 broker=self._broker,
-                motion_lock=self._motion_lock)
+                motion_lock=self._motion_lock,
+                simulation_cancelled=self._simulation_cancelled)
         finally:
             self._session_lock = False
 
         return self.session
 
+    def cancel_simulation(self):
+        """ Stop the simulation started by :py:meth:`create` or by refreshing
+        the session, which then raises :py:class:`SimulationCancelled`.
+
+        RPC calls run concurrently, so this can be called while the call
+        that is simulating is in progress.
+        """
+        self._simulation_cancelled.set()
+
     def clear(self):
         if self._session_lock:
             raise Exception(
@@ -97,14 +120,21 @@ class SessionManager(object):
 
 class Session(object):
     TOPIC = 'session'
+    #: Topic for the progress of simulating the protocol. Payloads are dicts
+    #: with the protocol name, the number of commands simulated so far and
+    #: a state of 'simulating', 'simulated', 'cancelled' or 'error'.
+    SIMULATION_TOPIC = 'simulation'
 
     @classmethod
-    def build_and_prep(cls, name, text, hardware, loop, broker, motion_lock):
-        sess = cls(name, text, hardware, loop, broker, motion_lock)
+    def build_and_prep(cls, name, text, hardware, loop, broker, motion_lock,
+                       simulation_cancelled=None):
+        sess = cls(name, text, hardware, loop, broker, motion_lock,
+                   simulation_cancelled)
         sess.prepare()
         return sess
 
-    def __init__(self, name, text, hardware, loop, broker, motion_lock):
+    def __init__(self, name, text, hardware, loop, broker, motion_lock,
+                 simulation_cancelled=None):
         self._broker = broker
         self._default_logger = self._broker.logger
         self._sim_logger = self._broker.logger.getChild('sim')
@@ -134,6 +164,8 @@ class Session(object):
 
         self.startTime = None
         self._motion_lock = motion_lock
+        self._simulation_cancelled = simulation_cancelled or threading.Event()
+        self._simulation_cache = simulation_cache.SimulationCache()
 
     def prepare(self):
         self._hardware.discover_modules()
@@ -177,7 +209,7 @@ class Session(object):
         self.command_log.clear()
         self.errors.clear()
 
-    @_motion_lock
+    @_motion_lock  # noqa(C901)
     def _simulate(self):
         self._reset()
 
@@ -189,14 +221,21 @@ class Session(object):
         self._instruments.clear()
         self._modules.clear()
         self._interactions.clear()
+        self._simulation_cancelled.clear()
+        last_progress = monotonic()
 
         def on_command(message):
+            nonlocal last_progress
             payload = message['payload']
             description = payload.get('text', '').format(
                 **payload
             )
 
             if message['$'] == 'before':
+                # Raised through the protocol, which stops it
+                if self._simulation_cancelled.is_set():
+                    raise SimulationCancelled(
+                        'Simulation of {} cancelled'.format(self.name))
                 level = len(stack)
 
                 stack.append(message)
@@ -207,30 +246,45 @@ class Session(object):
                         'level': level,
                         'description': description,
                         'id': len(res)})
+                if monotonic() - last_progress >= PROGRESS_INTERVAL:
+                    last_progress = monotonic()
+                    self._publish_progress('simulating', len(res))
             else:
                 stack.pop()
 
+        cache_key = None
+        if ff.use_protocol_api_v2():
+            # ensure actual pipettes are cached before driver is disconnected
+            self._hardware.cache_instruments()
+            instrs = {}
+            for mount, pip in self._hardware.attached_instruments.items():
+                if pip:
+                    instrs[mount] = {'model': pip['model'],
+                                     'id': pip.get('pipette_id', '')}
+            mod_names = [mod.name()
+                         for mod in self._hardware.attached_modules.values()]
+            cache_key = simulation_cache.cache_key(
+                self.name, self.protocol_text, instrs, mod_names)
+            cached = self._simulation_cache.get(cache_key)
+            if cached and self._restore_simulation(cached, instrs, mod_names):
+                self._publish_progress(
+                    'error' if cached['error'] else 'simulated',
+                    len(cached['commands']))
+                simulation_cache.raise_error(cached)
+                return cached['commands']
+
+        self._publish_progress('simulating', 0)
         unsubscribe = self._broker.subscribe(command_types.COMMAND, on_command)
+        error = None
+        cancelled = False
+        finished = False
 
         try:
-            # ensure actual pipettes are cached before driver is disconnected
             if ff.use_protocol_api_v2():
-                self._hardware.cache_instruments()
-                instrs = {}
-                for mount, pip in self._hardware.attached_instruments.items():
-                    if pip:
-                        instrs[mount] = {'model': pip['model'],
-                                         'id': pip.get('pipette_id', '')}
-                sim = adapters.SynchronousAdapter.build(
-                    API.build_hardware_simulator,
-                    instrs,
-                    [mod.name()
-                     for mod in self._hardware.attached_modules.values()],
-                    strict_attached_instruments=False)
-                sim.home()
-                self._simulating_ctx = ProtocolContext(self._loop,
-                                                       sim,
-                                                       self._broker)
+                self._simulating_ctx = ProtocolContext(
+                    self._loop,
+                    self._build_simulator(instrs, mod_names),
+                    self._broker)
                 run_protocol(self._protocol,
                              simulate=True,
                              context=self._simulating_ctx)
@@ -242,6 +296,16 @@ class Session(object):
                     execute_protocol(self._protocol)
                 else:
                     exec(self._protocol.contents, {})
+            finished = True
+        except SimulationCancelled:
+            cancelled = True
+            raise
+        except ExceptionInProtocolError as e:
+            if isinstance(e.original_exc, SimulationCancelled):
+                cancelled = True
+                raise e.original_exc from None
+            error = e
+            raise
         finally:
             # physically attached pipettes are re-cached during robot.connect()
             # which is important, because during a simulation, the robot could
@@ -265,8 +329,64 @@ class Session(object):
             if not ff.use_protocol_api_v2():
                 self._hardware.clear_tips()
 
+            if cache_key and (finished or error):
+                self._cache_simulation(cache_key, res, error)
+
+            if finished:
+                self._publish_progress('simulated', len(res))
+            else:
+                self._publish_progress(
+                    'cancelled' if cancelled else 'error', len(res))
+
         return res
 
+    def _publish_progress(self, state, commands):
+        self._broker.publish(Session.SIMULATION_TOPIC, {
+            'topic': Session.SIMULATION_TOPIC,
+            'payload': {
+                'name': self.name,
+                'state': state,
+                'commands': commands}})
+
+    def _build_simulator(self, instrs, mod_names):
+        # Simulating only checks the protocol, so the robot state is modeled
+        # in process rather than by a full simulator
+        sim = InlineAdapter(FastSimulator(
+            instrs, mod_names, strict_attached_instruments=False))
+        sim.home()
+        return sim
+
+    def _cache_simulation(self, cache_key, commands, error):
+        try:
+            entry = simulation_cache.record(
+                self._simulating_ctx, commands, self._containers,
+                self._instruments, self._modules, self._interactions, error)
+        except Exception:
+            log.exception('Could not record simulation')
+        else:
+            self._simulation_cache.put(cache_key, entry)
+
+    def _restore_simulation(self, cached, instrs, mod_names):
+        """ Set up the simulating context and the labware, instruments and
+        modules from a cached simulation instead of simulating.
+
+        :returns: Whether the cached simulation could be restored
+        """
+        ctx = ProtocolContext(
+            self._loop, self._build_simulator(instrs, mod_names), self._broker)
+        try:
+            containers, instruments, modules, interactions\
+                = simulation_cache.restore(cached, ctx)
+        except Exception:
+            log.exception('Could not restore cached simulation')
+            return False
+        self._simulating_ctx = ctx
+        self._containers.extend(containers)
+        self._instruments.extend(instruments)
+        self._modules.extend(modules)
+        self._interactions.extend(interactions)
+        return True
+
     def refresh(self):
         self._reset()
         self._protocol = parse(self.protocol_text, self.name)
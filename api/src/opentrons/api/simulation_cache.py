@@ -0,0 +1,283 @@
+""" A persistent cache of protocol simulation results.
+
+Uploading a protocol simulates it to build the command tree shown in the app
+and to find the labware and instruments to calibrate. Simulating the same
+protocol against the same robot gives the same result, so each result is
+stored in a file named by a hash of everything the simulation depends on:
+
+- the protocol name and text
+- the attached instruments and modules
+- the API version and the feature flags
+- the custom labware definitions, pipette config overrides and robot
+  settings on disk (by path, modification time and size)
+
+Calibration needs live labware and instruments rather than a description of
+them, so an entry also holds a recipe for loading the protocol's modules,
+labware and instruments into a fresh context; loading them takes a fraction
+of the time of running the protocol.
+
+Only Protocol API V2 simulations are cached.
+"""
+import hashlib
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from opentrons import __version__
+from opentrons.config import CONFIG, advanced_settings as advs
+from opentrons.config import feature_flags as ff
+from opentrons.protocol_api import labware
+from opentrons.protocol_api.contexts import ProtocolContext
+from opentrons.protocol_api.execute import ExceptionInProtocolError
+from opentrons.types import Mount
+
+MODULE_LOG = logging.getLogger(__name__)
+
+#: Change this whenever the contents of an entry change
+ENTRY_VERSION = 1
+
+#: The most entries to keep; the least recently used are removed beyond this
+MAX_ENTRIES = 50
+
+# The files and directories (by config element name) simulation reads
+_INPUT_PATHS = ('labware_user_definitions_dir_v2',
+                'pipette_config_overrides_dir',
+                'robot_settings_file')
+
+Entry = Dict[str, Any]
+
+
+class CachedSimulationError(ExceptionInProtocolError):
+    """ An error raised by a protocol the last time it was simulated """
+    def __init__(self, message: str, traceback_text: str) -> None:
+        super().__init__(None, None, message, None)
+        self._traceback_text = traceback_text
+
+    def __str__(self):
+        return self.message
+
+    def format_traceback(self) -> str:
+        return self._traceback_text
+
+
+def _fingerprint(path: Path) -> List[Tuple[str, int, int]]:
+    """ The path, modification time and size of `path` or the files in it """
+    if path.is_dir():
+        files = sorted(p for p in path.rglob('*') if p.is_file())
+    elif path.is_file():
+        files = [path]
+    else:
+        files = []
+    result = []
+    for fi in files:
+        stat = fi.stat()
+        result.append((str(fi), stat.st_mtime_ns, stat.st_size))
+    return result
+
+
+def cache_key(name: str,
+              text: str,
+              instruments: Dict[Mount, Dict[str, str]],
+              modules: List[str]) -> str:
+    """ Hash the inputs to simulating a protocol.
+
+    :param name: The name of the protocol
+    :param text: The text of the protocol
+    :param instruments: The attached instruments, as mounts mapped to dicts
+                        with 'model' and 'id' keys
+    :param modules: The names of the attached modules
+    """
+    inputs = {
+        'entry_version': ENTRY_VERSION,
+        'api_version': __version__,
+        'python_version': list(sys.version_info[:2]),
+        'name': name,
+        'instruments': {mount.name: instr
+                        for mount, instr in instruments.items()},
+        'modules': modules,
+        'settings': {setting.id: ff.get_setting_with_env_overload(setting.id)
+                     for setting in advs.settings},
+        'paths': {elem: _fingerprint(Path(CONFIG[elem]))
+                  for elem in _INPUT_PATHS},
+    }
+    hasher = hashlib.sha256(
+        json.dumps(inputs, sort_keys=True).encode('utf-8'))
+    hasher.update(text.encode('utf-8') if isinstance(text, str) else text)
+    return hasher.hexdigest()
+
+
+def _label(lw: labware.Labware) -> str:
+    """ The label a labware was loaded with """
+    suffix = ' on {}'.format(lw.parent)
+    return lw._display_name[:-len(suffix)]
+
+
+def record(ctx: ProtocolContext,
+           commands: List[Dict[str, Any]],
+           containers: List[labware.Labware],
+           instruments: List[Any],
+           modules: List[labware.ModuleGeometry],
+           interactions: List[Tuple[Any, labware.Labware]],
+           error: Optional[ExceptionInProtocolError] = None) -> Entry:
+    """ Describe the result of simulating a protocol in `ctx`.
+
+    :param commands: The command list for the command tree
+    :param containers: The labware used by the protocol
+    :param instruments: The instruments used by the protocol
+    :param modules: The module geometries used by the protocol
+    :param interactions: Which instruments used which labware
+    :param error: The error the protocol raised, if any
+    """
+    all_modules = [mod.geometry for mod in ctx._modules]
+    all_modules.extend(mod for mod in modules if mod not in all_modules)
+
+    all_instruments: List[Any] = list(ctx.loaded_instruments.values())
+    all_labware = [lw for lw in ctx.loaded_labwares.values()
+                   if isinstance(lw, labware.Labware)]
+    for instr in all_instruments:
+        all_labware.extend(
+            lw for lw in instr.tip_racks if lw not in all_labware)
+    all_labware.extend(lw for lw in containers if lw not in all_labware)
+
+    all_instruments.extend(
+        instr for instr in instruments if instr not in all_instruments)
+
+    def _parent(lw):
+        if isinstance(lw.parent, labware.ModuleGeometry):
+            return {'module': all_modules.index(lw.parent)}
+        return {'slot': lw.parent}
+
+    return {
+        'entry_version': ENTRY_VERSION,
+        'commands': commands,
+        'error': {'message': str(error),
+                  'traceback': error.format_traceback()} if error else None,
+        'modules': [{'name': mod.load_name, 'slot': mod.parent}
+                    for mod in all_modules],
+        'labware': [{'definition': lw._definition,
+                     'parent': _parent(lw),
+                     'label': _label(lw),
+                     'is_fixed_trash': lw is ctx.fixed_trash}
+                    for lw in all_labware],
+        'instruments': [{'model': instr.model,
+                         'mount': instr.mount,
+                         'tip_racks': [all_labware.index(lw)
+                                       for lw in instr.tip_racks]}
+                        for instr in all_instruments],
+        'containers': [all_labware.index(lw) for lw in containers],
+        'used_instruments': [all_instruments.index(instr)
+                             for instr in instruments],
+        'used_modules': [all_modules.index(mod) for mod in modules],
+        'interactions': [[all_instruments.index(instr),
+                          all_labware.index(lw)]
+                         for instr, lw in interactions],
+    }
+
+
+def restore(entry: Entry, ctx: ProtocolContext)\
+        -> Tuple[List[labware.Labware], List[Any],
+                 List[labware.ModuleGeometry], List[Tuple[Any, Any]]]:
+    """ Load the modules, labware and instruments recorded in `entry` into
+    `ctx`, which should be fresh.
+
+    :returns: The containers, instruments, modules and interactions the
+              protocol used, as :py:func:`record` was given them
+    """
+    module_ctxs = [ctx.load_module(mod['name'], mod['slot'])
+                   for mod in entry['modules']]
+
+    all_labware = []
+    for lw_entry in entry['labware']:
+        if lw_entry['is_fixed_trash']:
+            all_labware.append(ctx.fixed_trash)
+            continue
+        parent = lw_entry['parent']
+        if 'module' in parent:
+            module_ctx = module_ctxs[parent['module']]
+            lw = module_ctx.load_labware_object(labware.load_from_definition(
+                lw_entry['definition'],
+                module_ctx.geometry.location,
+                lw_entry['label']))
+        else:
+            lw = ctx.load_labware_from_definition(
+                lw_entry['definition'], parent['slot'], lw_entry['label'])
+        all_labware.append(lw)
+
+    all_instruments = [
+        ctx.load_instrument(
+            instr['model'], instr['mount'],
+            tip_racks=[all_labware[idx] for idx in instr['tip_racks']],
+            replace=True)
+        for instr in entry['instruments']]
+
+    return ([all_labware[idx] for idx in entry['containers']],
+            [all_instruments[idx] for idx in entry['used_instruments']],
+            [module_ctxs[idx].geometry for idx in entry['used_modules']],
+            [(all_instruments[instr], all_labware[lw])
+             for instr, lw in entry['interactions']])
+
+
+def raise_error(entry: Entry):
+    """ Raise the error recorded in `entry`, if there is one """
+    if entry['error']:
+        raise CachedSimulationError(entry['error']['message'],
+                                    entry['error']['traceback'])
+
+
+class SimulationCache:
+    """ Simulation results stored as files in a directory.
+
+    Problems reading or writing entries are logged and treated as misses,
+    since the cache is only ever an optimization.
+    """
+    def __init__(self,
+                 directory: Path = None,
+                 max_entries: int = MAX_ENTRIES) -> None:
+        self._directory = Path(directory or CONFIG['simulation_cache_dir'])
+        self._max_entries = max_entries
+
+    def _path(self, key: str) -> Path:
+        return self._directory / f'{key}.json'
+
+    def get(self, key: str) -> Optional[Entry]:
+        path = self._path(key)
+        try:
+            with path.open() as f:
+                entry = json.load(f)
+            # Mark the entry as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            MODULE_LOG.exception(f'Could not read simulation cache {path}')
+            return None
+        if entry.get('entry_version') != ENTRY_VERSION:
+            return None
+        return entry
+
+    def put(self, key: str, entry: Entry):
+        path = self._path(key)
+        tmp_path = path.with_suffix('.tmp')
+        try:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            with tmp_path.open('w') as f:
+                json.dump(entry, f, separators=(',', ':'))
+            os.replace(tmp_path, path)
+            self._prune()
+        except (OSError, TypeError, ValueError):
+            MODULE_LOG.exception(f'Could not write simulation cache {path}')
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    def _prune(self):
+        entries = sorted(self._directory.glob('*.json'),
+                         key=lambda p: p.stat().st_mtime)
+        for path in entries[:-self._max_entries]:
+            path.unlink()
+
+    def clear(self):
+        for path in self._directory.glob('*.json'):
+            path.unlink()
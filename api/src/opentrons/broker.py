@@ -26,7 +26,20 @@ class Notifications(object):
     def on_notify(self, message):
         if self.snoozed:
             return
-        self.queue.put_nowait(message)
+        # Messages are also published from the threads RPC calls run in, and
+        # the queue may only be touched from the thread running the loop
+        if self.loop.is_running() and not self._in_loop_thread():
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, message)
+        else:
+            self.queue.put_nowait(message)
+
+    def _in_loop_thread(self):
+        # While a loop runs, get_event_loop() in its thread returns it;
+        # other threads get their own loop or, usually, an error
+        try:
+            return asyncio.get_event_loop() is self.loop
+        except RuntimeError:
+            return False
 
     async def __anext__(self):
         return await self.queue.get()
@@ -51,6 +64,11 @@ class Broker:
 
         return unsubscribe
 
+    def has_subscribers(self, topic):
+        """ Whether anything would receive a message published to topic;
+        if not, publishers can skip building the message """
+        return bool(self.subscriptions.get(topic))
+
     def publish(self, topic, message):
         [handler(message) for handler in self.subscriptions.get(topic, [])]
 
@@ -4,7 +4,9 @@ from opentrons.broker import Broker
 
 import functools
 import inspect
-from typing import Union, Sequence, List, Any
+import logging
+from typing import (Any, Dict, FrozenSet, List, NamedTuple, Sequence, Tuple,
+                    Union)
 
 from opentrons.legacy_api.containers import (Well as OldWell,
                                              Container as OldContainer,
@@ -521,26 +523,26 @@ def resume():
 
 def do_publish(broker, cmd, f, when, res, meta, *args, **kwargs):
     """ Implement the publish so it can be called outside the decorator """
-    publish_command = functools.partial(
-        broker.publish,
-        topic=command_types.COMMAND)
+    log_call = when == 'before' and broker.logger.isEnabledFor(logging.INFO)
+    publish = broker.has_subscribers(command_types.COMMAND)
+    if not log_call and not publish:
+        return
     call_args = _get_args(f, args, kwargs)
-    if when == 'before':
+    if log_call:
         broker.logger.info("{}: {}".format(
             f.__qualname__,
             {k: v for k, v in call_args.items() if str(k) != 'self'}))
-    command_args = dict(
-        zip(
-            reversed(inspect.getfullargspec(cmd).args),
-            reversed(inspect.getfullargspec(cmd).defaults
-                     or [])))
+    if not publish:
+        return
+    cmd_spec = _arg_spec(cmd)
+    command_args = dict(cmd_spec.defaults)
 
     # TODO (artyom, 20170927): we are doing this to be able to use
     # the decorator in Instrument class methods, in which case
     # self is effectively an instrument.
     # To narrow the scope of this hack, we are checking if the
     # command is expecting instrument first.
-    if 'instrument' in inspect.getfullargspec(cmd).args:
+    if 'instrument' in cmd_spec.arg_set:
         # We are also checking if call arguments have 'self' and
         # don't have instruments specified, in which case
         # instruments should take precedence.
@@ -549,9 +551,7 @@ def do_publish(broker, cmd, f, when, res, meta, *args, **kwargs):
 
     command_args.update({
         key: call_args[key]
-        for key in
-        (set(inspect.getfullargspec(cmd).args)
-         & call_args.keys())
+        for key in cmd_spec.arg_set & call_args.keys()
     })
 
     if meta:
@@ -562,12 +562,17 @@ def do_publish(broker, cmd, f, when, res, meta, *args, **kwargs):
     message = {**payload, '$': when}
     if when == 'after':
         message['return'] = res
-    publish_command(
+    broker.publish(
+        topic=command_types.COMMAND,
         message={**payload, '$': when})
 
 
 def _publish_dec(before, after, command, meta=None):
     def decorator(f):
+        # Inspect the signatures now rather than on every call
+        _arg_spec(f)
+        _arg_spec(command)
+
         @functools.wraps(f, updated=functools.WRAPPER_UPDATES+('__globals__',))
         def decorated(*args, **kwargs):
             try:
@@ -606,18 +611,36 @@ class publish:
     both = functools.partial(_publish_dec, before=True, after=True)
 
 
+class _ArgSpec(NamedTuple):
+    args: Tuple[str, ...]
+    arg_set: FrozenSet[str]
+    defaults: Dict[str, Any]
+
+
+@functools.lru_cache(maxsize=256)
+def _func_arg_spec(func) -> _ArgSpec:
+    spec = inspect.getfullargspec(func)
+    return _ArgSpec(
+        args=tuple(spec.args),
+        arg_set=frozenset(spec.args),
+        defaults=dict(zip(reversed(spec.args),
+                          reversed(spec.defaults or ()))))
+
+
+def _arg_spec(f) -> _ArgSpec:
+    """ The positional arguments of f and their defaults. Bound methods
+    share the spec of their function, which includes self.
+    """
+    return _func_arg_spec(getattr(f, '__func__', f))
+
+
 def _get_args(f, args, kwargs):
     # Create the initial dictionary with args that have defaults
-    res = {}
-
-    if inspect.getfullargspec(f).defaults:
-        res = dict(
-            zip(
-                reversed(inspect.getfullargspec(f).args),
-                reversed(inspect.getfullargspec(f).defaults)))
+    spec = _arg_spec(f)
+    res = dict(spec.defaults)
 
     # Update / insert values for positional args
-    res.update(dict(zip(inspect.getfullargspec(f).args, args)))
+    res.update(zip(spec.args, args))
 
     # Update it with values for named args
     res.update(kwargs)
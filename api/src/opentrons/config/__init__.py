@@ -176,7 +176,20 @@ CONFIG_ELEMENTS = (
                   'Pipette Config User Overrides',
                   Path('pipettes'),
                   ConfigElementType.DIR,
-                  'The dir where settings overrides for pipettes are stored')
+                  'The dir where settings overrides for pipettes are stored'),
+    ConfigElement('simulation_cache_dir',
+                  'Simulation Cache Directory',
+                  Path('simulation_cache'),
+                  ConfigElementType.DIR,
+                  'The dir where the results of simulating uploaded protocols'
+                  ' are kept so that unchanged protocols are not simulated'
+                  ' again'),
+    ConfigElement('parse_cache_dir',
+                  'Parse Cache Directory',
+                  Path('parse_cache'),
+                  ConfigElementType.DIR,
+                  'The dir where parsed and compiled protocols are kept so'
+                  ' that unchanged protocols are not parsed again')
 )
 #: The available configuration file elements to modify. All of these can be
 #: changed by editing opentrons.json, where the keys are the name elements,
@@ -1,7 +1,9 @@
+import asyncio
 import serial  # type: ignore
 from serial.tools import list_ports  # type: ignore
 import contextlib
 import logging
+from typing import Optional
 
 log = logging.getLogger(__name__)
 
@@ -53,19 +55,24 @@ def clear_buffer(serial_connection):
     serial_connection.reset_input_buffer()
 
 
-def _write_to_device_and_return(cmd, ack, device_connection, tag=None):
-    '''Writes to a serial device.
-    - Formats command
-    - Wait for ack return
-    - return parsed response'''
-
+def _write_to_device(cmd, device_connection, tag=None):
+    '''Writes to a serial device without waiting for a response'''
     if not tag:
         tag = device_connection.port
 
     encoded_write = cmd.encode()
-    encoded_ack = ack.encode()
     log.debug(f'{tag}: Write -> {encoded_write}')
     device_connection.write(encoded_write)
+
+
+def _read_from_device(ack, device_connection, tag=None):
+    '''Reads from a serial device until the ack is found.
+    - Wait for ack return
+    - return parsed response'''
+    if not tag:
+        tag = device_connection.port
+
+    encoded_ack = ack.encode()
     response = device_connection.read_until(encoded_ack)
     log.debug(f'{tag}: Read <- {response}')
     if encoded_ack not in response:
@@ -78,6 +85,15 @@ def _write_to_device_and_return(cmd, ack, device_connection, tag=None):
     return ''
 
 
+def _write_to_device_and_return(cmd, ack, device_connection, tag=None):
+    '''Writes to a serial device.
+    - Formats command
+    - Wait for ack return
+    - return parsed response'''
+    _write_to_device(cmd, device_connection, tag)
+    return _read_from_device(ack, device_connection, tag)
+
+
 def _connect(port_name, baudrate):
     ser = serial.Serial(
         port=port_name,
@@ -115,6 +131,26 @@ def write_and_return(
     return response
 
 
+def write_only(command, serial_connection, tag=None):
+    '''Write a command without waiting for the response.
+
+    Unlike :py:meth:`write_and_return`, this does not clear the input buffer
+    first, since responses to earlier commands may still be on their way.
+    Read them back in order with :py:meth:`read_response`.
+    '''
+    _write_to_device(command, serial_connection, tag)
+
+
+def read_response(
+        ack, serial_connection,
+        timeout=DEFAULT_WRITE_TIMEOUT, tag=None):
+    '''Read the response to the oldest unanswered command'''
+    with serial_with_temp_timeout(
+            serial_connection, timeout) as device_connection:
+        response = _read_from_device(ack, device_connection, tag)
+    return response
+
+
 def connect(device_name=None, port=None, baudrate=115200):
     '''
     Creates a serial connection
@@ -126,3 +162,123 @@ def connect(device_name=None, port=None, baudrate=115200):
         port = get_ports_by_name(device_name=device_name)[0]
     log.debug("Device name: {}, Port: {}".format(device_name, port))
     return _connect(port_name=port, baudrate=baudrate)
+
+
+class AsyncSerial:
+    """ An asyncio transport for a serial device.
+
+    The port is opened non-blocking and read by the event loop itself (through
+    :py:meth:`asyncio.AbstractEventLoop.add_reader`), so waiting on the device
+    neither blocks the loop nor needs a thread. Commands sent with
+    :py:meth:`write_and_return` are serialized, so several tasks may share one
+    device. Anything the device sends while no command is waiting (for
+    instance an interrupt) stays buffered until read with
+    :py:meth:`read_until` or thrown away by the next command.
+    """
+
+    def __init__(self,
+                 connection: serial.Serial,
+                 loop: asyncio.AbstractEventLoop = None) -> None:
+        self._connection = connection
+        self._loop = loop or asyncio.get_event_loop()
+        self._buffer = bytearray()
+        self._data_received = asyncio.Event(loop=self._loop)
+        self._lock = asyncio.Lock(loop=self._loop)
+        self._loop.add_reader(self._connection.fileno(), self._on_readable)
+
+    @classmethod
+    def connect(cls, port: str, baudrate: int = 115200,
+                loop: asyncio.AbstractEventLoop = None) -> 'AsyncSerial':
+        connection = serial.Serial(port=port, baudrate=baudrate, timeout=0)
+        log.debug(connection)
+        return cls(connection, loop)
+
+    @property
+    def port(self) -> Optional[str]:
+        return self._connection.port
+
+    @property
+    def is_open(self) -> bool:
+        return self._connection.is_open
+
+    @property
+    def in_waiting(self) -> int:
+        """ The number of bytes received but not yet read """
+        return len(self._buffer)
+
+    def _on_readable(self):
+        try:
+            data = self._connection.read(self._connection.in_waiting or 1)
+        except serial.SerialException:
+            log.exception(f'{self.port}: Read failed')
+            return
+        if data:
+            self._buffer.extend(data)
+            self._data_received.set()
+
+    def clear_buffer(self):
+        self._connection.reset_input_buffer()
+        self._buffer.clear()
+        self._data_received.clear()
+
+    async def wait_for_data(self):
+        """ Wait until there is something to read """
+        while not self._buffer:
+            self._data_received.clear()
+            await self._data_received.wait()
+
+    async def read_until(self, ack: str,
+                         timeout: float = DEFAULT_SERIAL_TIMEOUT) -> bytes:
+        """ Read up to and including the next `ack`
+
+        :raises SerialNoResponse: If `ack` does not arrive within `timeout`
+                                  seconds
+        """
+        encoded_ack = ack.encode()
+        deadline = self._loop.time() + timeout
+        while True:
+            index = self._buffer.find(encoded_ack)
+            if index >= 0:
+                end = index + len(encoded_ack)
+                response = bytes(self._buffer[:end])
+                del self._buffer[:end]
+                return response
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                raise SerialNoResponse(
+                    'No response from serial port after {} second(s)'.format(
+                        timeout))
+            self._data_received.clear()
+            try:
+                await asyncio.wait_for(
+                    self._data_received.wait(), remaining, loop=self._loop)
+            except asyncio.TimeoutError:
+                pass
+
+    async def write_and_return(self, command: str, ack: str,
+                               timeout: float = DEFAULT_WRITE_TIMEOUT,
+                               tag: str = None) -> str:
+        '''Write a command and return the response'''
+        if not tag:
+            tag = self.port
+        async with self._lock:
+            self.clear_buffer()
+            encoded_write = command.encode()
+            log.debug(f'{tag}: Write -> {encoded_write!r}')
+            self._connection.write(encoded_write)
+            response = await self.read_until(ack, timeout)
+            log.debug(f'{tag}: Read <- {response!r}')
+        clean_response = _parse_serial_response(response, ack.encode())
+        if clean_response:
+            return clean_response.decode()
+        return ''
+
+    def close(self):
+        if self._connection.is_open:
+            self._loop.remove_reader(self._connection.fileno())
+            self._connection.close()
+
+    def reopen(self):
+        self.close()
+        self._connection.open()
+        self._loop.add_reader(self._connection.fileno(), self._on_readable)
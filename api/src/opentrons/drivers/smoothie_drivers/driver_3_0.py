@@ -1,14 +1,16 @@
 import asyncio
+from collections import deque
 from os import environ
 import logging
 from time import sleep
 from threading import Event, RLock
-from typing import Any, Dict, Optional
+from typing import Any, Deque, Dict, Optional, Tuple
 
 from numpy import isclose  # type: ignore
 from serial.serialutil import SerialException  # type: ignore
 
 from opentrons.drivers import serial_communication
+from opentrons.drivers.smoothie_drivers import kinematics
 from opentrons.drivers.rpi_drivers import gpio
 from opentrons.system import smoothie_update
 '''
@@ -64,11 +66,25 @@ SEC_PER_MIN = 60
 
 DEFAULT_SMOOTHIE_TIMEOUT = 1
 DEFAULT_MOVEMENT_TIMEOUT = 30
+# How long to wait (M400) for motion to finish when we have no idea how long
+# it should take
+DEFAULT_WAIT_TIMEOUT = 12000
+# The wait after a move allows this multiple of its estimated duration, plus
+# a margin for what the estimate leaves out (junctions, current changes)
+MOVEMENT_TIMEOUT_SCALE = 2
+MOVEMENT_TIMEOUT_MARGIN = 5
 SMOOTHIE_BOOT_TIMEOUT = 3
 DEFAULT_STABILIZE_DELAY = 0.1
 
 DEFAULT_COMMAND_RETRIES = 3
 
+# Number of commands that may be written to Smoothie before the first of them
+# is acknowledged when pipelining is enabled (see `set_pipeline_window`).
+# Smoothieware's serial receive buffer holds a few hundred bytes, and our
+# longest commands (current-setting plus a move) are about 80 bytes.
+DEFAULT_PIPELINE_WINDOW = 4
+PIPELINE_DRAIN_TIMEOUT = 1
+
 GCODES = {'HOME': 'G28.2',
           'MOVE': 'G0',
           'DWELL': 'G4',
@@ -331,6 +347,18 @@ class SmoothieDriver_3_0_0:
         self._acceleration = config.acceleration.copy()
         self._saved_acceleration = config.acceleration.copy()
 
+        # The settings Smoothie was last sent, so unchanged values are not
+        # sent again. Emptied whenever the board's state is in doubt
+        self._sent_current: Dict[str, float] = {}
+        self._sent_max_speed: Dict[str, float] = {}
+        self._sent_acceleration: Dict[str, float] = {}
+        self._sent_speed: Optional[float] = None
+
+        # Seconds the motion and dwells sent so far should take on a real
+        # robot, and how long to wait for the pipelined moves to finish
+        self._estimated_motion_time = 0.0
+        self._pipelined_wait_timeout = 0.0
+
         # position after homing
         self._homed_position = HOMED_POSITION.copy()
         self.homed_flags = {}
@@ -356,6 +384,11 @@ class SmoothieDriver_3_0_0:
             self._serial_lock = DummyLock()
         self._is_hard_halting = Event()
 
+        # Pipelined commands that have been written to the serial port but
+        # whose acks have not been read yet, in the order they were sent
+        self._pipeline_window = 0
+        self._in_flight: Deque[Tuple[str, float]] = deque()
+
     @property
     def homed_position(self):
         return self._homed_position.copy()
@@ -519,6 +552,8 @@ class SmoothieDriver_3_0_0:
         self._setup()
 
     def disconnect(self):
+        self._in_flight.clear()
+        self._forget_sent_settings()
         if self.is_connected():
             self._connection.close()
         self._connection = None
@@ -642,6 +677,15 @@ class SmoothieDriver_3_0_0:
     def speed(self):
         pass
 
+    @property
+    def estimated_motion_time(self) -> float:
+        """
+        How long, in seconds, the moves, homes and dwells sent since this
+        driver was created should take on a real robot. This is tracked while
+        simulating too, which is what lets a simulation predict run time.
+        """
+        return self._estimated_motion_time
+
     @property
     def steps_per_mm(self):
         return self._steps_per_mm
@@ -649,10 +693,14 @@ class SmoothieDriver_3_0_0:
     def set_speed(self, value):
         ''' set total axes movement speed in mm/second'''
         self._combined_speed = float(value)
+        if self._combined_speed == self._sent_speed:
+            return
+        if not self.simulating:
+            self._sent_speed = self._combined_speed
         speed_per_min = int(self._combined_speed * SEC_PER_MIN)
         command = GCODES['SET_SPEED'] + str(speed_per_min)
         log.debug("set_speed: {}".format(command))
-        self._send_command(command)
+        self._queue_command(command)
 
     def push_speed(self):
         self._saved_axes_speed = float(self._combined_speed)
@@ -669,14 +717,17 @@ class SmoothieDriver_3_0_0:
             and floating point number for millimeters per second (mm/sec)
         '''
         self._max_speed_settings.update(settings)
+        changed = self._unsent(settings, self._sent_max_speed)
+        if not changed:
+            return
         values = ['{}{}'.format(axis.upper(), value)
-                  for axis, value in sorted(settings.items())]
+                  for axis, value in sorted(changed.items())]
         command = '{} {}'.format(
             GCODES['SET_MAX_SPEED'],
             ' '.join(values)
         )
         log.debug("set_axis_max_speed: {}".format(command))
-        self._send_command(command)
+        self._queue_command(command)
 
     def push_axis_max_speed(self):
         self._saved_max_speed_settings = self._max_speed_settings.copy()
@@ -693,14 +744,17 @@ class SmoothieDriver_3_0_0:
             and floating point number for mm-per-second-squared (mm/sec^2)
         '''
         self._acceleration.update(settings)
+        changed = self._unsent(settings, self._sent_acceleration)
+        if not changed:
+            return
         values = ['{}{}'.format(axis.upper(), value)
-                  for axis, value in sorted(settings.items())]
+                  for axis, value in sorted(changed.items())]
         command = '{} {}'.format(
             GCODES['ACCELERATION'],
             ' '.join(values)
         )
         log.debug("set_acceleration: {}".format(command))
-        self._send_command(command)
+        self._queue_command(command)
 
     def push_acceleration(self):
         self._saved_acceleration = self._acceleration.copy()
@@ -800,16 +854,22 @@ class SmoothieDriver_3_0_0:
         this method to set the axis-current state on the actual Smoothie
         motor-driver.
         '''
-        self._send_command(self._generate_current_command())
+        command = self._generate_current_command()
+        if command:
+            self._queue_command(command)
 
     def _generate_current_command(self):
         '''
         Returns a constructed GCode string that contains this driver's
         axis-current settings, plus a small delay to wait for those settings
-        to take effect.
+        to take effect. Only the currents that differ from what Smoothie was
+        last sent are included, and if none do this returns an empty string.
         '''
+        changed = self._unsent(self.current, self._sent_current)
+        if not changed:
+            return ''
         values = ['{}{}'.format(axis, value)
-                  for axis, value in sorted(self.current.items())]
+                  for axis, value in sorted(changed.items())]
         current_cmd = '{} {}'.format(
             GCODES['SET_CURRENT'],
             ' '.join(values)
@@ -822,6 +882,40 @@ class SmoothieDriver_3_0_0:
         log.debug("_generate_current_command: {}".format(command))
         return command
 
+    def _with_current_command(self, command):
+        '''
+        Returns `command` preceded by the gcode for any current changes that
+        have not been sent yet (see `_generate_current_command`)
+        '''
+        return ' '.join(filter(None, [
+            self._generate_current_command(), command]))
+
+    def _unsent(self, settings, sent):
+        '''
+        Returns the entries in `settings` that differ from those in `sent`,
+        and records them in `sent`, since the caller is about to send them.
+        If sending fails, `_forget_sent_settings` throws the record away.
+        '''
+        changed = {
+            axis: value
+            for axis, value in settings.items()
+            if sent.get(axis) != value
+        }
+        if not self.simulating:
+            sent.update(changed)
+        return changed
+
+    def _forget_sent_settings(self):
+        '''
+        Forget the settings Smoothie was last sent, so the next ones are all
+        sent again. Called whenever the board may have lost or not applied
+        them: after an error or halt, a reset, or a failed write.
+        '''
+        self._sent_current.clear()
+        self._sent_max_speed.clear()
+        self._sent_acceleration.clear()
+        self._sent_speed = None
+
     def disengage_axis(self, axes):
         '''
         Disable the stepper-motor-driver's 36v output to motor
@@ -895,11 +989,13 @@ class SmoothieDriver_3_0_0:
         if not self.simulating:
             sleep(DEFAULT_STABILIZE_DELAY)
         log.debug("reset_from_error")
+        self._forget_sent_settings()
         self._send_command(GCODES['RESET_FROM_ERROR'])
         self.update_homed_flags()
 
     # Potential place for command optimization (buffering, flushing, etc)
-    def _send_command(self, command, timeout=DEFAULT_SMOOTHIE_TIMEOUT):
+    def _send_command(self, command, timeout=DEFAULT_SMOOTHIE_TIMEOUT,
+                      wait_timeout=DEFAULT_WAIT_TIMEOUT):
         """
         Submit a GCODE command to the robot, followed by M400 to block until
         done. This method also ensures that any command on the B or C axis
@@ -915,34 +1011,117 @@ class SmoothieDriver_3_0_0:
         switch was hit unexpectedly. This is usually due to an undetected
         collision in a previous move command.
 
+        If pipelined commands are still in flight, they are all acknowledged
+        and Smoothie's motion queue is drained before this command is sent,
+        so every command sent through here sees a stationary machine.
+
         :param command: the GCODE to submit to the robot
         :param timeout: the time to wait before returning (indefinite wait if
             this is set to none
+        :param wait_timeout: the time to wait for any motion the command
+            starts to finish
         """
         if self.simulating:
             return
         try:
             with self._serial_lock:
-                return self._send_command_unsynchronized(command, timeout)
+                self._flush_pipeline_unsynchronized()
+                return self._send_command_unsynchronized(
+                    command, timeout, wait_timeout)
         except SmoothieError as se:
-            # XXX: This is a reentrancy error because another command could
-            # swoop in here. We're already resetting though and errors (should
-            # be) rare so it's probably fine, but the actual solution to this
-            # is locking at a higher level like in APIv2.
-            self._reset_from_error()
-            error_axis = se.ret_code.strip()[-1]
-            log.warning(
-                    f"alarm/error: command={command}, resp={se.ret_code}")
-            if GCODES['MOVE'] in command or GCODES['PROBE'] in command:
-                if error_axis not in 'XYZABC':
-                    error_axis = AXES
-                log.info("Homing after alarm/error")
-                self.home(error_axis)
-            raise SmoothieError(se.ret_code, command)
+            self._recover_from_error(se, command)
+        except Exception:
+            self._forget_sent_settings()
+            raise
+
+    def _queue_command(self, command, timeout=DEFAULT_SMOOTHIE_TIMEOUT,
+                       wait_timeout=None):
+        """
+        Submit a GCODE command whose response is not needed. If pipelining is
+        enabled (see `set_pipeline_window`) the command is written without
+        waiting for its ack or for the motion to finish; otherwise this is the
+        same as `_send_command`.
+
+        Acks are matched to commands in the order they were sent. Errors
+        reported for a pipelined command are raised (and recovered from) by
+        whichever call reads that command's ack.
+
+        `wait_timeout` is how long the motion started by the command may
+        take, if it starts any. Pipelined commands add theirs up into the
+        timeout of the wait that next synchronizes.
+        """
+        if self.simulating:
+            return
+        if self._pipeline_window < 1:
+            self._send_command(
+                command, timeout, wait_timeout or DEFAULT_WAIT_TIMEOUT)
+            return
+        try:
+            with self._serial_lock:
+                self._queue_command_unsynchronized(command, timeout)
+                self._pipelined_wait_timeout += wait_timeout or 0
+        except SmoothieError as se:
+            self._recover_from_error(se, command)
+        except Exception:
+            self._forget_sent_settings()
+            raise
+
+    def _recover_from_error(self, se, command):
+        # Errors read back for an earlier pipelined command carry that
+        # command, which is the one that failed
+        command = se.command or command
+        # XXX: This is a reentrancy error because another command could
+        # swoop in here. We're already resetting though and errors (should
+        # be) rare so it's probably fine, but the actual solution to this
+        # is locking at a higher level like in APIv2.
+        self._reset_from_error()
+        error_axis = se.ret_code.strip()[-1]
+        log.warning(
+                f"alarm/error: command={command}, resp={se.ret_code}")
+        if GCODES['MOVE'] in command or GCODES['PROBE'] in command:
+            if error_axis not in 'XYZABC':
+                error_axis = AXES
+            log.info("Homing after alarm/error")
+            self.home(error_axis)
+        raise SmoothieError(se.ret_code, command)
+
+    def set_pipeline_window(self, window: int):
+        """
+        Set how many commands may be in flight (written to Smoothie but not
+        yet acknowledged) at once.
+
+        With a window of 0 (the default) every command is followed by an M400
+        and waits for the motion to complete. With a larger window, moves and
+        speed/current settings are streamed to Smoothie back to back, and the
+        driver only synchronizes (drains every outstanding ack, then M400)
+        before a command whose response matters, like a position read, a
+        switch read or a home.
+
+        :param window: The maximum number of unacknowledged commands, or 0 to
+                       disable pipelining
+        """
+        if window < 0:
+            raise ValueError(f'Pipeline window must be >= 0, not {window}')
+        self.flush_pipeline()
+        self._pipeline_window = int(window)
+
+    def flush_pipeline(self):
+        """
+        Wait for every pipelined command to be acknowledged and for any
+        motion they started to finish.
+        """
+        if self.simulating:
+            return
+        try:
+            with self._serial_lock:
+                self._flush_pipeline_unsynchronized()
+        except SmoothieError as se:
+            self._recover_from_error(se, '')
 
     def _send_command_unsynchronized(self,
                                      command,
-                                     timeout=DEFAULT_SMOOTHIE_TIMEOUT):
+                                     timeout=DEFAULT_SMOOTHIE_TIMEOUT,
+                                     wait_timeout=DEFAULT_WAIT_TIMEOUT):
         cmd_ret = self._write_with_retries(
             command + SMOOTHIE_COMMAND_TERMINATOR,
             5.0, DEFAULT_COMMAND_RETRIES)
@@ -950,13 +1129,70 @@ class SmoothieDriver_3_0_0:
         self._handle_return(cmd_ret)
         wait_ret = serial_communication.write_and_return(
             GCODES['WAIT'] + SMOOTHIE_COMMAND_TERMINATOR,
-            SMOOTHIE_ACK, self._connection, timeout=12000,
+            SMOOTHIE_ACK, self._connection, timeout=wait_timeout,
             tag='smoothie')
         wait_ret = self._remove_unwanted_characters(
             GCODES['WAIT'], wait_ret)
         self._handle_return(wait_ret)
         return cmd_ret.strip()
 
+    def _queue_command_unsynchronized(self, command, timeout):
+        if not self._in_flight:
+            # nothing is in flight, so anything left in the input buffer is
+            # garbage rather than an ack we are waiting for
+            serial_communication.clear_buffer(self._connection)
+        while len(self._in_flight) >= self._pipeline_window:
+            self._read_pipelined_ack()
+        serial_communication.write_only(
+            command + SMOOTHIE_COMMAND_TERMINATOR,
+            self._connection, tag='smoothie')
+        self._in_flight.append((command, timeout))
+
+    def _read_pipelined_ack(self):
+        command, timeout = self._in_flight.popleft()
+        try:
+            ret = serial_communication.read_response(
+                SMOOTHIE_ACK, self._connection, timeout=timeout,
+                tag='smoothie')
+            ret = self._remove_unwanted_characters(command, ret)
+            self._handle_return(ret)
+        except SmoothieError as se:
+            self._discard_in_flight()
+            raise SmoothieError(se.ret_code, command)
+        except BaseException:
+            # a halt or a lost connection; the remaining acks mean nothing
+            self._in_flight.clear()
+            raise
+        return ret
+
+    def _discard_in_flight(self):
+        # Smoothie answers commands received after an error with errors of
+        # their own; read (and ignore) those so they do not get mistaken for
+        # the response to the M999 that follows
+        while self._in_flight:
+            self._in_flight.popleft()
+            try:
+                serial_communication.read_response(
+                    SMOOTHIE_ACK, self._connection,
+                    timeout=PIPELINE_DRAIN_TIMEOUT, tag='smoothie')
+            except serial_communication.SerialNoResponse:
+                self._in_flight.clear()
+
+    def _flush_pipeline_unsynchronized(self):
+        if not self._in_flight:
+            return
+        while self._in_flight:
+            self._read_pipelined_ack()
+        wait_timeout = self._pipelined_wait_timeout or DEFAULT_WAIT_TIMEOUT
+        self._pipelined_wait_timeout = 0.0
+        wait_ret = serial_communication.write_and_return(
+            GCODES['WAIT'] + SMOOTHIE_COMMAND_TERMINATOR,
+            SMOOTHIE_ACK, self._connection, timeout=wait_timeout,
+            tag='smoothie')
+        wait_ret = self._remove_unwanted_characters(
+            GCODES['WAIT'], wait_ret)
+        self._handle_return(wait_ret)
+
     def _handle_return(self, ret_code: str):
         """ Check the return string from smoothie for an error condition.
 
@@ -1042,8 +1278,7 @@ class SmoothieDriver_3_0_0:
             GCODES['ABSOLUTE_COORDS']   # set back to abs coordinate system
         )
 
-        command = '{0} {1}'.format(
-            self._generate_current_command(), relative_retract_command)
+        command = self._with_current_command(relative_retract_command)
         self._send_command(command, timeout=DEFAULT_MOVEMENT_TIMEOUT)
         self.dwell_axes('Y')
 
@@ -1052,10 +1287,7 @@ class SmoothieDriver_3_0_0:
             # override firmware's default XY homing speed, to avoid resonance
             self.set_axis_max_speed({'X': XY_HOMING_SPEED})
             self.activate_axes('X')
-            command = '{0} {1}'.format(
-                self._generate_current_command(),
-                GCODES['HOME'] + 'X'
-            )
+            command = self._with_current_command(GCODES['HOME'] + 'X')
             self._send_command(command, timeout=DEFAULT_MOVEMENT_TIMEOUT)
             self.update_homed_flags(flags={'X': True})
         finally:
@@ -1071,10 +1303,7 @@ class SmoothieDriver_3_0_0:
 
         self.activate_axes('Y')
         # home the Y at normal speed (fast)
-        command = '{0} {1}'.format(
-            self._generate_current_command(),
-            GCODES['HOME'] + 'Y'
-        )
+        command = self._with_current_command(GCODES['HOME'] + 'Y')
         self._send_command(command, timeout=DEFAULT_MOVEMENT_TIMEOUT)
 
         # slow the maximum allowed speed on Y axis
@@ -1212,6 +1441,14 @@ class SmoothieDriver_3_0_0:
         log.debug("_write_to_pipette: {}".format(command))
         self._send_command(command)
 
+    def _estimate_move_duration(self, target):
+        return kinematics.move_duration(
+            self.position, target, self._max_speed_settings,
+            self._acceleration, self._combined_speed)
+
+    def _movement_timeout(self, duration):
+        return duration * MOVEMENT_TIMEOUT_SCALE + MOVEMENT_TIMEOUT_MARGIN
+
     # ----------- END Private functions ----------- #
 
     # ----------- Public interface ---------------- #
@@ -1258,8 +1495,18 @@ class SmoothieDriver_3_0_0:
 
         target_coords = create_coords_list(target)
         backlash_coords = create_coords_list(backlash_target)
+        duration = self._estimate_move_duration(backlash_target)
+        if backlash_coords != target_coords:
+            duration += kinematics.move_duration(
+                backlash_target, target, self._max_speed_settings,
+                self._acceleration, self._combined_speed)
 
         if target_coords:
+            # homing sends its own currents, so it has to happen before the
+            # move's currents are set up below
+            if home_flagged_axes:
+                self.home_flagged_axes(''.join(list(target.keys())))
+
             non_moving_axes = ''.join([
                 ax
                 for ax in AXES
@@ -1268,24 +1515,22 @@ class SmoothieDriver_3_0_0:
             self.dwell_axes(non_moving_axes)
             self.activate_axes(target.keys())
 
-            # include the current-setting gcodes within the moving gcode string
-            # to reduce latency, since we're setting current so much
-            command = self._generate_current_command()
-
+            command = GCODES['MOVE'] + ''.join(target_coords)
             if backlash_coords != target_coords:
-                command += ' ' + GCODES['MOVE'] + ''.join(backlash_coords)
-            command += ' ' + GCODES['MOVE'] + ''.join(target_coords)
+                command = '{} {}'.format(
+                    GCODES['MOVE'] + ''.join(backlash_coords), command)
 
             try:
                 for axis in target.keys():
                     self.engaged_axes[axis] = True
-                if home_flagged_axes:
-                    self.home_flagged_axes(''.join(list(target.keys())))
+                # include the current-setting gcodes within the moving gcode
+                # string to reduce latency, since we're setting current so much
+                command = self._with_current_command(command)
                 log.debug("move: {}".format(command))
-                # TODO (andy) a movement's timeout should be calculated by
-                # how long the movement is expected to take. A default timeout
-                # of 30 seconds prevents any movements that take longer
-                self._send_command(command, timeout=DEFAULT_MOVEMENT_TIMEOUT)
+                self._queue_command(
+                    command, timeout=DEFAULT_MOVEMENT_TIMEOUT,
+                    wait_timeout=self._movement_timeout(duration))
+                self._estimated_motion_time += duration
             finally:
                 # dwell pipette motors because they get hot
                 plunger_axis_moved = ''.join(set('BC') & set(target.keys()))
@@ -1343,8 +1588,8 @@ class SmoothieDriver_3_0_0:
 
                 # include the current-setting gcodes within the moving gcode
                 # string to reduce latency, since we're setting current so much
-                command = self._generate_current_command()
-                command += ' ' + GCODES['HOME'] + ''.join(sorted(axes))
+                command = self._with_current_command(
+                    GCODES['HOME'] + ''.join(sorted(axes)))
                 try:
                     log.debug("home: {}".format(command))
                     self._send_command(
@@ -1360,6 +1605,11 @@ class SmoothieDriver_3_0_0:
             ax: self.homed_position.get(ax)
             for ax in ''.join(home_sequence)
         }
+        # each group homes in turn at the axes' top speed
+        for axes in home_sequence:
+            self._estimated_motion_time += kinematics.move_duration(
+                self.position, {ax: homed[ax] for ax in axes},
+                self._max_speed_settings, self._acceleration)
         log.info(f'Home before update pos {homed}')
         self.update_position(default=homed)
         for axis in ''.join(home_sequence):
@@ -1472,6 +1722,7 @@ class SmoothieDriver_3_0_0:
         )
         log.debug("delay: {}".format(command))
         self._send_command(command, timeout=int(seconds) + 1)
+        self._estimated_motion_time += seconds
 
     def probe_axis(self, axis, probing_distance) -> Dict[str, float]:
         if axis.upper() in AXES:
@@ -1581,6 +1832,9 @@ class SmoothieDriver_3_0_0:
             pass
         else:
             self._is_hard_halting.set()
+            # whatever was in flight has been thrown away by the halt
+            self._in_flight.clear()
+            self._forget_sent_settings()
             gpio.set_low(gpio.OUTPUT_PINS['HALT'])
             sleep(0.25)
             gpio.set_high(gpio.OUTPUT_PINS['HALT'])
@@ -0,0 +1,75 @@
+"""
+Estimates of how long Smoothie takes to execute a move.
+
+Smoothie plans every G0 as a straight line through all the axes it moves.
+It runs at the commanded feedrate unless that would drive some axis past its
+maximum speed, and it speeds up and slows down with a trapezoidal velocity
+profile. The functions here model that line. They ignore junction speeds
+between consecutive moves and the planner's look-ahead, so a chain of short
+moves is estimated slightly long.
+"""
+from math import sqrt
+from typing import Mapping, Optional
+
+
+def trapezoid_duration(distance: float,
+                       speed: float,
+                       acceleration: float) -> float:
+    """ The time in seconds to travel `distance` mm from rest to rest.
+
+    The move accelerates at `acceleration` mm/sec^2 up to `speed` mm/sec,
+    cruises, and then decelerates. A move too short to reach `speed` follows
+    a triangular profile instead.
+    """
+    if distance <= 0:
+        return 0.0
+    if speed <= 0:
+        raise ValueError(f'Speed must be positive, not {speed}')
+    if acceleration <= 0:
+        return distance / speed
+    ramp_distance = speed * speed / acceleration
+    if distance < ramp_distance:
+        return 2 * sqrt(distance / acceleration)
+    return distance / speed + speed / acceleration
+
+
+def move_duration(start: Mapping[str, float],
+                  target: Mapping[str, Optional[float]],
+                  max_speeds: Mapping[str, float],
+                  accelerations: Mapping[str, float],
+                  speed: float = None) -> float:
+    """ Estimate how long a single G0 from `start` to `target` takes.
+
+    :param start: The position before the move, by axis
+    :param target: The position after the move. Axes that are missing or
+                   ``None`` do not move
+    :param max_speeds: The maximum speed of each axis in mm/sec (M203.1)
+    :param accelerations: The acceleration of each axis in mm/sec^2 (M204)
+    :param speed: The combined feedrate of the move in mm/sec (G0F), or
+                  ``None`` to limit the move only by `max_speeds`
+    :returns: The expected duration in seconds
+    """
+    deltas = {
+        axis: abs(value - start.get(axis, value))
+        for axis, value in target.items()
+        if value is not None
+    }
+    deltas = {axis: d for axis, d in deltas.items() if d > 0}
+    if not deltas:
+        return 0.0
+    distance = sqrt(sum(d * d for d in deltas.values()))
+    # Scale the line's limits so no single axis exceeds its own
+    line_speed = float('inf') if speed is None else speed
+    line_acceleration = float('inf')
+    for axis, delta in deltas.items():
+        ratio = distance / delta
+        if axis in max_speeds:
+            line_speed = min(line_speed, max_speeds[axis] * ratio)
+        if axis in accelerations:
+            line_acceleration = min(line_acceleration,
+                                    accelerations[axis] * ratio)
+    if line_speed == float('inf'):
+        raise ValueError(f'No speed limit for a move of {sorted(deltas)}')
+    if line_acceleration == float('inf'):
+        line_acceleration = 0
+    return trapezoid_duration(distance, line_speed, line_acceleration)
@@ -119,6 +119,17 @@ class TempDeck:
                 return str(e)
         return ''
 
+    def read_temperature(self) -> str:
+        """ Refresh the current and target temperature, blocking until the
+        TempDeck has answered. Unlike update_temperature this does its serial
+        I/O on the calling thread.
+        """
+        try:
+            self._recursive_update_temperature(DEFAULT_COMMAND_RETRIES)
+        except (TempDeckError, SerialException, SerialNoResponse) as e:
+            return str(e)
+        return ''
+
     @property
     def target(self) -> int:
         return self._temperature.get('target')
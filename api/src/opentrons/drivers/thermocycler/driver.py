@@ -1,13 +1,6 @@
 import asyncio
 import logging
-import os
-import threading
-from queue import Queue
-try:
-    import select
-except ModuleNotFoundError:
-    select = None  # type: ignore
-from time import sleep
+import sys
 from typing import Optional, Mapping
 from serial.serialutil import SerialException  # type: ignore
 from opentrons.drivers import serial_communication, utils
@@ -66,108 +59,111 @@ class ThermocyclerError(Exception):
     pass
 
 
-class TCPoller(threading.Thread):
+class TCPoller:
     def __init__(self, port, interrupt_callback, temp_status_callback,
-                 lid_status_callback, lid_temp_status_callback):
-        if not select:
+                 lid_status_callback, lid_temp_status_callback,
+                 loop: asyncio.AbstractEventLoop = None):
+        if sys.platform.startswith('win'):
             raise RuntimeError("Cannot connect to a Thermocycler from Windows")
         self._port = port
+        self._loop = loop or asyncio.get_event_loop()
         self._connection = self._connect_to_port()
         self._interrupt_callback = interrupt_callback
         self._temp_status_callback = temp_status_callback
         self._lid_status_callback = lid_status_callback
         self._lid_temp_status_callback = lid_temp_status_callback
-        self._lock = threading.Lock()
-        self._command_queue = Queue()
-
-        # Note: the options and order of operations for opening file
-        # descriptors is very specific. For more info, see:
-        # http://pubs.opengroup.org/onlinepubs/007908799/xsh/open.html
-        self._send_path = '/var/run/tc_send_fifo_{}'.format(hash(self))
-        os.mkfifo(self._send_path)
-        send_read_fd = os.open(
-            self._send_path, flags=os.O_RDONLY | os.O_NONBLOCK)
-        self._send_read_file = os.fdopen(send_read_fd, 'rb')
-        self._send_write_fd = open(self._send_path, 'wb', buffering=0)
-
-        self._halt_path = '/var/run/tc_halt_fifo_{}'.format(hash(self))
-        os.mkfifo(self._halt_path)
-        halt_read_fd = os.open(
-            self._halt_path, flags=os.O_RDONLY | os.O_NONBLOCK)
-        self._halt_read_file = os.fdopen(halt_read_fd, 'rb')
-        self._halt_write_fd = open(self._halt_path, 'wb', buffering=0)
-
-        self._poller = select.poll()
-        self._poller.register(self._send_read_file, select.POLLIN)
-        self._poller.register(self._halt_read_file, select.POLLIN)
-        self._poller.register(self._connection, select.POLLIN)
-
-        serial_thread_name = 'tc_serial_poller_{}'.format(hash(self))
-        super().__init__(target=self._serial_poller, name=serial_thread_name)
-        log.info("Starting TC thread {}".format(serial_thread_name))
-        super().start()
+        self._command_queue: asyncio.Queue = asyncio.Queue(loop=self._loop)
+        self._command_ready = asyncio.Event(loop=self._loop)
+
+        log.info("Starting TC poller for {}".format(port))
+        self._poll_task = self._loop.create_task(self._serial_poller())
 
     @property
     def port(self):
         return self._port
 
-    def _serial_poller(self):
-        """ Priority-sorted list of checks
+    def is_alive(self) -> bool:
+        return not self._poll_task.done()
 
-        Highest priority is the 'halt' channel, which is used to kill the
-        thread and the serial communication channel and allow everything to be
-        cleaned up.
+    async def _serial_poller(self):
+        """ Priority-sorted list of checks
 
-        Second is the lid-open interrupt, which should trigger a callback
-        (typically to halt the robot).
+        Highest priority is the lid-open interrupt, which should trigger a
+        callback (typically to halt the robot).
 
-        Third is an enqueued command to send to the Thermocycler.
+        Second is an enqueued command to send to the Thermocycler.
 
-        Fourth (if no other work is available) is to query the Thermocycler for
+        Third (if no other work is available) is to query the Thermocycler for
         its current temp, target temp, and time remaining in its current cycle.
-        """
-        while True:
-            _next = dict(self._poller.poll(POLLING_FREQUENCY_MS))
-            if self._halt_read_file.fileno() in _next:
-                log.debug("Poller [{}]: halt".format(hash(self)))
-                self._halt_read_file.read()
-                # Note: this is discarded because we send a set message to halt
-                # the thread--don't currently need to parse it
-                break
 
-            elif self._connection.fileno() in _next:
-                # Lid-open interrupt
-                log.debug("Poller [{}]: interrupt".format(hash(self)))
-                res = self._connection.read_until(SERIAL_ACK)
-                self._interrupt_callback(res)
-
-            elif self._send_read_file.fileno() in _next:
-                self._send_read_file.read(1)
-                command, callback = self._command_queue.get()
-                log.debug("Poller [{}]: send {}".format(hash(self), command))
-                res = self._send_command(command)
-                callback(res)
+        Halting is done by cancelling this task (see :py:meth:`close`).
+        """
+        try:
+            while True:
+                await self._poll_once()
+        finally:
+            # nothing will answer these anymore
+            while not self._command_queue.empty():
+                _, result = self._command_queue.get_nowait()
+                result.cancel()
+            log.info("Exiting TC poller loop [{}]".format(hash(self)))
+
+    async def _poll_once(self):
+        await self._wait_for_work(POLLING_FREQUENCY_MS / 1000)
+        if self._connection.in_waiting:
+            # Lid-open interrupt
+            log.debug("Poller [{}]: interrupt".format(hash(self)))
+            res = await self._connection.read_until(
+                SERIAL_ACK, DEFAULT_TC_TIMEOUT)
+            self._interrupt_callback(res)
+
+        elif not self._command_queue.empty():
+            command, result = self._command_queue.get_nowait()
+            log.debug("Poller [{}]: send {}".format(hash(self), command))
+            try:
+                res = await self._send_command(command)
+            except Exception as e:
+                if not result.done():
+                    result.set_exception(e)
             else:
-                # Nothing else to do--update device status
-                log.debug("Poller [{}]: updating temp".format(hash(self)))
-                res = self._send_command(GCODES['GET_PLATE_TEMP'])
-                self._temp_status_callback(res)
-                res = self._send_command(GCODES['GET_LID_STATUS'])
-                self._lid_status_callback(res)
-                res = self._send_command(GCODES['GET_LID_TEMP'])
-                self._lid_temp_status_callback(res)
-        log.info("Exiting TC poller loop [{}]".format(hash(self)))
-
-    def _wait_for_ack(self):
+                if not result.done():
+                    result.set_result(res)
+        else:
+            # Nothing else to do--update device status
+            log.debug("Poller [{}]: updating temp".format(hash(self)))
+            res = await self._send_command(GCODES['GET_PLATE_TEMP'])
+            self._temp_status_callback(res)
+            res = await self._send_command(GCODES['GET_LID_STATUS'])
+            self._lid_status_callback(res)
+            res = await self._send_command(GCODES['GET_LID_TEMP'])
+            self._lid_temp_status_callback(res)
+
+    async def _wait_for_work(self, timeout):
+        """ Wait until there is a command or an interrupt to handle, or until
+        `timeout` seconds pass """
+        if self._connection.in_waiting or not self._command_queue.empty():
+            return
+        self._command_ready.clear()
+        waiters = [
+            self._loop.create_task(self._connection.wait_for_data()),
+            self._loop.create_task(self._command_ready.wait())]
+        try:
+            await asyncio.wait(waiters, timeout=timeout, loop=self._loop,
+                               return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+    async def _wait_for_ack(self):
         """
         This method writes a sequence of newline characters, which will
         guarantee the device responds with 'ok\r\nok\r\n' within 1 second
         """
-        self._send_command(SERIAL_ACK, timeout=DEFAULT_TC_TIMEOUT)
+        await self._send_command(SERIAL_ACK, timeout=DEFAULT_TC_TIMEOUT)
 
-    def _send_command(self, command, timeout=DEFAULT_TC_TIMEOUT):
+    async def _send_command(self, command, timeout=DEFAULT_TC_TIMEOUT):
         command_line = command + ' ' + TC_COMMAND_TERMINATOR
-        ret_code = self._recursive_write_and_return(
+        ret_code = await self._recursive_write_and_return(
             command_line, timeout, DEFAULT_COMMAND_RETRIES)
         if ERROR_KEYWORD in ret_code.lower():
             log.error('Received error message from Thermocycler: {}'.format(
@@ -175,48 +171,38 @@ class TCPoller(threading.Thread):
             raise ThermocyclerError(ret_code)
         return ret_code.strip()
 
-    def _recursive_write_and_return(self, cmd, timeout, retries):
+    async def _recursive_write_and_return(self, cmd, timeout, retries):
         try:
-            return serial_communication.write_and_return(
-                cmd, TC_ACK, self._connection, timeout,
-                tag=f'thermocycler {id(self)}')
+            return await self._connection.write_and_return(
+                cmd, TC_ACK, timeout, tag=f'thermocycler {id(self)}')
         except SerialNoResponse as e:
             retries -= 1
             if retries <= 0:
                 raise e
-            sleep(DEFAULT_STABILIZE_DELAY)
+            await asyncio.sleep(DEFAULT_STABILIZE_DELAY, loop=self._loop)
             if self._connection:
-                self._connection.close()
-                self._connection.open()
-            return self._recursive_write_and_return(
+                self._connection.reopen()
+            return await self._recursive_write_and_return(
                 cmd, timeout, retries)
 
     def _connect_to_port(self):
         try:
-            return serial_communication.connect(port=self._port,
-                                                baudrate=TC_BAUDRATE)
+            return serial_communication.AsyncSerial.connect(
+                port=self._port, baudrate=TC_BAUDRATE, loop=self._loop)
         except SerialException:
             raise SerialException(
                 "Thermocycler device not found on {}".format(self._port))
 
-    def send(self, command, callback):
-        with self._lock:
-            self._command_queue.put((command, callback))
-            self._send_write_fd.write(b'c')
+    async def send(self, command):
+        """ Queue a command, and return its response once it has been sent """
+        result = self._loop.create_future()
+        self._command_queue.put_nowait((command, result))
+        self._command_ready.set()
+        return await result
 
     def close(self):
-        self._halt_write_fd.write(b'q')
-
-    def __del__(self):
-        """ Clean up thread fifos"""
-        try:
-            os.unlink(self._send_path)
-        except NameError:
-            pass
-        try:
-            os.unlink(self._halt_path)
-        except NameError:
-            pass
+        self._poll_task.cancel()
+        self._connection.close()
 
 
 class Thermocycler:
@@ -250,7 +236,6 @@ class Thermocycler:
     def disconnect(self) -> 'Thermocycler':
         if self.is_connected():
             self._poller.close()
-            self._poller.join()
         self._poller = None
         return self
 
@@ -416,18 +401,7 @@ class Thermocycler:
             raise ThermocyclerError("Thermocycler did not return device info")
 
     async def _write_and_wait(self, command):
-        ret = None
-
-        def cb(cmd):
-            nonlocal ret
-            ret = cmd
-
-        self._poller.send(command, cb)
-
-        while None is ret:
-            await asyncio.sleep(0.05)
-            pass
-        return ret
+        return await self._poller.send(command)
 
     def __del__(self):
         try:
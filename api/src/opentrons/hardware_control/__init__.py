@@ -97,6 +97,11 @@ class API(HardwareAPILike):
         self._callbacks: set = set()
         # {'X': 0.0, 'Y': 0.0, 'Z': 0.0, 'A': 0.0, 'B': 0.0, 'C': 0.0}
         self._current_position: Dict[Axis, float] = {}
+        # Whether _current_position is known to match the hardware, and
+        # whether a trusted position may answer refresh requests; see
+        # trust_position_cache
+        self._position_trusted = False
+        self._trust_position_cache = False
 
         self._attached_instruments: Instruments = {
             top_types.Mount.LEFT: None,
@@ -184,6 +189,14 @@ class API(HardwareAPILike):
     def is_simulator_sync(self):
         return isinstance(self._backend, Simulator)
 
+    @property
+    def estimated_motion_time(self) -> float:
+        """ How long, in seconds, the motion commanded since this instance
+        was built should take on a real robot. Also tracked when simulating,
+        where it predicts how long the simulated protocol would run.
+        """
+        return self._backend.estimated_motion_time
+
     async def register_callback(self, cb):
         """ Allows the caller to register a callback, and returns a closure
         that can be used to unregister the provided callback
@@ -440,6 +453,7 @@ class API(HardwareAPILike):
         :py:meth:`stop`.
         """
         self._log.info("Halting")
+        self._position_trusted = False
         self._backend.hard_halt()
 
     async def stop(self):
@@ -451,6 +465,7 @@ class API(HardwareAPILike):
         robot.
         """
         self._backend.halt()
+        self._position_trusted = False
         self._log.info("Recovering from halt")
         self._call_on_attached_modules("cancel")
         await self.reset()
@@ -507,10 +522,12 @@ class API(HardwareAPILike):
         smoothie_plungers = [ax.name.upper() for ax in plungers]
         async with self._motion_lock:
             if smoothie_gantry:
-                smoothie_pos.update(self._backend.home(smoothie_gantry))
+                smoothie_pos.update(
+                    await self._backend.home(smoothie_gantry))
             if smoothie_plungers:
-                smoothie_pos.update(self._backend.home(smoothie_plungers))
-            self._current_position = self._deck_from_smoothie(smoothie_pos)
+                smoothie_pos.update(
+                    await self._backend.home(smoothie_plungers))
+            self._update_position_from_smoothie(smoothie_pos)
 
     async def add_tip(
             self,
@@ -567,10 +584,8 @@ class API(HardwareAPILike):
         left = (with_enum[Axis.X],
                 with_enum[Axis.Y],
                 with_enum[Axis.by_mount(top_types.Mount.LEFT)])
-        right_deck = linal.apply_reverse(self._config.gantry_calibration,
-                                         right)
-        left_deck = linal.apply_reverse(self._config.gantry_calibration,
-                                        left)
+        right_deck = self._transform_to_deck(right)
+        left_deck = self._transform_to_deck(left)
         deck_pos = {Axis.X: right_deck[0],
                     Axis.Y: right_deck[1],
                     Axis.by_mount(top_types.Mount.RIGHT): right_deck[2],
@@ -578,6 +593,16 @@ class API(HardwareAPILike):
         deck_pos.update(plunger_axes)
         return deck_pos
 
+    def _transform_to_deck(
+            self, pos: Tuple[float, float, float]) -> Tuple[float, float, float]:
+        """ Apply the reverse gantry calibration to a smoothie position """
+        return linal.apply_reverse(self._config.gantry_calibration, pos)
+
+    def _transform_to_smoothie(
+            self, pos: Tuple[float, float, float]) -> Tuple[float, float, float]:
+        """ Apply the gantry calibration to a deck position """
+        return linal.apply_transform(self._config.gantry_calibration, pos)
+
     async def current_position(
             self,
             mount: top_types.Mount,
@@ -587,7 +612,9 @@ class API(HardwareAPILike):
         specified mount.
 
         This returns cached position to avoid hitting the smoothie driver
-        unless ``refresh`` is ``True``.
+        unless ``refresh`` is ``True``. Even then, the cache is used if
+        :py:meth:`trust_position_cache` is enabled and nothing has happened
+        since the last acknowledged motion that could have moved the robot.
 
         If `critical_point` is specified, that critical point will be applied
         instead of the default one. For instance, if
@@ -600,9 +627,10 @@ class API(HardwareAPILike):
         if not self._current_position and not refresh:
             raise MustHomeError
         async with self._motion_lock:
-            if refresh:
-                self._current_position = self._deck_from_smoothie(
-                    self._backend.update_position())
+            if refresh and not (self._trust_position_cache
+                                and self._position_trusted):
+                self._update_position_from_smoothie(
+                    await self._backend.update_position())
             if mount == mount.RIGHT:
                 offset = top_types.Point(0, 0, 0)
             else:
@@ -774,13 +802,12 @@ class API(HardwareAPILike):
             raise ValueError("Moves must specify either exactly an x, y, and "
                              "(z or a) or none of them")
 
-        # Type ignored below because linal.apply_transform (rightly) specifies
-        # Tuple[float, float, float] and the implied type from
+        # Type ignored below because _transform_to_smoothie (rightly)
+        # specifies Tuple[float, float, float] and the implied type from
         # target_position.items() is (rightly) Tuple[float, ...] with unbounded
         # size; unfortunately, mypy can’t quite figure out the length check
         # above that makes this OK
-        transformed = linal.apply_transform(  # type: ignore
-            self._config.gantry_calibration, to_transform)
+        transformed = self._transform_to_smoothie(to_transform)  # type: ignore
 
         # Since target_position is an OrderedDict with the axes ordered by
         # (x, y, z, a, b, c), and we’ll only have one of a or z (as checked
@@ -809,11 +836,13 @@ class API(HardwareAPILike):
                                 bounds[ax.name][0], bounds[ax.name][1]))
         async with self._motion_lock:
             try:
-                self._backend.move(smoothie_pos, speed=speed,
-                                   home_flagged_axes=home_flagged_axes)
+                await self._backend.move(
+                    smoothie_pos, speed=speed,
+                    home_flagged_axes=home_flagged_axes)
             except Exception:
                 self._log.exception('Move failed')
                 self._current_position.clear()
+                self._position_trusted = False
                 raise
             else:
                 self._current_position.update(target_position)
@@ -826,8 +855,28 @@ class API(HardwareAPILike):
     engaged_axes = property(fget=get_engaged_axes)
 
     async def disengage_axes(self, which: List[Axis]):
+        # Disengaged axes can be pushed around by hand
+        self._position_trusted = False
         self._backend.disengage_axes([ax.name for ax in which])
 
+    def trust_position_cache(self, trust: bool = True):
+        """ Answer :py:meth:`current_position` refresh requests from the
+        cached position while it is trusted.
+
+        The cache becomes trusted when it is read back from the backend after
+        homing, probing or a refresh, and stays trusted through every move the
+        backend acknowledges. It stops being trusted when motion is halted or
+        stopped, when axes are disengaged, and when a move fails.
+        Only enable this when nothing but this object moves the robot; a
+        second controller talking to the same smoothie would go unnoticed.
+        """
+        self._trust_position_cache = trust
+
+    def _update_position_from_smoothie(self, smoothie_pos: Dict[str, float]):
+        """ Replace the cached position with one read from the backend """
+        self._current_position = self._deck_from_smoothie(smoothie_pos)
+        self._position_trusted = True
+
     @_log_call
     async def retract(self, mount: top_types.Mount, margin: float = 10):
         """ Pull the specified mount up to its home position.
@@ -836,8 +885,9 @@ class API(HardwareAPILike):
         """
         smoothie_ax = Axis.by_mount(mount).name.upper()
         async with self._motion_lock:
-            smoothie_pos = self._backend.fast_home(smoothie_ax, margin)
-            self._current_position = self._deck_from_smoothie(smoothie_pos)
+            smoothie_pos = await self._backend.fast_home(
+                smoothie_ax, margin)
+            self._update_position_from_smoothie(smoothie_pos)
 
     def _critical_point_for(
             self, mount: top_types.Mount,
@@ -1188,9 +1238,9 @@ class API(HardwareAPILike):
             if home_after:
                 safety_margin = abs(bottom-droptip)
                 async with self._motion_lock:
-                    smoothie_pos = self._backend.fast_home(
+                    smoothie_pos = await self._backend.fast_home(
                         plunger_ax.name.upper(), safety_margin)
-                    self._current_position = self._deck_from_smoothie(
+                    self._update_position_from_smoothie(
                         smoothie_pos)
                 await self._move_plunger(mount, bottom)
 
@@ -1412,8 +1462,8 @@ class API(HardwareAPILike):
                 to_probe = ax_en
             # Probe and retrieve the position afterwards
             async with self._motion_lock:
-                self._current_position = self._deck_from_smoothie(
-                    self._backend.probe(
+                self._update_position_from_smoothie(
+                    await self._backend.probe(
                         to_probe.name.lower(), hs.probe_distance))
             xyz = await self.gantry_position(mount)
             # Store the upated position.
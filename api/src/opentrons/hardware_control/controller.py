@@ -1,5 +1,7 @@
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
+import functools
 import logging
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -34,30 +36,55 @@ class Controller:
                 'will fail')
 
         self.config = config or opentrons.config.robot_configs.load()
-        # We handle our own locks in the hardware controller thank you
+        # Long-running smoothie commands (see _run_on_serial_worker) run on
+        # their own thread while quick ones run on the event loop, so the
+        # driver has to handle its locks
         self._smoothie_driver = driver_3_0.SmoothieDriver_3_0_0(
-            config=self.config, handle_locks=False)
+            config=self.config, handle_locks=True)
+        self._serial_worker = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='smoothie_serial')
         self._cached_fw_version: Optional[str] = None
 
-    def update_position(self) -> Dict[str, float]:
-        self._smoothie_driver.update_position()
-        return self._smoothie_driver.position
+    async def _run_on_serial_worker(self, func, *args, **kwargs):
+        """ Run a blocking smoothie call without blocking the event loop.
 
-    def move(self, target_position: Dict[str, float],
-             home_flagged_axes: bool = True, speed: float = None):
-        with self._set_temp_speed(speed):
-            self._smoothie_driver.move(
-                target_position, home_flagged_axes=home_flagged_axes)
+        Moves and homes wait on the serial port until the motion is done,
+        which can take many seconds; running them on the serial worker lets
+        the event loop keep serving everything else in the meantime. There is
+        exactly one worker, so calls made through here run in order.
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self._serial_worker, functools.partial(func, *args, **kwargs))
 
-    def home(self, axes: List[str] = None) -> Dict[str, float]:
+    async def update_position(self) -> Dict[str, float]:
+        await self._run_on_serial_worker(
+            self._smoothie_driver.update_position)
+        return self._smoothie_driver.position
+
+    @property
+    def estimated_motion_time(self) -> float:
+        return self._smoothie_driver.estimated_motion_time
+
+    async def move(self, target_position: Dict[str, float],
+                   home_flagged_axes: bool = True, speed: float = None):
+        def _move():
+            with self._set_temp_speed(speed):
+                self._smoothie_driver.move(
+                    target_position, home_flagged_axes=home_flagged_axes)
+        await self._run_on_serial_worker(_move)
+
+    async def home(self, axes: List[str] = None) -> Dict[str, float]:
         if axes:
             args: Tuple[Any, ...] = (''.join(axes),)
         else:
             args = tuple()
-        return self._smoothie_driver.home(*args)
+        return await self._run_on_serial_worker(
+            self._smoothie_driver.home, *args)
 
-    def fast_home(self, axis: str, margin: float) -> Dict[str, float]:
-        return self._smoothie_driver.fast_home(axis, margin)
+    async def fast_home(self, axis: str, margin: float) -> Dict[str, float]:
+        return await self._run_on_serial_worker(
+            self._smoothie_driver.fast_home, axis, margin)
 
     def get_attached_instruments(
             self, expected: Dict[Mount, str])\
@@ -194,10 +221,11 @@ class Controller:
     def hard_halt(self):
         self._smoothie_driver.hard_halt()
 
-    def probe(self, axis: str, distance: float) -> Dict[str, float]:
+    async def probe(self, axis: str, distance: float) -> Dict[str, float]:
         """ Run a probe and return the new position dict
         """
-        return self._smoothie_driver.probe_axis(axis, distance)
+        return await self._run_on_serial_worker(
+            self._smoothie_driver.probe_axis, axis, distance)
 
     async def delay(self, duration_s: int):
         """ Pause and sleep
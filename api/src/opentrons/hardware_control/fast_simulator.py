@@ -0,0 +1,208 @@
+""" A simulating hardware controller that runs in the calling thread.
+
+Simulating a protocol normally drives an :py:class:`.API` built with
+:py:meth:`.API.build_hardware_simulator` through a
+:py:class:`.adapters.SynchronousAdapter`, so every hardware call hops to the
+adapter's event loop thread and back. A :py:class:`FastSimulator` is the same
+:py:class:`.API` with the same :py:class:`.Simulator` backend, but an
+:py:class:`InlineAdapter` runs its calls to completion in the calling thread,
+which is possible because a simulating backend never waits.
+
+It is only for simulating protocols: it does not talk to hardware and does
+not support calibration.
+"""
+import asyncio
+import functools
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from opentrons import types as top_types
+from opentrons.config import robot_configs
+from opentrons.util import linal
+from . import API
+from .simulator import Simulator
+from .types import HardwareAPILike
+
+
+_Transform = Tuple[Tuple[float, ...], ...]
+
+
+def _affine(transform: _Transform,
+            pos: Tuple[float, float, float]) -> Tuple[float, float, float]:
+    """ Apply the top three rows of an affine transform to a point """
+    x, y, z = pos
+    return tuple(row[0] * x + row[1] * y + row[2] * z + row[3]  # type: ignore
+                 for row in transform)
+
+
+def _rows(matrix) -> _Transform:
+    return tuple(tuple(float(v) for v in row) for row in matrix[:3])
+
+
+def _track_task(tasks: Set[asyncio.Task], loop: asyncio.AbstractEventLoop,
+                coro) -> asyncio.Task:
+    task = asyncio.Task(coro, loop=loop)
+    tasks.add(task)
+    task.add_done_callback(tasks.discard)
+    return task
+
+
+def _run_inline(coro):
+    """ Run a coroutine that does not wait to completion """
+    try:
+        coro.send(None)
+    except StopIteration as e:
+        return e.value
+    coro.close()
+    raise RuntimeError(
+        '{} would wait, which a fast simulator cannot do'.format(
+            coro.__qualname__))
+
+
+class FastSimulator(API):
+    """ A hardware simulator whose calls do not need an event loop thread.
+
+    The arguments are the same as those of
+    :py:meth:`.API.build_hardware_simulator`. Like any :py:class:`.API` its
+    methods are coroutines; :py:class:`.ProtocolContext` wraps it in an
+    :py:class:`InlineAdapter` to call them.
+    """
+
+    def __init__(
+            self,
+            attached_instruments: Dict[top_types.Mount, Dict[str, Optional[str]]] = None,  # noqa E501
+            attached_modules: Sequence[str] = None,
+            config: robot_configs.robot_config = None,
+            strict_attached_instruments: bool = True) -> None:
+        # Only modules run this loop, since some of them do wait
+        loop = asyncio.new_event_loop()
+        # Modules leave tasks such as temperature pollers on the loop, which
+        # are stopped when the simulator goes away
+        self._module_tasks: Set[asyncio.Task] = set()
+        loop.set_task_factory(
+            functools.partial(_track_task, self._module_tasks))
+        super().__init__(Simulator(attached_instruments or {},
+                                   list(attached_modules or []),
+                                   config, loop,
+                                   strict_attached_instruments),
+                         config=config, loop=loop)
+        self._transforms_for = None
+        self._to_smoothie: _Transform = ()
+        self._to_deck: _Transform = ()
+
+    def __del__(self):
+        loop = getattr(self, '_loop', None)
+        if not loop or loop.is_closed():
+            return
+        pending = list(self._module_tasks)
+        for task in pending:
+            task.cancel()
+        try:
+            if pending:
+                loop.run_until_complete(
+                    asyncio.gather(*pending, loop=loop,
+                                   return_exceptions=True))
+        except RuntimeError:
+            # Another event loop is running in this thread
+            pass
+        else:
+            loop.close()
+
+    def _gantry_transforms(self) -> Tuple[_Transform, _Transform]:
+        """ The gantry calibration and its inverse, kept as plain tuples
+        since transforming with numpy dominates simulated motion
+        """
+        calibration = self._config.gantry_calibration
+        if calibration is not self._transforms_for:
+            self._to_smoothie = _rows(calibration)
+            self._to_deck = _rows(linal.inv(calibration).tolist())
+            self._transforms_for = calibration
+        return self._to_smoothie, self._to_deck
+
+    def _transform_to_deck(
+            self, pos: Tuple[float, float, float]) -> Tuple[float, float, float]:
+        return _affine(self._gantry_transforms()[1], pos)
+
+    def _transform_to_smoothie(
+            self, pos: Tuple[float, float, float]) -> Tuple[float, float, float]:
+        return _affine(self._gantry_transforms()[0], pos)
+
+
+class _Adapter(HardwareAPILike):
+    """ Runs the coroutines of the wrapped object with :py:meth:`_run` """
+
+    def __init__(self, wrapped: Any) -> None:
+        self._api = wrapped
+
+    def _run(self, coro):
+        raise NotImplementedError
+
+    def _call(self, to_call, *args, **kwargs):
+        return self._run(to_call(*args, **kwargs))
+
+    def __getattr__(self, attr_name):
+        """ Retrieve attributes from the wrapped object and wrap coroutines
+        """
+        attr = getattr(self._api, attr_name)
+        try:
+            check = attr.__wrapped__
+        except AttributeError:
+            check = attr
+        if asyncio.iscoroutinefunction(check):
+            return functools.partial(self._call, attr)
+        elif asyncio.iscoroutine(check):
+            # Awaitable properties
+            return self._run(check)
+        return attr
+
+
+class InlineAdapter(_Adapter):
+    """ A wrapper to make every call into a :py:class:`FastSimulator`
+    synchronous by running it in the calling thread.
+
+    This is :py:class:`.adapters.SynchronousAdapter` without the thread, so
+    it only works for calls that never wait. Module calls may wait, so the
+    adapters for modules run the simulator's event loop instead.
+    """
+
+    def __init__(self, api: FastSimulator) -> None:
+        super().__init__(api)
+        self._cached_sync_mods: Dict[str, _ModuleAdapter] = {}
+
+    def __repr__(self):
+        return '<InlineAdapter>'
+
+    def _run(self, coro):
+        return _run_inline(coro)
+
+    def discover_modules(self) -> List['_ModuleAdapter']:
+        discovered_mods = self._run(self._api.discover_modules())
+        these = {mod.port: mod for mod in discovered_mods}
+        for mod_port in set(self._cached_sync_mods) - set(these):
+            self._cached_sync_mods.pop(mod_port)
+        for mod_port, mod in these.items():
+            if mod_port not in self._cached_sync_mods:
+                self._cached_sync_mods[mod_port] = _ModuleAdapter(
+                    mod, self._api.loop)
+        return list(self._cached_sync_mods.values())
+
+    def build_module(self, mod_type) -> '_ModuleAdapter':
+        """ Build a simulating module that was not attached at startup """
+        loop = self._api.loop
+        return _ModuleAdapter(
+            mod_type(port='', simulating=True, loop=loop), loop)
+
+
+class _ModuleAdapter(_Adapter):
+    """ Makes the calls into a simulating module synchronous by running the
+    simulator's event loop until they finish
+    """
+
+    def __init__(self, module: Any, loop: asyncio.AbstractEventLoop) -> None:
+        super().__init__(module)
+        self._loop = loop
+
+    def __repr__(self):
+        return '<InlineAdapter for {}>'.format(self._api.name())
+
+    def _run(self, coro):
+        return self._loop.run_until_complete(coro)
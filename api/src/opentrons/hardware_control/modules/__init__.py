@@ -33,9 +33,11 @@ async def build(
         port: str,
         which: str,
         simulating: bool,
-        interrupt_callback) -> AbstractModule:
+        interrupt_callback,
+        loop: asyncio.AbstractEventLoop = None) -> AbstractModule:
     return await MODULE_TYPES[which].build(
-        port, interrupt_callback=interrupt_callback, simulating=simulating)
+        port, interrupt_callback=interrupt_callback, simulating=simulating,
+        loop=loop)
 
 
 def discover() -> List[Tuple[str, str]]:
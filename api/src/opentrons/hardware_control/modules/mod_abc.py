@@ -1,4 +1,5 @@
 import abc
+import asyncio
 from typing import Dict, Callable
 
 InterruptCallback = Callable[[str], None]
@@ -12,7 +13,9 @@ class AbstractModule(abc.ABC):
     async def build(cls,
                     port: str,
                     interrupt_callback,
-                    simulating: bool = False) -> 'AbstractModule':
+                    simulating: bool = False,
+                    loop: asyncio.AbstractEventLoop = None)\
+            -> 'AbstractModule':
         """ Modules should always be created using this factory.
 
         This lets the (perhaps blocking) work of connecting to and initializing
@@ -1,11 +1,24 @@
 import asyncio
-from threading import Thread, Event
-from typing import Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union
 from opentrons.drivers.temp_deck import TempDeck as TempDeckDriver
 from . import update, mod_abc
 
 TEMP_POLL_INTERVAL_SECS = 1
 
+# The TempDeck driver is shared with the synchronous v1 API, so its serial
+# reads block. Every TempDeck's poller runs them on this one worker thread,
+# which is only started once something polls.
+_poll_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_poll_executor() -> ThreadPoolExecutor:
+    global _poll_executor
+    if _poll_executor is None:
+        _poll_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='tempdeck_poller')
+    return _poll_executor
+
 
 class MissingDevicePortError(Exception):
     pass
@@ -28,6 +41,9 @@ class SimulatingDriver:
     def update_temperature(self):
         pass
 
+    def read_temperature(self):
+        pass
+
     def connect(self, port):
         self._port = port
 
@@ -55,22 +71,6 @@ class SimulatingDriver:
                 'version': 'dummyVersion'}
 
 
-class Poller(Thread):
-    def __init__(self, driver):
-        self._driver_ref = driver
-        self._stop_event = Event()
-        super().__init__(target=self._poll_temperature,
-                         name='Temperature poller for tempdeck')
-
-    def _poll_temperature(self):
-        while not self._stop_event.wait(TEMP_POLL_INTERVAL_SECS):
-            self._driver_ref.update_temperature()
-
-    def join(self):
-        self._stop_event.set()
-        super().join()
-
-
 class TempDeck(mod_abc.AbstractModule):
     """
     Under development. API subject to change without a version bump
@@ -118,7 +118,7 @@ class TempDeck(mod_abc.AbstractModule):
 
         self._port = port
         self._device_info = None
-        self._poller = None
+        self._poller: Optional[asyncio.Task] = None
 
     def set_temperature(self, celsius):
         """
@@ -192,22 +192,42 @@ class TempDeck(mod_abc.AbstractModule):
         Planned change- will connect to the correct port in case of multiple
         TempDecks
         """
-        if self._poller:
-            self._poller.join()
+        self._stop_poller()
         self._driver.connect(self._port)
         self._device_info = self._driver.get_device_info()
-        self._poller = Poller(self._driver)
-        self._poller.start()
+        self._poller = self._loop.create_task(self._poll_temperature())
 
-    def __del__(self):
-        if hasattr(self, '_poller') and self._poller:
-            self._poller.join()
+    async def _poll_temperature(self):
+        """ Periodically refresh the driver's temperature.
 
-    async def prep_for_update(self) -> str:
+        The blocking serial read runs on the worker thread shared by all
+        TempDecks, so the loop is never blocked.
+        """
+        while True:
+            await self._loop.run_in_executor(
+                _get_poll_executor(), self._driver.read_temperature)
+            await asyncio.sleep(TEMP_POLL_INTERVAL_SECS, loop=self._loop)
+
+    def _stop_poller(self):
         if self._poller:
-            self._poller.join()
-        del self._poller
+            self._poller.cancel()
         self._poller = None
+
+    def _disconnect(self):
+        """
+        Stop polling and disconnect from the serial port
+        """
+        if self._poller and not self._loop.is_closed():
+            self._poller.cancel()
+        self._poller = None
+        self._driver.disconnect()
+
+    def __del__(self):
+        if hasattr(self, '_poller'):
+            self._disconnect()
+
+    async def prep_for_update(self) -> str:
+        self._stop_poller()
         new_port = await update.enter_bootloader(self._driver,
                                                  self.name())
         return new_port or self.port
@@ -5,10 +5,12 @@ from threading import Event
 from typing import Dict, Optional, List, Tuple
 from contextlib import contextmanager
 from opentrons import types
+from opentrons.config import robot_configs
 from opentrons.config.pipette_config import (config_models,
                                              config_names,
                                              configs)
-from opentrons.drivers.smoothie_drivers import SimulatingDriver
+from opentrons.drivers.smoothie_drivers import SimulatingDriver, kinematics
+from opentrons.drivers.smoothie_drivers.driver_3_0 import DEFAULT_AXES_SPEED
 from . import modules
 
 
@@ -36,6 +38,72 @@ _HOME_POSITION = {'X': 418.0, 'Y': 353.0, 'Z': 218.0,
                   'A': 218.0, 'B': 19.0, 'C': 19.0}
 
 
+def resolve_attached_instruments(
+        attached: Dict[types.Mount, Dict[str, Optional[str]]],
+        expected: Dict[types.Mount, str],
+        strict: bool = True)\
+        -> Dict[types.Mount, Dict[str, Optional[str]]]:
+    """ Decide which instruments a simulator has attached.
+
+    The result is
+    - the instruments specified in `attached`, or if those do not exist,
+    - the instruments specified in `expected`, or if that is not passed,
+    - nothing
+
+    :param attached: The instruments the simulator was built with, as mounts
+                     mapped to either empty dicts or dicts containing 'model'
+                     and 'id' keys
+    :param expected: A mapping of mount to instrument model prefixes. When
+                     loading instruments from a prefix, we return the
+                     lexically-first model that matches the prefix. If the
+                     models specified in expected do not match the models
+                     specified in `attached`, :py:attr:`RuntimeError` is
+                     raised unless `strict` is ``False``.
+    :param strict: Whether mismatched expectations are an error; see
+                   :py:class:`Simulator`
+    :raises RuntimeError: If an instrument is expected but not found.
+    :returns: A dict of mount to either instrument model names or `None`.
+    """
+    to_return: Dict[types.Mount, Dict[str, Optional[str]]] = {}
+    for mount in types.Mount:
+        expected_instr = expected.get(mount, None)
+        if expected_instr and expected_instr not in\
+           config_models + config_names:
+            raise RuntimeError(
+                f'mount {mount.name}: invalid pipette type'
+                f' {expected_instr}')
+        init_instr = attached.get(mount, {})
+        found_model = init_instr.get('model', '')
+        if expected_instr and found_model\
+                and not found_model.startswith(expected_instr):
+            if strict:
+                raise RuntimeError(
+                    'mount {}: expected instrument {} but got {}'
+                    .format(mount.name, expected_instr, init_instr))
+            else:
+                to_return[mount] = {
+                    'model': find_config(expected_instr),
+                    'id': None}
+        elif found_model and expected_instr:
+            # Instrument detected matches instrument expected (note:
+            # "instrument detected" means passed in `attached`)
+            to_return[mount] = init_instr
+        elif found_model:
+            # Instrument detected and no expected instrument specified
+            to_return[mount] = init_instr
+        elif expected_instr:
+            # Expected instrument specified and no instrument detected
+            to_return[mount] = {
+                'model': find_config(expected_instr),
+                'id': None}
+        else:
+            # No instrument detected or expected
+            to_return[mount] = {
+                'model': None,
+                'id': None}
+    return to_return
+
+
 class Simulator:
     """ This is a subclass of hardware_control that only simulates the
     hardware actions. It is suitable for use on a dev machine or on
@@ -98,31 +166,49 @@ class Simulator:
         self._run_flag = Event()
         self._log = MODULE_LOG.getChild(repr(self))
         self._strict_attached = bool(strict_attached_instruments)
+        self._estimated_motion_time = 0.0
+        limits = config or robot_configs.load()
+        self._max_speeds = limits.default_max_speed
+        self._accelerations = limits.acceleration
+
+    @property
+    def estimated_motion_time(self) -> float:
+        """ How long the simulated motion would take on a real robot """
+        return self._estimated_motion_time
 
-    def update_position(self) -> Dict[str, float]:
+    def _account_motion(self, target: Dict[str, float], speed: float = None):
+        self._estimated_motion_time += kinematics.move_duration(
+            self._position, target, self._max_speeds,
+            self._accelerations, speed)
+
+    async def update_position(self) -> Dict[str, float]:
         return self._position
 
-    def move(self, target_position: Dict[str, float],
-             home_flagged_axes: bool = True, speed: float = None):
+    async def move(self, target_position: Dict[str, float],
+                   home_flagged_axes: bool = True, speed: float = None):
         if self._run_flag.is_set():
             self._log.warning("Move to {} would be blocked by pause"
                               .format(target_position))
+        self._account_motion(target_position, speed or DEFAULT_AXES_SPEED)
         self._position.update(target_position)
         self._engaged_axes.update({ax: True
                                    for ax in target_position})
 
-    def home(self, axes: List[str] = None) -> Dict[str, float]:
+    async def home(self, axes: List[str] = None) -> Dict[str, float]:
         if self._run_flag.is_set():
             self._log.warning("Home would be blocked by pause")
         # driver_3_0-> HOMED_POSITION
         checked_axes = axes or 'XYZABC'
+        self._account_motion({ax: _HOME_POSITION[ax] for ax in checked_axes})
         self._position.update({ax: _HOME_POSITION[ax]
                                for ax in checked_axes})
         self._engaged_axes.update({ax: True
                                    for ax in checked_axes})
         return self._position
 
-    def fast_home(self, axis: str, margin: float) -> Dict[str, float]:
+    async def fast_home(
+            self, axis: str, margin: float) -> Dict[str, float]:
+        self._account_motion({axis: _HOME_POSITION[axis]})
         self._position[axis] = _HOME_POSITION[axis]
         self._engaged_axes[axis] = True
         return self._position
@@ -133,60 +219,13 @@ class Simulator:
         """ Update the internal cache of attached instruments.
 
         This method allows after-init-time specification of attached simulated
-        instruments. The method will return
-        - the instruments specified at init-time, or if those do not exists,
-        - the instruments specified in expected, or if that is not passed,
-        - nothing
-
-        :param expected: A mapping of mount to instrument model prefixes. When
-                         loading instruments from a prefix, we return the
-                         lexically-first model that matches the prefix. If the
-                         models specified in expected do not match the models
-                         specified in the `attached_instruments` argument of
-                         :py:meth:`__init__`, :py:attr:`RuntimeError` is
-                         raised.
+        instruments. See :py:func:`resolve_attached_instruments`.
+
         :raises RuntimeError: If an instrument is expected but not found.
         :returns: A dict of mount to either instrument model names or `None`.
         """
-        to_return: Dict[types.Mount, Dict[str, Optional[str]]] = {}
-        for mount in types.Mount:
-            expected_instr = expected.get(mount, None)
-            if expected_instr and expected_instr not in\
-               config_models + config_names:
-                raise RuntimeError(
-                    f'mount {mount.name}: invalid pipette type'
-                    f' {expected_instr}')
-            init_instr = self._attached_instruments.get(mount, {})
-            found_model = init_instr.get('model', '')
-            if expected_instr and found_model\
-                    and not found_model.startswith(expected_instr):
-                if self._strict_attached:
-                    raise RuntimeError(
-                        'mount {}: expected instrument {} but got {}'
-                        .format(mount.name, expected_instr, init_instr))
-                else:
-                    to_return[mount] = {
-                        'model': find_config(expected_instr),
-                        'id': None}
-            elif found_model and expected_instr:
-                # Instrument detected matches instrument expected (note:
-                # "instrument detected" means passed as an argument to the
-                # constructor of this class)
-                to_return[mount] = init_instr
-            elif found_model:
-                # Instrument detected and no expected instrument specified
-                to_return[mount] = init_instr
-            elif expected_instr:
-                # Expected instrument specified and no instrument detected
-                to_return[mount] = {
-                    'model': find_config(expected_instr),
-                    'id': None}
-            else:
-                # No instrument detected or expected
-                to_return[mount] = {
-                    'model': None,
-                    'id': None}
-        return to_return
+        return resolve_attached_instruments(
+            self._attached_instruments, expected, self._strict_attached)
 
     def set_active_current(self, axis, amp):
         pass
@@ -206,7 +245,8 @@ class Simulator:
             port=port,
             which=model,
             simulating=True,
-            interrupt_callback=interrupt_callback)
+            interrupt_callback=interrupt_callback,
+            loop=self._loop)
 
     async def update_module(
             self, module: modules.AbstractModule,
@@ -261,7 +301,7 @@ class Simulator:
     def hard_halt(self):
         self._run_flag.set()
 
-    def probe(self, axis: str, distance: float) -> Dict[str, float]:
+    async def probe(self, axis: str, distance: float) -> Dict[str, float]:
         self._position[axis.upper()] = self._position[axis.upper()] + distance
         return self._position
 
@@ -0,0 +1,145 @@
+""" A client for the hardware control socket server that can have many calls
+in flight over one connection.
+"""
+
+import asyncio
+from collections import OrderedDict
+import itertools
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .socket_server import JsonStreamDecoder
+
+LOG = logging.getLogger(__name__)
+
+
+class JsonRpcError(RuntimeError):
+    """ An error reply from the server """
+    def __init__(self, code: int, message: str, data: Any = None) -> None:
+        self.code = code
+        self.message = message
+        self.data = data
+        super().__init__(f'{message} ({code})')
+
+
+class Client:
+    """ Calls hardware controller methods through a socket server.
+
+    Calls do not wait for each other: each one is sent as soon as it is made
+    and completes when its reply arrives, so many calls can share a single
+    connection. :py:meth:`batch` sends several calls in one request.
+
+    Arguments and results are in their serialized form, as described by
+    :py:mod:`opentrons.hardware_control.socket_server`.
+    """
+    def __init__(self,
+                 reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter,
+                 loop: asyncio.AbstractEventLoop = None) -> None:
+        self._loop = loop or asyncio.get_event_loop()
+        self._writer = writer
+        self._decoder = JsonStreamDecoder(reader)
+        self._ids = itertools.count()
+        # Replies we are waiting for, oldest first
+        self._pending: 'OrderedDict[int, asyncio.Future]' = OrderedDict()
+        self._reader_task = self._loop.create_task(self._read_replies())
+
+    @classmethod
+    async def connect(cls, sock_path: str,
+                      loop: asyncio.AbstractEventLoop = None) -> 'Client':
+        """ Connect to the server listening on `sock_path` """
+        reader, writer = await asyncio.open_unix_connection(
+            sock_path, loop=loop)
+        return cls(reader, writer, loop)
+
+    async def call(self, method: str, **params: Any) -> Any:
+        """ Call `method` with keyword arguments and return its result.
+
+        :raises JsonRpcError: If the server replies with an error
+        """
+        request, reply = self._request(method, params)
+        self._send(request)
+        return await reply
+
+    async def batch(self,
+                    calls: Iterable[Tuple[str, Dict[str, Any]]]) -> List[Any]:
+        """ Make several calls in one request and return their results in
+        order.
+
+        The server runs the read-only calls in a batch concurrently and the
+        rest one at a time, in order.
+
+        :param calls: Pairs of method names and keyword arguments
+        :raises JsonRpcError: If any call fails
+        """
+        requests, replies = [], []
+        for method, params in calls:
+            request, reply = self._request(method, params)
+            requests.append(request)
+            replies.append(reply)
+        if not requests:
+            return []
+        self._send(requests)
+        return await asyncio.gather(*replies, loop=self._loop)
+
+    async def close(self):
+        self._writer.close()
+        self._reader_task.cancel()
+        try:
+            await self._reader_task
+        except asyncio.CancelledError:
+            pass
+        self._fail_pending(ConnectionError('Client closed'))
+
+    def _request(self, method: str,
+                 params: Dict[str, Any]) -> Tuple[Dict[str, Any],
+                                                  asyncio.Future]:
+        request_id = next(self._ids)
+        reply = self._loop.create_future()
+        self._pending[request_id] = reply
+        return ({'jsonrpc': '2.0', 'method': method,
+                 'params': params, 'id': request_id},
+                reply)
+
+    def _send(self, request: Any):
+        if self._reader_task.done():
+            raise ConnectionError('Not connected')
+        self._writer.write(json.dumps(request).encode())
+
+    async def _read_replies(self):
+        try:
+            while True:
+                reply = await self._decoder.read_object()
+                for response in (reply if isinstance(reply, list)
+                                 else [reply]):
+                    self._resolve(response)
+        except asyncio.IncompleteReadError:
+            LOG.warning('Hardware server closed the connection')
+            self._fail_pending(ConnectionError('Connection closed'))
+
+    def _resolve(self, response: Dict[str, Any]):
+        request_id: Any = response.get('id')
+        if request_id in self._pending:
+            reply = self._pending.pop(request_id)
+        elif self._pending:
+            # Errors the server could not associate with a request have no
+            # id; replies come back in request order, so it is the oldest
+            _, reply = self._pending.popitem(last=False)
+        else:
+            LOG.warning(f'Unexpected reply {response}')
+            return
+        if reply.done():
+            return
+        if 'error' in response:
+            error = response['error']
+            reply.set_exception(JsonRpcError(
+                error.get('code'), error.get('message'), error.get('data')))
+        else:
+            reply.set_result(response.get('result'))
+
+    def _fail_pending(self, exc: Exception):
+        for pending in self._pending.values():
+            if not pending.done():
+                pending.set_exception(exc)
+        self._pending.clear()
@@ -3,12 +3,14 @@ to a hardware controller.
 """
 
 import asyncio
-from collections import namedtuple
+from collections import deque, namedtuple
 import functools
 import inspect
 import json
 import logging
-from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+import re
+from typing import (Any, Awaitable, Callable, Deque, Dict, List, Optional,
+                    Set)
 
 import jsonrpcserver  # type: ignore
 
@@ -76,8 +78,63 @@ _SERDES = {
     ),
 }
 
+#: Methods that only report state. Calls to these run concurrently with each
+#: other, in a batch or across pipelined requests
+READ_ONLY_METHODS = frozenset((
+    'current_position', 'gantry_position', 'get_attached_instruments',
+    'get_config', 'get_engaged_axes', 'get_fw_version', 'get_is_simulator',
+    'get_lights'))
+#: Methods that must not wait behind the calls they are meant to interrupt
+UNSEQUENCED_METHODS = frozenset(('stop',))
+
+
+class CallSequencer:
+    """ Orders calls that arrive concurrently, from batches or pipelined
+    requests.
+
+    Calls that change state run one at a time, in the order they arrived.
+    Read-only calls wait for every state-changing call that arrived before
+    them, but run alongside each other. Calls are ordered when they start,
+    so callers must start them in arrival order, as tasks created in order
+    are.
+    """
+    def __init__(self):
+        self._last_write: Optional[asyncio.Future] = None
+        self._reads: Set[asyncio.Future] = set()
 
-def _build_serializable_method(method_name, method):  # noqa(C901)
+    async def read(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        done = asyncio.get_event_loop().create_future()
+        self._reads.add(done)
+        try:
+            await self._wait_for([self._last_write])
+            return await call()
+        finally:
+            done.set_result(None)
+            self._reads.discard(done)
+
+    async def write(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        done = asyncio.get_event_loop().create_future()
+        before = [self._last_write, *self._reads]
+        self._last_write = done
+        self._reads = set()
+        try:
+            await self._wait_for(before)
+            return await call()
+        finally:
+            done.set_result(None)
+            if self._last_write is done:
+                self._last_write = None
+
+    @staticmethod
+    async def _wait_for(futures: List[Optional[asyncio.Future]]):
+        pending = [fut for fut in futures if fut and not fut.done()]
+        if pending:
+            # Shielded so a cancelled call does not cancel its predecessors
+            await asyncio.wait([asyncio.shield(fut) for fut in pending])
+
+
+def _build_serializable_method(  # noqa(C901)
+        method_name, method, sequencer: CallSequencer = None):
     """ Build the method to actually server over jsonrpc.
 
     To serve over jsonrpc, we need to have an interface that is fully
@@ -86,6 +143,9 @@ def _build_serializable_method(method_name, method):  # noqa(C901)
     serializable because that would take away from the readability of rich
     typing for the python-python interface. Instead, we'll build adapters here
     that transform things to and from json.
+
+    If `sequencer` is specified, calls are ordered with it according to
+    :py:data:`READ_ONLY_METHODS` and :py:data:`UNSEQUENCED_METHODS`.
     """
     # Complexity lint check disabled because most of the complexity is in the
     # wrapper functions
@@ -122,15 +182,27 @@ def _build_serializable_method(method_name, method):  # noqa(C901)
                 # need to have our serdes handle defaults
                 continue
             transformed[argname] = transformers[argname](val)
-        ret = await async_wrapper(**transformed)
+        call = functools.partial(async_wrapper, **transformed)
+        if not sequencer or method_name in UNSEQUENCED_METHODS:
+            ret = await call()
+        elif method_name in READ_ONLY_METHODS:
+            ret = await sequencer.read(call)
+        else:
+            ret = await sequencer.write(call)
         return return_transformer(ret)
 
     return wrapper
 
 
 def build_jrpc_methods(api: API) -> jsonrpcserver.methods.Methods:
-    """ Builds the Methods object for jrpcserver from an api instance """
+    """ Builds the Methods object for jrpcserver from an api instance.
+
+    The methods share a :py:class:`CallSequencer`, so calls made through
+    them concurrently behave as if the state-changing ones were made one
+    after another.
+    """
     methods = jsonrpcserver.methods.Methods()
+    sequencer = CallSequencer()
 
     def _scrape(meth):
         return inspect.iscoroutinefunction(meth)\
@@ -144,27 +216,119 @@ def build_jrpc_methods(api: API) -> jsonrpcserver.methods.Methods:
     # into our method list
     for mname, mobj in inspect.getmembers(
             api.__class__, _scrape):
-        wrapper = _build_serializable_method(mname, getattr(api, mname))
+        wrapper = _build_serializable_method(
+            mname, getattr(api, mname), sequencer)
         methods.add(**{mname: wrapper})
     return methods
 
 
+# Characters that open a JSON-RPC message (a request object or a batch)
+_VALUE_START = re.compile(rb'[\[{]')
+# Characters that change the nesting depth or start a string
+_STRUCTURE = re.compile(rb'[][{}"]')
+# Characters that end a string or escape the next character
+_STRING_SPECIAL = re.compile(rb'["\\]')
+
+
+class JsonFramer:
+    """ Splits a stream of concatenated JSON objects and arrays into the
+    bytes of each one.
+
+    Messages on the socket are not delimited, so the framer tracks nesting
+    and strings as data arrives. It resumes scanning where the last call
+    stopped and jumps between structural characters with regexes, so the
+    time to frame a message is linear in its size no matter how it is split
+    across reads. Anything between messages that cannot start an object or
+    an array is discarded, so garbage cannot wedge the stream.
+    """
+    def __init__(self):
+        self._buf = bytearray()
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+
+    @property
+    def buffered(self) -> bytes:
+        """ Data received that is not yet part of a complete message """
+        return bytes(self._buf)
+
+    def feed(self, data: bytes):
+        self._buf.extend(data)
+
+    def next_frame(self) -> Optional[bytes]:  # noqa(C901)
+        """ Return the next complete message, or ``None`` if more data is
+        needed.
+        """
+        buf = self._buf
+        pos = self._pos
+        while True:
+            if self._in_string:
+                match = _STRING_SPECIAL.search(buf, pos)
+                if not match:
+                    pos = len(buf)
+                    break
+                if match.group() == b'"':
+                    self._in_string = False
+                    pos = match.end()
+                elif match.end() < len(buf):
+                    # Skip the escaped character
+                    pos = match.end() + 1
+                else:
+                    # The escaped character has not arrived yet
+                    pos = match.start()
+                    break
+            elif not self._depth:
+                match = _VALUE_START.search(buf, pos)
+                if not match:
+                    buf.clear()
+                    pos = 0
+                    break
+                del buf[:match.start()]
+                self._depth = 1
+                pos = 1
+            else:
+                match = _STRUCTURE.search(buf, pos)
+                if not match:
+                    pos = len(buf)
+                    break
+                pos = match.end()
+                char = match.group()
+                if char == b'"':
+                    self._in_string = True
+                elif char in b'[{':
+                    self._depth += 1
+                else:
+                    self._depth -= 1
+                    if not self._depth:
+                        frame = bytes(buf[:pos])
+                        del buf[:pos]
+                        self._pos = 0
+                        return frame
+        self._pos = pos
+        return None
+
+
 class JsonStreamDecoder:
+    """ Read JSON objects one at a time from a stream of concatenated
+    objects, like the responses from the server
+    """
+    #: How much to ask the stream for at a time
+    READ_SIZE = 65536
+
     def __init__(self, reader: asyncio.StreamReader):
         self._reader = reader
-        self._buf = b''
-        self._decoder = json.JSONDecoder()
+        self._framer = JsonFramer()
 
     async def read_object(self) -> Any:
         while True:
-            self._buf += await self._reader.read(1)
-            try:
-                decoded, offset = self._decoder.raw_decode(self._buf.decode())
-            except json.JSONDecodeError:
-                pass
-            else:
-                self._buf = self._buf[offset:]
-                return decoded
+            frame = self._framer.next_frame()
+            if frame is not None:
+                return json.loads(frame.decode())
+            data = await self._reader.read(self.READ_SIZE)
+            if not data:
+                raise asyncio.IncompleteReadError(
+                    self._framer.buffered, None)
+            self._framer.feed(data)
 
 
 class Server:
@@ -189,6 +353,26 @@ class Server:
             LOG.warning('protocol not present on unregister - double call?')
 
     async def _dispatch(self, call_str: str) -> str:
+        # Only a batch needs decoding here; single calls go straight to
+        # jsonrpcserver, which parses them itself
+        if not call_str.lstrip().startswith('['):
+            return await self._dispatch_one(call_str)
+        try:
+            batch = json.loads(call_str)
+        except json.JSONDecodeError:
+            batch = None
+        if not isinstance(batch, list) or not batch:
+            return await self._dispatch_one(call_str)
+        # jsonrpcserver would gather the calls in a batch, which does not
+        # start them in order; start them in order so the sequencer can
+        # order them
+        tasks = [self._loop.create_task(self._dispatch_one(json.dumps(call)))
+                 for call in batch]
+        replies = [reply for reply in await asyncio.gather(*tasks)
+                   if reply]
+        return '[' + ', '.join(replies) + ']' if replies else ''
+
+    async def _dispatch_one(self, call_str: str) -> str:
         result = await jsonrpcserver.async_dispatcher.dispatch(
             call_str, self._methods, debug=True)
         return str(result)
@@ -221,10 +405,10 @@ class JsonRpcProtocol(asyncio.Protocol):
         self._api = api
         self._loop = loop
         self._log = LOG.getChild('jsonrpc')
-        self._decoder = json.JSONDecoder()
-        self._buffer = ''
+        self._framer = JsonFramer()
         self._transport: Optional[asyncio.Transport] = None
-        self._inflight: Set[asyncio.Future] = set()
+        # Dispatches in the order their requests arrived
+        self._inflight: Deque[asyncio.Future] = deque()
         self._onclose = on_close
         self._dispatch = dispatch
 
@@ -245,60 +429,43 @@ class JsonRpcProtocol(asyncio.Protocol):
     def resume_writing(self):
         self._log.debug('resume writing')
 
-    def data_received(self, data: bytes):  # noqa(C901)
+    def data_received(self, data: bytes):
         self._log.debug(f'data received: {data}')
-        self._buffer += data.decode()  # hope this isn't incomplete
-        try:
-            _, pos = self._decoder.raw_decode(self._buffer)
-        except json.JSONDecodeError:
-            # If someone sends us garbage that isn't valid json, we need to
-            # not get stuck in a bad state. If we're always accumulating data
-            # until we no longer get an error, then consider if the first thing
-            # we saw was "aaaaaaaa" - this would always be invalid because it's
-            # impossible to make it valid json just by adding more data.
-            # Since we are only accepting jsonrpc, every message should be an
-            # object and therefore should start with {.
-            if self._buffer[0] != '{':
-                obj_start = self._buffer.find('{')
-                if obj_start == -1:
-                    # There is no '{' character in the buffer, wait for more
-                    # data
-                    return
-                else:
-                    # Recurse now that we've made the buffer safe
-                    self._buffer = self._buffer[obj_start:]
-                    return self.data_received(b'')
-            else:
-                # This is an incomplete json object, we can't dispatch anything
-                # and should wait for more data
+        # If someone sends us garbage that isn't valid json, we need to not
+        # get stuck in a bad state. Since we are only accepting jsonrpc,
+        # every message should be an object (or a batch of them), and the
+        # framer drops anything that can't start one.
+        self._framer.feed(data)
+        while True:
+            frame = self._framer.next_frame()
+            if frame is None:
                 return
-        to_dispatch = self._buffer[:pos]
-        self._buffer = self._buffer[pos:]
-        task = self._loop.create_task(self._dispatch(to_dispatch))
-        self._inflight.add(task)
-
-        def done_callback(fut):
-            try:
-                res = fut.result()
-            except asyncio.InvalidStateError:
-                self._log.exception("Invalid state in jrpc dispatch")
-                pass
-            except asyncio.CancelledError as e:
-                self._log.error("jsonrpc invocation cancelled")
-                self._transport.write(
-                    _build_jrpc_error('execution cancelled', e).encode())
-            except Exception as e:
-                self._log.exception('Uncaught exception in jsonrpc dispatch')
-                self._transport.write(
-                    _build_jrpc_error('uncaught exception in dispatch',
-                                      e).encode())
-            else:
-                if self._transport:
-                    self._transport.write(res.encode())
-            finally:
-                self._inflight.remove(task)
+            self._dispatch_frame(frame.decode())
 
-        task.add_done_callback(done_callback)
+    def _dispatch_frame(self, to_dispatch: str):
+        task = self._loop.create_task(self._dispatch(to_dispatch))
+        self._inflight.append(task)
+        task.add_done_callback(self._send_replies)
+
+    def _send_replies(self, _finished: asyncio.Future):
+        """ Send the replies of finished dispatches. Replies go out in the
+        order their requests arrived, so a client can pipeline requests and
+        match up the replies even without ids.
+        """
+        while self._inflight and self._inflight[0].done():
+            reply = self._reply_for(self._inflight.popleft())
+            if self._transport:
+                self._transport.write(reply.encode())
+
+    def _reply_for(self, fut: asyncio.Future) -> str:
+        try:
+            return fut.result()
+        except asyncio.CancelledError as e:
+            self._log.error("jsonrpc invocation cancelled")
+            return _build_jrpc_error('execution cancelled', e)
+        except Exception as e:
+            self._log.exception('Uncaught exception in jsonrpc dispatch')
+            return _build_jrpc_error('uncaught exception in dispatch', e)
 
     def eof_received(self):
         self._log.info(f'eof received')
@@ -8,6 +8,8 @@ from opentrons.commands import CommandPublisher
 import opentrons.config.robot_configs as rc
 from opentrons.config import feature_flags as fflags
 from opentrons.hardware_control import adapters, modules
+from opentrons.hardware_control.fast_simulator import (FastSimulator,
+                                                       InlineAdapter)
 from opentrons.hardware_control.simulator import Simulator
 from opentrons.hardware_control.types import CriticalPoint, Axis
 from .labware import (Well, Labware, load, get_labware_definition,
@@ -48,9 +50,13 @@ class ProtocolContext(CommandPublisher):
                 self._is_orig = True
                 self._current = adapters.SynchronousAdapter.build(
                     hc.API.build_hardware_simulator)
-            elif isinstance(hardware, adapters.SynchronousAdapter):
+            elif isinstance(hardware, (adapters.SynchronousAdapter,
+                                       InlineAdapter)):
                 self._is_orig = False
                 self._current = hardware
+            elif isinstance(hardware, FastSimulator):
+                self._is_orig = False
+                self._current = InlineAdapter(hardware)
             else:
                 self._is_orig = False
                 self._current = adapters.SynchronousAdapter(hardware)
@@ -63,8 +69,11 @@ class ProtocolContext(CommandPublisher):
             if self._is_orig:
                 self._is_orig = False
                 self._current.join()
-            if isinstance(hardware, adapters.SynchronousAdapter):
+            if isinstance(hardware, (adapters.SynchronousAdapter,
+                                     InlineAdapter)):
                 self._current = hardware
+            elif isinstance(hardware, FastSimulator):
+                self._current = InlineAdapter(hardware)
             elif isinstance(hardware, hc.HardwareAPILike):
                 self._current = adapters.SynchronousAdapter(hardware)
             else:
@@ -313,24 +322,28 @@ class ProtocolContext(CommandPublisher):
                                self._deck_layout.position_for(
                                     resolved_location))
         hc_mod_instance = None
-        hw = self._hw_manager.hardware._api._backend
+        hardware = self._hw_manager.hardware
         mod_class = {
             'magdeck': MagneticModuleContext,
             'tempdeck': TemperatureModuleContext,
             'thermocycler': ThermocyclerContext}[resolved_name]
-        for mod in self._hw_manager.hardware.discover_modules():
+        for mod in hardware.discover_modules():
             if mod.name() == resolved_name:
                 hc_mod_instance = mod
                 break
 
-        if isinstance(hw, Simulator) and hc_mod_instance is None:
+        if hc_mod_instance is None\
+                and isinstance(hardware._api._backend, Simulator):
             mod_type = {
                 'magdeck': modules.magdeck.MagDeck,
                 'tempdeck': modules.tempdeck.TempDeck,
                 'thermocycler': modules.thermocycler.Thermocycler
                 }[resolved_name]
-            hc_mod_instance = adapters.SynchronousAdapter(mod_type(
-                port='', simulating=True, loop=self._loop))
+            if isinstance(hardware, InlineAdapter):
+                hc_mod_instance = hardware.build_module(mod_type)
+            else:
+                hc_mod_instance = adapters.SynchronousAdapter(mod_type(
+                    port='', simulating=True, loop=self._loop))
         if hc_mod_instance:
             mod_ctx = mod_class(self,
                                 hc_mod_instance,
@@ -1449,7 +1462,7 @@ class InstrumentContext(CommandPublisher):
         kwargs['disposal_volume'] = 0
         return self.transfer(volume, source, dest, **kwargs)
 
-    @cmds.publish.both(command=cmds.transfer)
+    @cmds.publish.both(command=cmds.transfer)  # noqa(C901)
     def transfer(self,
                  volume: Union[float, Sequence[float]],
                  source,
@@ -1535,6 +1548,23 @@ class InstrumentContext(CommandPublisher):
               gradient is linear (lambda x: x), however a method can be passed
               with the `gradient` keyword argument to create a custom curve.
 
+            * *optimize_path* (``boolean``) --
+              If `True`, the steps of the transfer are reordered to shorten
+              the path the pipette travels between wells. Steps that
+              aspirate from a well stay in order with the steps that
+              dispense to it. If `False` (default), wells are visited in the
+              order given. See :py:attr:`.transfers.Transfer.optimize_path`.
+
+            * *packing* (``string``) --
+              (:py:meth:`distribute` only)
+
+                - 'in_order': (default) aspirate for destinations in the
+                  order given, aspirating again whenever the next volume
+                  does not fit.
+                - 'first_fit_decreasing': pack nearby destinations into as
+                  few aspirates as possible. See
+                  :py:attr:`.transfers.Transfer.packing_strategy`.
+
         :returns: This instance
         """
         self._log.debug("Transfer {} from {} to {}".format(
@@ -1553,6 +1583,10 @@ class InstrumentContext(CommandPublisher):
         if isinstance(new_tip, str):
             new_tip = types.TransferTipPolicy[new_tip.upper()]
 
+        packing = kwargs.get('packing')
+        if isinstance(packing, str):
+            packing = transfers.PackingStrategy[packing.upper()]
+
         blow_out = None
         if kwargs.get('blow_out'):
             blow_out = transfers.BlowOutStrategy.TRASH
@@ -1584,18 +1618,28 @@ class InstrumentContext(CommandPublisher):
             drop_tip_strategy=drop_tip,
             blow_out_strategy=blow_out or default_args.blow_out_strategy,
             touch_tip_strategy=(touch_tip or
-                                default_args.touch_tip_strategy)
+                                default_args.touch_tip_strategy),
+            optimize_path=kwargs.get('optimize_path', False),
+            packing_strategy=packing or default_args.packing_strategy
         )
         transfer_options = transfers.TransferOptions(transfer=transfer_args,
                                                      mix=mix_opts)
         plan = transfers.TransferPlan(volume, source, dest, self, max_volume,
                                       kwargs['mode'], transfer_options)
+        if plan.path_optimization:
+            self._log.info(
+                "Reordered transfer to travel {:.0f}mm instead of {:.0f}mm"
+                .format(plan.path_optimization.optimized,
+                        plan.path_optimization.original))
+        if plan.packing:
+            self._log.info(
+                "Packed distribute into {} aspirates instead of {}"
+                .format(plan.packing.packed, plan.packing.in_order))
         self._execute_transfer(plan)
         return self
 
     def _execute_transfer(self, plan: transfers.TransferPlan):
-        for cmd in plan:
-            getattr(self, cmd['method'])(*cmd['args'], **cmd['kwargs'])
+        plan.compile().execute(self)
 
     @staticmethod
     def _mix_from_kwargs(
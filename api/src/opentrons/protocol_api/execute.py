@@ -43,6 +43,11 @@ class ExceptionInProtocolError(Exception):
             ' [line {}]'.format(self.line) if self.line else '',
             self.message)
 
+    def format_traceback(self) -> str:
+        """ The traceback of the original exception, for display """
+        return ''.join(traceback.format_exception(
+            type(self.original_exc), self.original_exc, self.original_tb))
+
 
 class MalformedProtocolError(Exception):
     def __init__(self, message):
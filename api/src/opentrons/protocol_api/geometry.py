@@ -3,7 +3,7 @@ import functools
 import logging
 import pkgutil
 import json
-from typing import Any, List, Optional, Tuple, Union, Dict
+from typing import Any, List, NamedTuple, Optional, Tuple, Union, Dict
 
 from opentrons import types
 from .labware import (Labware, Well, ModuleGeometry,
@@ -13,11 +13,48 @@ from opentrons.hardware_control.types import CriticalPoint
 
 MODULE_LOG = logging.getLogger(__name__)
 
+# How far from the line the critical point travels along something on the
+# deck can be and still be hit. The nozzles of a multichannel pipette span
+# 63mm in y from its critical point (forward from the back nozzle, or either
+# way from the center), and tips and nozzles are a few mm across.
+TRAVEL_X_CLEARANCE = 10.0
+TRAVEL_Y_CLEARANCE = 70.0
+
+# Slots that a module loaded into a slot covers as well as that slot
+EXTRA_SLOTS_COVERED = {
+    'thermocycler': {7: (8, 10, 11)}
+}
+
 
 def max_many(*args):
     return functools.reduce(max, args[1:], args[0])
 
 
+class _ArcPlan(NamedTuple):
+    """ The parts of a move plan that only depend on the labware at either
+    end of the move and on the deck, cached by :py:class:`Deck`
+    """
+    origin_cp_override: Optional[CriticalPoint]
+    dest_cp_override: Optional[CriticalPoint]
+
+
+def _arc_plan(from_lw: Optional[Labware],
+              to_lw: Optional[Labware],
+              deck: 'Deck') -> _ArcPlan:
+    key = (from_lw, to_lw, deck.version)
+    plan = deck._arc_plans.get(key)
+    if plan is None:
+        from_center = 'centerMultichannelOnWells'\
+            in quirks_from_any_parent(from_lw)
+        to_center = 'centerMultichannelOnWells'\
+            in quirks_from_any_parent(to_lw)
+        plan = _ArcPlan(
+            CriticalPoint.XY_CENTER if from_center else None,
+            CriticalPoint.XY_CENTER if to_center else None)
+        deck._arc_plans[key] = plan
+    return plan
+
+
 def plan_moves(
         from_loc: types.Location,
         to_loc: types.Location,
@@ -67,12 +104,11 @@ def plan_moves(
     to_lw, to_well = _split_loc_labware(to_loc)
     from_point = from_loc.point
     from_lw, from_well = _split_loc_labware(from_loc)
-    dest_quirks = quirks_from_any_parent(to_lw)
-    from_quirks = quirks_from_any_parent(from_lw)
-    from_center = 'centerMultichannelOnWells' in from_quirks
-    to_center = 'centerMultichannelOnWells' in dest_quirks
-    dest_cp_override = CriticalPoint.XY_CENTER if to_center else None
-    origin_cp_override = CriticalPoint.XY_CENTER if from_center else None
+    # Moves usually go back and forth between the same few labware, so the
+    # parts of the plan that depend only on them (and the deck) are cached
+    plan = _arc_plan(from_lw, to_lw, deck)
+    dest_cp_override = plan.dest_cp_override
+    origin_cp_override = plan.origin_cp_override
 
     is_same_location = ((to_lw and to_lw == from_lw)
                         and (to_well and to_well == from_well))
@@ -97,9 +133,12 @@ def plan_moves(
         else:
             from_safety = from_lw.highest_z + well_z_margin
     else:
-        # One of our labwares is invalid so we have to just go above
-        # deck.highest_z since we don’t know where we are
-        to_safety = deck.highest_z + lw_z_margin
+        # We are moving between labware (or do not know what we are moving
+        # from), so we have to go above everything on the deck that the
+        # pipette could hit on its way
+        to_safety = deck.highest_z_along(
+            from_point, to_point,
+            TRAVEL_X_CLEARANCE, TRAVEL_Y_CLEARANCE) + lw_z_margin
         from_safety = 0.0  # (ignore since it’s in a max())
 
     safe = max_many(
@@ -116,6 +155,33 @@ def plan_moves(
             (to_point, dest_cp_override)]
 
 
+def _segment_hits_rect(start: types.Point, end: types.Point,
+                       rect: Tuple[float, float, float, float]) -> bool:
+    """ Whether the line from start to end in the XY plane passes through
+    the rectangle (left, front, right, back), by Liang-Barsky clipping
+    """
+    left, front, right, back = rect
+    dx = end.x - start.x
+    dy = end.y - start.y
+    enter, leave = 0.0, 1.0
+    for direction, distance in ((-dx, start.x - left),
+                                (dx, right - start.x),
+                                (-dy, start.y - front),
+                                (dy, back - start.y)):
+        if direction == 0:
+            if distance < 0:
+                return False
+            continue
+        crossing = distance / direction
+        if direction < 0:
+            enter = max(enter, crossing)
+        else:
+            leave = min(leave, crossing)
+        if enter > leave:
+            return False
+    return True
+
+
 DeckItem = Union[Labware, ModuleGeometry, ThermocyclerGeometry]
 
 
@@ -131,6 +197,11 @@ class Deck(UserDict):
                                                 0)
                            for idx in range(12)}
         self._highest_z = 0.0
+        # Changes whenever what is on the deck might have changed
+        self._version = 0
+        self._arc_plans: Dict[Tuple[Any, ...], _ArcPlan] = {}
+        self._footprints: Optional[
+            List[Tuple[Tuple[float, float, float, float], DeckItem]]] = None
         # TODO: support deck loadName as a param
         def_path = 'shared_data/deck/definitions/1/ot2_standard.json'
         self._definition = json.loads(  # type: ignore
@@ -165,6 +236,7 @@ class Deck(UserDict):
         checked_key = self._check_name(key)
         old = self.data[checked_key]
         self.data[checked_key] = None
+        self._changed()
         if old:
             self.recalculate_high_z()
 
@@ -183,6 +255,7 @@ class Deck(UserDict):
                                  .format(key, self.data[key_int]))
         self.data[key_int] = val
         self._highest_z = max(val.highest_z, self._highest_z)
+        self._changed()
 
     def __contains__(self, key: object) -> bool:
         try:
@@ -199,6 +272,62 @@ class Deck(UserDict):
         self._highest_z = 0.0
         for item in [lw for lw in self.data.values() if lw]:
             self._highest_z = max(item.highest_z, self._highest_z)
+        self._changed()
+
+    def _changed(self):
+        self._version += 1
+        # Plans for older versions will never be used again
+        self._arc_plans.clear()
+        self._footprints = None
+
+    @property
+    def version(self) -> int:
+        """ A number that changes whenever the deck changes, so that
+        anything computed from its contents can tell when to recompute it
+        """
+        return self._version
+
+    def _slot_rect(self, slot: int) -> Tuple[float, float, float, float]:
+        slot_def = self.get_slot_definition(str(slot))
+        x, y, _ = slot_def['position']
+        return (x, y,
+                x + slot_def['boundingBox']['xDimension'],
+                y + slot_def['boundingBox']['yDimension'])
+
+    def _build_footprints(
+            self) -> List[Tuple[Tuple[float, float, float, float], DeckItem]]:
+        """ The rectangles (left, front, right, back) of the slots that
+        each item on the deck covers, as an index to find what a move passes
+        over
+        """
+        footprints = []
+        for slot, item in self.data.items():
+            if not item:
+                continue
+            slots = [slot]
+            if isinstance(item, ModuleGeometry):
+                slots.extend(EXTRA_SLOTS_COVERED.get(
+                    item.load_name, {}).get(slot, ()))
+            for covered in slots:
+                footprints.append((self._slot_rect(covered), item))
+        return footprints
+
+    def highest_z_along(self, start: types.Point, end: types.Point,
+                        x_clearance: float = 0.0,
+                        y_clearance: float = 0.0) -> float:
+        """ The tallest point of anything on the deck that is within
+        `x_clearance` and `y_clearance` of the line from `start` to `end` in
+        the XY plane. This is never more than :py:attr:`highest_z`.
+        """
+        if self._footprints is None:
+            self._footprints = self._build_footprints()
+        highest = 0.0
+        for (left, front, right, back), item in self._footprints:
+            rect = (left - x_clearance, front - y_clearance,
+                    right + x_clearance, back + y_clearance)
+            if _segment_hits_rect(start, end, rect):
+                highest = max(highest, item.highest_z)
+        return highest
 
     def get_slot_definition(self, slot_name) -> Dict[str, Any]:
         slots: List[Dict] = self._definition['locations']['orderedSlots']
@@ -7,6 +7,7 @@ and labware calibration offsets. It contains all the code necessary to
 transform from labware symbolic points (such as "well a1 of an opentrons
 tiprack") to points in deck coordinates.
 """
+import functools
 import logging
 import json
 import re
@@ -16,14 +17,19 @@ import shutil
 import sys
 from pathlib import Path
 from collections import defaultdict
+from collections.abc import Mapping
 from enum import Enum, auto
 from hashlib import sha256
-from itertools import takewhile, dropwhile
-from typing import Any, List, Dict, Optional, Union, Tuple
+from itertools import dropwhile
+from typing import (
+    Any, Callable, Iterable, Iterator, List, Dict, Optional, Union, Tuple)
+from typing import Mapping as MappingType
 
 from opentrons.types import Location
 from opentrons.types import Point
 from opentrons.config import CONFIG
+from opentrons.protocols.parse import validate_labware_definition
+from .labware_bundle import LabwareBundle
 
 MODULE_LOG = logging.getLogger(__name__)
 
@@ -32,6 +38,8 @@ OPENTRONS_NAMESPACE = 'opentrons'
 CUSTOM_NAMESPACE = 'custom_beta'
 STANDARD_DEFS_PATH = Path(sys.modules['opentrons'].__file__).parent /\
     'shared_data' / 'labware' / 'definitions' / '2'
+# Built along with the package from STANDARD_DEFS_PATH; see labware_bundle
+STANDARD_BUNDLE_PATH = STANDARD_DEFS_PATH.parent / '2.bundle'
 
 
 class OutOfTipsError(Exception):
@@ -56,6 +64,11 @@ class Well:
     It provides functions to return positions used in operations on the well
     such as :py:meth:`top`, :py:meth:`bottom`
     """
+    # Labware can have thousands of wells
+    __slots__ = ('_display_name', '_offset_in_parent', '_position', '_parent',
+                 '_has_tip', '_tip_slot', '_shape', '_length', '_width',
+                 '_diameter', 'max_volume', '_depth')
+
     def __init__(self, well_props: dict,
                  parent: Location,
                  display_name: str,
@@ -76,15 +89,17 @@ class Well:
                        front-left corner of a labware)
         """
         self._display_name = display_name
-        self._position\
-            = Point(well_props['x'],
-                    well_props['y'],
-                    well_props['z'] + well_props['depth']) + parent.point
+        self._offset_in_parent = Point(well_props['x'],
+                                       well_props['y'],
+                                       well_props['z'] + well_props['depth'])
+        self._position = self._offset_in_parent + parent.point
 
         if not parent.labware:
             raise ValueError("Wells must have a parent")
         self._parent = parent.labware
         self._has_tip = has_tip
+        # Where this well's tip state lives, if its labware tracks it
+        self._tip_slot: Optional[Tuple['TipTracker', int, int]] = None
         self._shape = well_shapes.get(well_props['shape'])
         if self._shape is WellShape.RECTANGULAR:
             self._length = well_props['xDimension']
@@ -105,13 +120,26 @@ class Well:
     def parent(self) -> 'Labware':
         return self._parent  # type: ignore
 
+    def _move_parent(self, parent_point: Point):
+        """ Move the well along with its parent, which is now at
+        `parent_point`
+        """
+        self._position = self._offset_in_parent + parent_point
+
     @property
     def has_tip(self) -> bool:
+        if self._tip_slot:
+            tracker, column, row = self._tip_slot
+            return tracker.has_tip(column, row)
         return self._has_tip
 
     @has_tip.setter
     def has_tip(self, value: bool):
-        self._has_tip = value
+        if self._tip_slot:
+            tracker, column, row = self._tip_slot
+            tracker.set_tip(column, row, value)
+        else:
+            self._has_tip = value
 
     @property
     def diameter(self) -> Optional[float]:
@@ -125,7 +153,8 @@ class Well:
                  front-left corner of slot 1 as (0,0,0)). If z is specified,
                  returns a point offset by z mm from top-center
         """
-        return Location(self._position + Point(0, 0, z), self)
+        x, y, top_z = self._position
+        return Location(Point(x, y, top_z + z), self)
 
     def bottom(self, z: float = 0.0) -> Location:
         """
@@ -135,9 +164,8 @@ class Well:
                  slot 1 as (0,0,0)). If z is specified, returns a point
                  offset by z mm from bottom-center
         """
-        top = self.top()
-        bottom_z = top.point.z - self._depth + z
-        return Location(Point(x=top.point.x, y=top.point.y, z=bottom_z), self)
+        x, y, top_z = self._position
+        return Location(Point(x, y, top_z - self._depth + z), self)
 
     def center(self) -> Location:
         """
@@ -145,9 +173,8 @@ class Well:
         of the well relative to the deck (with the front-left corner of slot 1
         as (0,0,0))
         """
-        top = self.top()
-        center_z = top.point.z - (self._depth / 2.0)
-        return Location(Point(x=top.point.x, y=top.point.y, z=center_z), self)
+        x, y, top_z = self._position
+        return Location(Point(x, y, top_z - (self._depth / 2.0)), self)
 
     def _from_center_cartesian(
             self, x: float, y: float, z: float) -> Point:
@@ -189,15 +216,145 @@ class Well:
 
     def __eq__(self, other: object) -> bool:
         """
-        Assuming that equality of wells in this system is having the same
-        absolute coordinates for the top.
+        Wells are equal if they are the same well of the same labware. This
+        does not change when the labware is calibrated, which moves its wells
+        in place.
         """
         if not isinstance(other, Well):
             return NotImplemented
-        return self.top().point == other.top().point
+        return self._parent is other._parent\
+            and self._offset_in_parent == other._offset_in_parent
 
     def __hash__(self):
-        return hash(self.top().point)
+        return hash((id(self._parent), self._offset_in_parent))
+
+
+class TipTracker:
+    """
+    Tracks which wells of a labware have tips, by well name.
+
+    Each column is a bitmask in which bit n is set if the nth well from the
+    back of the column has a tip, so finding a run of tips in a column (which
+    is what a multichannel pipette needs) takes a few integer operations
+    instead of a walk over the wells.
+    """
+    def __init__(self, columns: List[List[str]], has_tips: bool) -> None:
+        self._columns = columns
+        self._full = [(1 << len(column)) - 1 for column in columns]
+        self._masks = [0] * len(columns)
+        self._positions: Dict[str, Tuple[int, int]] = {
+            name: (col_idx, row_idx)
+            for col_idx, column in enumerate(columns)
+            for row_idx, name in enumerate(column)}
+        self.reset(has_tips)
+
+    def reset(self, has_tips: bool = True):
+        self._masks = list(self._full) if has_tips else [0] * len(self._full)
+
+    def position(self, name: str) -> Tuple[int, int]:
+        """ The column and row index of a well """
+        return self._positions[name]
+
+    def has_tip(self, column: int, row: int) -> bool:
+        return bool(self._masks[column] >> row & 1)
+
+    def set_tip(self, column: int, row: int, has_tip: bool):
+        if has_tip:
+            self._masks[column] |= 1 << row
+        else:
+            self._masks[column] &= ~(1 << row)
+
+    @staticmethod
+    def _first_run(mask: int, length: int) -> Optional[int]:
+        """ The index of the first set bit in mask, if it starts a run of at
+        least `length` set bits
+        """
+        if not mask:
+            return None
+        start = (mask & -mask).bit_length() - 1
+        run = mask >> start
+        # The trailing ones of run: the bits below its lowest clear bit
+        run_length = (~run & (run + 1)).bit_length() - 1
+        return start if run_length >= length else None
+
+    def first_run(self, length: int, with_tips: bool = True,
+                  start: str = None) -> Optional[str]:
+        """ The first well of the first column whose first well with (or
+        without) a tip starts a run of `length` such wells, ignoring the wells
+        before `start`
+        """
+        first_col, first_row = self.position(start) if start else (0, 0)
+        for col_idx in range(first_col, len(self._masks)):
+            mask = self._masks[col_idx]
+            if not with_tips:
+                mask = self._full[col_idx] & ~mask
+            if col_idx == first_col:
+                mask &= ~((1 << first_row) - 1)
+            row_idx = self._first_run(mask, length)
+            if row_idx is not None:
+                return self._columns[col_idx][row_idx]
+        return None
+
+    def _bits(self, start: str, count: int) -> Tuple[int, int, int]:
+        """ The column of start, the number of wells from start to at most
+        count, and the mask of those wells
+        """
+        col_idx, row_idx = self.position(start)
+        count = min(len(self._columns[col_idx]) - row_idx, count)
+        return col_idx, count, ((1 << count) - 1) << row_idx
+
+    def remove(self, start: str, count: int) -> bool:
+        """ Remove the tips from `count` wells down the column from `start`.
+        Returns ``False``, changing nothing, if any of them has no tip.
+        """
+        col_idx, _, bits = self._bits(start, count)
+        if self._masks[col_idx] & bits != bits:
+            return False
+        self._masks[col_idx] &= ~bits
+        return True
+
+    def add(self, start: str, count: int) -> Optional[str]:
+        """ Put tips back in `count` wells down the column from `start`.
+        If any of them already has a tip, change nothing and return the first
+        one that does.
+        """
+        col_idx, _, bits = self._bits(start, count)
+        occupied = self._masks[col_idx] & bits
+        if occupied:
+            row_idx = (occupied & -occupied).bit_length() - 1
+            return self._columns[col_idx][row_idx]
+        self._masks[col_idx] |= bits
+        return None
+
+
+class _LazyIndex(Mapping):
+    """ A read-only mapping whose values are built when first looked up """
+    def __init__(self, keys: Iterable[str],
+                 build: Callable[[str], Any]) -> None:
+        self._keys = dict.fromkeys(keys)
+        self._build = build
+        self._values: Dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            if key not in self._keys:
+                raise
+        value = self._values[key] = self._build(key)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
 
 
 class Labware:
@@ -251,10 +408,10 @@ class Labware:
             dn = definition['metadata']['displayName']
         self._display_name = "{} on {}".format(dn, str(parent.labware))
         self._calibrated_offset: Point = Point(0, 0, 0)
-        self._wells: List[Well] = []
         # Directly from definition
         self._well_definition = definition['wells']
-        self._parameters = definition['parameters']
+        # Copied because calibration can change the tip length
+        self._parameters = dict(definition['parameters'])
         offset = definition['cornerOffsetFromSlot']
         self._dimensions = definition['dimensions']
         # Inferred from definition
@@ -264,14 +421,15 @@ class Labware:
         self._offset\
             = Point(offset['x'], offset['y'], offset['z']) + parent.point
         self._parent = parent.labware
+        self._pattern = re.compile(r'^([A-Z]+)([1-9][0-9]*)$', re.X)
+        self._build_wells()
         # Applied properties
         self.set_calibration(self._calibrated_offset)
 
-        self._pattern = re.compile(r'^([A-Z]+)([1-9][0-9]*)$', re.X)
         self._definition = definition
 
     def __getitem__(self, key: str) -> Well:
-        return self.wells_by_name()[key]
+        return self._wells_by_name[key]
 
     @property
     def parent(self) -> Union['Labware', 'Well', str, 'ModuleGeometry', None]:
@@ -301,23 +459,68 @@ class Labware:
         else:
             return self._parameters['magneticModuleEngageHeight']
 
-    def _build_wells(self) -> List[Well]:
+    def _build_wells(self):
+        """
+        This function builds the indexes of wells used by all accessor
+        functions. The wells themselves are only created when they are first
+        used (see :py:meth:`_well`), so a protocol that uses a handful of
+        wells in a big labware only pays for those.
         """
-        This function is used to create one instance of wells to be used by all
-        accessor functions. It is only called again if a new offset needs
-        to be applied.
+        self._well_cache: Dict[str, Well] = {}
+        self._well_names_by_id: Dict[int, str] = {}
+        row_dict = self._create_indexed_dictionary(self._ordering, group=1)
+        self._row_names = sorted(row_dict)
+        col_dict = self._create_indexed_dictionary(self._ordering, group=2)
+        self._column_names = sorted(col_dict, key=lambda x: int(x))
+        self._wells_by_name: MappingType[str, Well] = _LazyIndex(
+            self._ordering, self._well)
+        self._rows_by_name: MappingType[str, List[Well]] = _LazyIndex(
+            self._row_names,
+            lambda name: _FrozenList(self._well(well)
+                                     for well in row_dict[name]))
+        self._columns_by_name: MappingType[str, List[Well]] = _LazyIndex(
+            self._column_names,
+            lambda name: _FrozenList(self._well(well)
+                                     for well in col_dict[name]))
+        self._wells: Optional[List[Well]] = None
+        self._tips = TipTracker(
+            [col_dict[name] for name in self._column_names], self.is_tiprack)
+
+    def _well(self, name: str) -> Well:
         """
-        return [
-            Well(
-                self._well_definition[well],
+        The well called `name`, created from the definition the first time it
+        is used. Calibration moves the wells that have been created.
+        """
+        well = self._well_cache.get(name)
+        if well is None:
+            well = Well(
+                self._well_definition[name],
                 Location(self._calibrated_offset, self),
-                "{} of {}".format(well, self._display_name),
+                "{} of {}".format(name, self._display_name),
                 self.is_tiprack)
-            for well in self._ordering]
-
-    def _create_indexed_dictionary(self, group=0):
+            column, row = self._tips.position(name)
+            well._tip_slot = (self._tips, column, row)
+            self._well_cache[name] = well
+            self._well_names_by_id[id(well)] = name
+        return well
+
+    def _well_name(self, well: Well) -> str:
+        """ The name of one of our wells, or of another instance of one of
+        our wells (see :py:meth:`Well.__eq__`)
         """
-        Creates a dict of lists of Wells. Which way the labware is segmented
+        name = self._well_names_by_id.get(id(well))
+        if name is None:
+            for name in self._ordering:
+                if self._well(name) == well:
+                    break
+            else:
+                raise KeyError(f'{well} is not in {self}')
+        return name
+
+    def _create_indexed_dictionary(self, wells, group=0):
+        """
+        Creates a dict of lists of Wells (or well names, if `wells` is the
+        well names in definition order). Which way the labware is segmented
         determines whether this is a dict of rows or dict of columns. If group
         is 1, then it will collect wells that have the same alphabetic prefix
         and therefore are considered to be in the same row. If group is 2, it
@@ -325,7 +528,7 @@ class Labware:
         are considered to be in the same column.
         """
         dict_list = defaultdict(list)
-        for index, well_obj in zip(self._ordering, self._wells):
+        for index, well_obj in zip(self._ordering, wells):
             dict_list[self._pattern.match(index).group(group)].append(well_obj)
         return dict_list
 
@@ -336,7 +539,10 @@ class Labware:
         self._calibrated_offset = Point(x=self._offset.x + delta.x,
                                         y=self._offset.y + delta.y,
                                         z=self._offset.z + delta.z)
-        self._wells = self._build_wells()
+        for well in self._well_cache.values():
+            well._move_parent(self._calibrated_offset)
+        # Recalibrated labware starts out full, as it always has
+        self._tips.reset(self.is_tiprack)
 
     @property
     def calibrated_offset(self) -> Point:
@@ -345,9 +551,9 @@ class Labware:
     def well(self, idx) -> Well:
         """Deprecated---use result of `wells` or `wells_by_name`"""
         if isinstance(idx, int):
-            res = self._wells[idx]
+            res = self._well(self._ordering[idx])
         elif isinstance(idx, str):
-            res = self.wells_by_name()[idx]
+            res = self._wells_by_name[idx]
         else:
             res = NotImplemented
         return res
@@ -369,17 +575,22 @@ class Labware:
 
         :return: Ordered list of all wells in a labware
         """
+        res: List[Well]
         if not args:
-            res = self._wells
+            if self._wells is None:
+                self._wells = _FrozenList(
+                    self._well(name) for name in self._ordering)
+            # A copy, so callers can change it without changing the index
+            res = list(self._wells)
         elif isinstance(args[0], int):
-            res = [self._wells[idx] for idx in args]
+            res = [self._well(self._ordering[idx]) for idx in args]
         elif isinstance(args[0], str):
-            res = [self.wells_by_name()[idx] for idx in args]
+            res = [self._wells_by_name[idx] for idx in args]
         else:
             raise TypeError
         return res
 
-    def wells_by_name(self) -> Dict[str, Well]:
+    def wells_by_name(self) -> MappingType[str, Well]:
         """
         Accessor function used to create a look-up table of Wells by name.
 
@@ -387,12 +598,12 @@ class Labware:
         dictionary whose keys are well names. To access well A1, for example,
         simply write: labware.wells_by_name()['A1']
 
-        :return: Dictionary of well objects keyed by well name
+        :return: Dictionary of well objects keyed by well name. It is
+                 shared, and cannot be changed.
         """
-        return {well: wellObj
-                for well, wellObj in zip(self._ordering, self._wells)}
+        return self._wells_by_name
 
-    def wells_by_index(self) -> Dict[str, Well]:
+    def wells_by_index(self) -> MappingType[str, Well]:
         MODULE_LOG.warning(
             'wells_by_index is deprecated and will be deleted in version '
             '3.12.0. please wells_by_name or dict access')
@@ -414,20 +625,19 @@ class Labware:
 
         :return: A list of row lists
         """
-        row_dict = self._create_indexed_dictionary(group=1)
-        keys = sorted(row_dict)
-
+        res: List[List[Well]]
         if not args:
-            res = [row_dict[key] for key in keys]
+            res = [list(self._rows_by_name[name]) for name in self._row_names]
         elif isinstance(args[0], int):
-            res = [row_dict[keys[idx]] for idx in args]
+            res = [list(self._rows_by_name[self._row_names[idx]])
+                   for idx in args]
         elif isinstance(args[0], str):
-            res = [row_dict[idx] for idx in args]
+            res = [list(self._rows_by_name[idx]) for idx in args]
         else:
             raise TypeError
         return res
 
-    def rows_by_name(self) -> Dict[str, List[Well]]:
+    def rows_by_name(self) -> MappingType[str, List[Well]]:
         """
         Accessor function used to navigate through a labware by row name.
 
@@ -435,12 +645,12 @@ class Labware:
         To access row A for example, simply write: labware.rows_by_name()['A']
         This will output ['A1', 'A2', 'A3', 'A4'...].
 
-        :return: Dictionary of Well lists keyed by row name
+        :return: Dictionary of Well lists keyed by row name. It is shared,
+                 and cannot be changed.
         """
-        row_dict = self._create_indexed_dictionary(group=1)
-        return row_dict
+        return self._rows_by_name
 
-    def rows_by_index(self) -> Dict[str, List[Well]]:
+    def rows_by_index(self) -> MappingType[str, List[Well]]:
         MODULE_LOG.warning(
             'rows_by_index is deprecated and will be deleted in version '
             '3.12.0. please use rows_by_name')
@@ -463,20 +673,20 @@ class Labware:
 
         :return: A list of column lists
         """
-        col_dict = self._create_indexed_dictionary(group=2)
-        keys = sorted(col_dict, key=lambda x: int(x))
-
+        res: List[List[Well]]
         if not args:
-            res = [col_dict[key] for key in keys]
+            res = [list(self._columns_by_name[name])
+                   for name in self._column_names]
         elif isinstance(args[0], int):
-            res = [col_dict[keys[idx]] for idx in args]
+            res = [list(self._columns_by_name[self._column_names[idx]])
+                   for idx in args]
         elif isinstance(args[0], str):
-            res = [col_dict[idx] for idx in args]
+            res = [list(self._columns_by_name[idx]) for idx in args]
         else:
             raise TypeError
         return res
 
-    def columns_by_name(self) -> Dict[str, List[Well]]:
+    def columns_by_name(self) -> MappingType[str, List[Well]]:
         """
         Accessor function used to navigate through a labware by column name.
 
@@ -485,12 +695,12 @@ class Labware:
         simply write: labware.columns_by_name()['1']
         This will output ['A1', 'B1', 'C1', 'D1'...].
 
-        :return: Dictionary of Well lists keyed by column name
+        :return: Dictionary of Well lists keyed by column name. It is shared,
+                 and cannot be changed.
         """
-        col_dict = self._create_indexed_dictionary(group=2)
-        return col_dict
+        return self._columns_by_name
 
-    def columns_by_index(self) -> Dict[str, List[Well]]:
+    def columns_by_index(self) -> MappingType[str, List[Well]]:
         MODULE_LOG.warning(
             'columns_by_index is deprecated and will be deleted in version '
             '3.12.0. please use columns_by_name')
@@ -533,35 +743,10 @@ class Labware:
         :return: the :py:class:`.Well` meeting the target criteria, or None
         """
         assert num_tips > 0, 'Bad call to next_tip: num_tips <= 0'
-
-        columns: List[List[Well]] = self.columns()
-
-        if starting_tip:
-            # Remove columns preceding the one with the pipette's starting tip
-            drop_undefined_columns = list(
-                dropwhile(lambda x: starting_tip not in x, columns))
-            # Remove tips preceding the starting tip in the first column
-            drop_undefined_columns[0] = list(
-                dropwhile(lambda w: starting_tip is not w,
-                          drop_undefined_columns[0]))
-            columns = drop_undefined_columns
-
-        drop_leading_empties = [
-            list(dropwhile(lambda x: not x.has_tip, column))
-            for column in columns]
-        drop_at_first_gap = [
-            list(takewhile(lambda x: x.has_tip, column))
-            for column in drop_leading_empties]
-        long_enough = [
-            column for column in drop_at_first_gap if len(column) >= num_tips]
-
-        try:
-            first_long_enough = long_enough[0]
-            result: Optional[Well] = first_long_enough[0]
-        except IndexError:
-            result = None
-
-        return result
+        name = self._tips.first_run(
+            num_tips,
+            start=self._well_name(starting_tip) if starting_tip else None)
+        return self._well(name) if name else None
 
     def use_tips(self, start_well: Well, num_channels: int = 1):
         """
@@ -584,24 +769,13 @@ class Labware:
         :type num_channels: int
         """
         assert num_channels > 0, 'Bad call to use_tips: num_channels<=0'
-        # Select the column of the labware that contains the target well
-        target_column: List[Well] = [
-            col for col in self.columns() if start_well in col][0]
-
-        well_idx = target_column.index(start_well)
         # Number of tips to pick up is the lesser of (1) the number of tips
         # from the starting well to the end of the column, and (2) the number
         # of channels of the pipette (so a 4-channel pipette would pick up a
         # max of 4 tips, and picking up from the 2nd-to-bottom well in a
         # column would get a maximum of 2 tips)
-        num_tips = min(len(target_column) - well_idx, num_channels)
-        target_wells = target_column[well_idx: well_idx + num_tips]
-
-        assert all([well.has_tip for well in target_wells]),\
-            '{} is out of tips'.format(str(self))
-
-        for well in target_wells:
-            well.has_tip = False
+        removed = self._tips.remove(self._well_name(start_well), num_channels)
+        assert removed, '{} is out of tips'.format(str(self))
 
     def __repr__(self):
         return self._display_name
@@ -620,20 +794,8 @@ class Labware:
         """
         # This logic is the inverse of :py:meth:`next_tip`
         assert num_tips > 0, 'Bad call to previous_tip: num_tips <= 0'
-
-        columns = self.columns()
-        drop_leading_filled = [
-            list(dropwhile(lambda x: x.has_tip, column))
-            for column in columns]
-        drop_at_first_gap = [
-            list(takewhile(lambda x: not x.has_tip, column))
-            for column in drop_leading_filled]
-        long_enough = [
-            column for column in drop_at_first_gap if len(column) >= num_tips]
-        try:
-            return long_enough[0][0]
-        except IndexError:
-            return None
+        name = self._tips.first_run(num_tips, with_tips=False)
+        return self._well(name) if name else None
 
     def return_tips(self, start_well: Well, num_channels: int = 1):
         """
@@ -657,23 +819,16 @@ class Labware:
         """
         # This logic is the inverse of :py:meth:`use_tips`
         assert num_channels > 0, 'Bad call to return_tips: num_channels <= 0'
-        # Select the column that contains the target_well
-        target_column = [col for col in self.columns() if start_well in col][0]
-        well_idx = target_column.index(start_well)
-        end_idx = min(well_idx + num_channels, len(target_column))
-        drop_targets = target_column[well_idx:end_idx]
-        for well in drop_targets:
-            if well.has_tip:
-                raise AssertionError(f'Well {repr(well)} has a tip')
-        for well in drop_targets:
-            well.has_tip = True
+        occupied = self._tips.add(self._well_name(start_well), num_channels)
+        if occupied:
+            raise AssertionError(
+                f'Well {repr(self._well(occupied))} has a tip')
 
     def reset(self):
         """Reset all tips in a tiprack
         """
         if self.is_tiprack:
-            for well in self.wells():
-                well.has_tip = True
+            self._tips.reset()
 
 
 class ModuleGeometry:
@@ -800,11 +955,8 @@ class ThermocyclerGeometry(ModuleGeometry):
         # from the top of the open TC chassis to the base. Once we have a
         # more robust collision detection system in place, the collision
         # model for the TC should change based on it's lid_status
-        # (open or closed). A prerequisite for that check will be
-        # path-specific highest z calculations, as opposed to the current
-        # global check on instrument.move_to. For example: a move from slot 1
-        # to slot 3 should only check the highest z of all deck items between
-        # the source and destination in the x,y plane.
+        # (open or closed). Moves only check the highest z of the deck items
+        # they pass over (see Deck.highest_z_along).
         return super().highest_z
 
     @property
@@ -818,8 +970,8 @@ class ThermocyclerGeometry(ModuleGeometry):
     # NOTE: this func is unused until "semi" configuration
     def labware_accessor(self, labware: Labware) -> Labware:
         # Block first three columns from being accessed
-        definition = labware._definition
-        definition['ordering'] = definition['ordering'][3::]
+        definition = {**labware._definition,
+                      'ordering': labware._definition['ordering'][3::]}
         return Labware(definition, super().location)
 
     def add_labware(self, labware: Labware) -> Labware:
@@ -940,6 +1092,105 @@ def _read_file(filepath: str) -> dict:
     return calibration_data
 
 
+class _FrozenDict(dict):
+    """ A dict that cannot be changed, so it can be shared """
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(
+            'Labware definitions and well indexes are read-only; '
+            'copy them first')
+
+    __setitem__ = __delitem__ = _read_only  # type: ignore
+    clear = pop = popitem = setdefault = update = _read_only  # type: ignore
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return _thaw(self)
+
+    def __reduce__(self):
+        return dict, (_thaw(self),)
+
+
+class _FrozenList(list):
+    """ A list that cannot be changed, so it can be shared """
+    _read_only = _FrozenDict._read_only
+
+    __setitem__ = __delitem__ = _read_only  # type: ignore
+    append = extend = insert = pop = remove = _read_only  # type: ignore
+    clear = reverse = sort = _read_only  # type: ignore
+
+    # `shared += more` rebinds the name to a new list rather than failing
+    def __iadd__(self, other):  # type: ignore
+        return list(self) + list(other)
+
+    def __imul__(self, count):  # type: ignore
+        return list(self) * count
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return _thaw(self)
+
+    def __reduce__(self):
+        return list, (_thaw(self),)
+
+
+def _freeze(obj: Any) -> Any:
+    """ A read-only copy of deserialized json """
+    if isinstance(obj, dict):
+        return _FrozenDict((key, _freeze(val)) for key, val in obj.items())
+    if isinstance(obj, list):
+        return _FrozenList(_freeze(val) for val in obj)
+    return obj
+
+
+def _thaw(obj: Any) -> Any:
+    """ A mutable copy of (possibly frozen) deserialized json """
+    if isinstance(obj, dict):
+        return {key: _thaw(val) for key, val in obj.items()}
+    if isinstance(obj, list):
+        return [_thaw(val) for val in obj]
+    return obj
+
+
+# Definitions already read, by (namespace, load_name, version), along with
+# the path, modification time and size of the file they were read from
+_definition_cache: Dict[Tuple[str, str, int],
+                        Tuple[Path, int, int, Dict[str, Any]]] = {}
+
+
+@functools.lru_cache(maxsize=1)
+def _get_standard_bundle() -> Optional[LabwareBundle]:
+    """ The bundle of standard definitions, or ``None`` to read them from
+    their own files (for instance when running from a source checkout)
+    """
+    try:
+        return LabwareBundle(STANDARD_BUNDLE_PATH)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        MODULE_LOG.exception(
+            f'Could not read {STANDARD_BUNDLE_PATH}, using loose definitions')
+        return None
+
+
+def _get_bundled_definition(
+        load_name: str, version: int) -> Optional[Dict[str, Any]]:
+    bundle = _get_standard_bundle()
+    if not bundle or (load_name, version) not in bundle:
+        return None
+    key = (OPENTRONS_NAMESPACE, load_name, version)
+    # The bundle does not change while we run
+    cached = _definition_cache.get(key)
+    if cached and cached[0] == bundle.path:
+        return cached[3]
+    labware_def = _freeze(bundle.load(load_name, version))
+    _definition_cache[key] = (bundle.path, 0, 0, labware_def)
+    return labware_def
+
+
 def _get_path_to_labware(load_name: str, namespace: str, version: int) -> Path:
     if namespace == OPENTRONS_NAMESPACE:
         # all labware in OPENTRONS_NAMESPACE is bundled in wheel
@@ -960,13 +1211,15 @@ def save_definition(
     :param labware_def: A deserialized JSON labware definition
     :param bool force: If true, overwrite an existing definition if found.
         Cannot overwrite Opentrons definitions.
+    :raises jsonschema.ValidationError: If the definition does not match the
+        labware schema
     """
+    validate_labware_definition(labware_def)
+
     namespace = labware_def['namespace']
     load_name = labware_def['parameters']['loadName']
     version = labware_def['version']
 
-    # TODO: Ian 2019-05-23 validate labware def schema before saving
-
     if not namespace or not load_name or not version:
         raise RuntimeError(
             'Could not save definition, labware def is missing a field: ' +
@@ -987,12 +1240,14 @@ def save_definition(
     Path(def_path).parent.mkdir(parents=True, exist_ok=True)
     with open(def_path, 'w') as f:
         json.dump(labware_def, f)
+    _definition_cache.clear()
 
 
 def delete_all_custom_labware() -> None:
     custom_def_dir = CONFIG['labware_user_definitions_dir_v2']
     if custom_def_dir.is_dir():
         shutil.rmtree(custom_def_dir)
+    _definition_cache.clear()
 
 
 def get_labware_definition(
@@ -1009,6 +1264,13 @@ def get_labware_definition(
         If unspecified, will search 'opentrons' then 'custom_beta'
     :param int version: The version of the labware definition. If unspecified,
         will use version 1.
+
+    Opentrons definitions are read from the bundle built with the package
+    when there is one, and from their own files otherwise.
+
+    Definitions are cached until their file changes, and the same read-only
+    definition is returned to every caller; use :py:func:`copy.deepcopy` to
+    get one that can be modified.
     """
     load_name = load_name.lower()
     if namespace is None:
@@ -1024,17 +1286,34 @@ def get_labware_definition(
             f'{CUSTOM_NAMESPACE}, please specify it')
 
     namespace = namespace.lower()
+    if namespace == OPENTRONS_NAMESPACE:
+        bundled = _get_bundled_definition(load_name, version)
+        if bundled:
+            return bundled
+    return _get_loose_definition(load_name, namespace, version)
+
+
+def _get_loose_definition(
+        load_name: str, namespace: str, version: int) -> Dict[str, Any]:
+    key = (namespace, load_name, version)
     def_path = _get_path_to_labware(load_name, namespace, version)
 
     try:
+        stat = def_path.stat()
+        cached = _definition_cache.get(key)
+        if cached and cached[:3] == (def_path, stat.st_mtime_ns, stat.st_size):
+            return cached[3]
         with open(def_path, 'r') as f:
-            labware_def = json.load(f)
+            labware_def = _freeze(json.load(f))
     except FileNotFoundError:
+        _definition_cache.pop(key, None)
         raise FileNotFoundError(
             f'Labware "{load_name}" not found with version {version} ' +
             f'in namespace "{namespace}".'
         )
 
+    _definition_cache[key] = (
+        def_path, stat.st_mtime_ns, stat.st_size, labware_def)
     return labware_def
 
 
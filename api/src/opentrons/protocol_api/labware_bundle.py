@@ -0,0 +1,105 @@
+""" A single-file bundle of labware definitions.
+
+The standard labware definitions are hundreds of small JSON files, and on the
+robot's SD card opening each one costs far more than parsing it. At build
+time they are packed into one file that holds an index followed by the
+compact JSON of each definition:
+
+- ``MAGIC``
+- the length of the index, as a little-endian unsigned 32 bit integer
+- the index: a JSON object mapping ``"<load name>/<version>"`` to the
+  ``[offset, length]`` of that definition, from the end of the index
+- the definitions
+
+Readers map the file into memory and only parse the definitions they use.
+
+This module only uses the standard library so that the build can use it
+without importing opentrons.
+"""
+import json
+import mmap
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+MAGIC = b'OTLWBNDL1\n'
+_INDEX_SIZE = struct.Struct('<I')
+
+
+def _key(load_name: str, version: int) -> str:
+    return f'{load_name}/{version}'
+
+
+def build_bundle(definitions_dir: Path, bundle_path: Path) -> int:
+    """ Bundle every ``<load name>/<version>.json`` in `definitions_dir`.
+
+    :returns: The number of definitions bundled
+    """
+    blobs: List[Tuple[str, bytes]] = []
+    for def_path in sorted(Path(definitions_dir).glob('*/*.json')):
+        with def_path.open('rb') as f:
+            definition = json.loads(f.read().decode('utf-8'))
+        blobs.append((
+            _key(def_path.parent.name, int(def_path.stem)),
+            json.dumps(definition, separators=(',', ':')).encode('utf-8')))
+
+    index: Dict[str, List[int]] = {}
+    offset = 0
+    for key, blob in blobs:
+        index[key] = [offset, len(blob)]
+        offset += len(blob)
+    encoded_index = json.dumps(index, separators=(',', ':')).encode('utf-8')
+
+    bundle_path = Path(bundle_path)
+    bundle_path.parent.mkdir(parents=True, exist_ok=True)
+    with bundle_path.open('wb') as f:
+        f.write(MAGIC)
+        f.write(_INDEX_SIZE.pack(len(encoded_index)))
+        f.write(encoded_index)
+        for _, blob in blobs:
+            f.write(blob)
+    return len(blobs)
+
+
+class LabwareBundle:
+    """ Read definitions from a bundle made by :py:func:`build_bundle`
+
+    :raises ValueError: If `path` is not a bundle
+    """
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with self.path.open('rb') as f:
+            header = f.read(len(MAGIC) + _INDEX_SIZE.size)
+            if len(header) < len(MAGIC) + _INDEX_SIZE.size\
+                    or not header.startswith(MAGIC):
+                raise ValueError(f'{self.path} is not a labware bundle')
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        index_size, = _INDEX_SIZE.unpack_from(header, len(MAGIC))
+        index_start = len(header)
+        self._data_start = index_start + index_size
+        self._index: Dict[str, List[int]] = json.loads(
+            self._map[index_start:self._data_start].decode('utf-8'))
+
+    def __contains__(self, name_and_version: Tuple[str, int]) -> bool:
+        return _key(*name_and_version) in self._index
+
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        """ The load names and versions of the bundled definitions """
+        for key in self._index:
+            load_name, version = key.rsplit('/', 1)
+            yield load_name, int(version)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def load(self, load_name: str, version: int) -> Dict[str, Any]:
+        """ Parse a bundled definition
+
+        :raises KeyError: If the definition is not in the bundle
+        """
+        offset, length = self._index[_key(load_name, version)]
+        start = self._data_start + offset
+        return json.loads(self._map[start:start + length].decode('utf-8'))
+
+    def close(self):
+        self._map.close()
@@ -0,0 +1,202 @@
+""" Ordering the steps of a transfer to shorten the path the gantry travels.
+
+A step is somewhere the pipette goes to start it and somewhere it ends up;
+for a transfer those are the source and destination of one aspirate and
+dispense, and for a distribute or consolidate they are both the one well it
+dispenses to or aspirates from. Steps are ordered by visiting the nearest
+step that is allowed to go next, then improved by reversing runs of steps
+(2-opt) while that makes the path shorter.
+
+Steps that use the same well may have to stay in order: a step that reads
+(aspirates from) a well another step writes (dispenses to) stays on the same
+side of it, so a serial dilution keeps its order. Writes to the same well
+can be reordered, since the well ends up with the same liquid either way.
+"""
+import math
+from typing import (Dict, Hashable, List, NamedTuple, Optional, Sequence,
+                    Set, Tuple)
+
+from opentrons.types import Point
+
+#: The most times to look through the order for runs of steps to reverse
+MAX_PASSES = 20
+
+
+class Stop(NamedTuple):
+    """ Where the pipette starts and ends one step """
+    start: Point
+    end: Point
+
+
+class PathOptimization(NamedTuple):
+    """ The estimated length (in mm) of a transfer's path before and after
+    reordering its steps
+    """
+    original: float
+    optimized: float
+
+    @property
+    def saved(self) -> float:
+        return self.original - self.optimized
+
+
+def distance(a: Point, b: Point) -> float:
+    """ The distance between two points in the plane of the deck.
+
+    The pipette rises to a safe height to move between wells whatever their
+    heights, so the vertical distance is left out.
+    """
+    return math.hypot(a.x - b.x, a.y - b.y)
+
+
+def path_length(stops: Sequence[Stop],
+                order: Sequence[int],
+                start: Optional[Point] = None) -> float:
+    """ The length of the path through `stops` in `order`, from `start` if
+    it is given
+    """
+    total = 0.0
+    here = start
+    for idx in order:
+        if here is not None:
+            total += distance(here, stops[idx].start)
+        total += distance(stops[idx].start, stops[idx].end)
+        here = stops[idx].end
+    return total
+
+
+def _predecessors(reads: Sequence[Set[Hashable]],
+                  writes: Sequence[Set[Hashable]]) -> List[Set[int]]:
+    """ For each step, the steps that must come before it """
+    readers: Dict[Hashable, List[int]] = {}
+    writers: Dict[Hashable, List[int]] = {}
+    for idx, (step_reads, step_writes) in enumerate(zip(reads, writes)):
+        for well in step_reads:
+            readers.setdefault(well, []).append(idx)
+        for well in step_writes:
+            writers.setdefault(well, []).append(idx)
+    result: List[Set[int]] = [set() for _ in reads]
+    for well, well_writers in writers.items():
+        for reader in readers.get(well, []):
+            for writer in well_writers:
+                if writer < reader:
+                    result[reader].add(writer)
+                elif reader < writer:
+                    result[writer].add(reader)
+    return result
+
+
+def _nearest_neighbour(stops: Sequence[Stop],
+                       predecessors: List[Set[int]],
+                       start: Optional[Point]) -> List[int]:
+    waiting = [len(preds) for preds in predecessors]
+    followers: List[List[int]] = [[] for _ in stops]
+    for idx, preds in enumerate(predecessors):
+        for pred in preds:
+            followers[pred].append(idx)
+    ready = [idx for idx, count in enumerate(waiting) if not count]
+    order = []
+    here = start
+    while ready:
+        if here is None:
+            nearest = min(ready)
+        else:
+            point = here
+            nearest = min(ready,
+                          key=lambda idx: (distance(point, stops[idx].start),
+                                           idx))
+        ready.remove(nearest)
+        order.append(nearest)
+        here = stops[nearest].end
+        for follower in followers[nearest]:
+            waiting[follower] -= 1
+            if not waiting[follower]:
+                ready.append(follower)
+    return order
+
+
+def _two_opt(stops: Sequence[Stop],  # noqa(C901)
+             order: List[int],
+             start: Optional[Point]) -> List[int]:
+    """ Reverse runs of steps in `order` while that shortens the path.
+
+    Steps are directional, so the moves inside a reversed run change length
+    too; sums of the moves forward and backward along the order let each
+    reversal be measured without walking the run.
+    """
+    count = len(order)
+    # cost[a][b]: the move from the end of step a to the start of step b
+    cost = [[distance(a.end, b.start) for b in stops] for a in stops]
+    if start is None:
+        start_cost = [0.0] * count
+    else:
+        start_cost = [distance(start, stop.start) for stop in stops]
+
+    def _sums():
+        forward = [0.0]
+        backward = [0.0]
+        for here, there in zip(order, order[1:]):
+            forward.append(forward[-1] + cost[here][there])
+            backward.append(backward[-1] + cost[there][here])
+        return forward, backward
+
+    def _lengths(first, last):
+        """ The length of the path from the step before `first` to the step
+        after `last`, as it is and with the steps between reversed
+        """
+        first_step, last_step = order[first], order[last]
+        if first:
+            before = cost[order[first - 1]][first_step]
+            after = cost[order[first - 1]][last_step]
+        else:
+            before = start_cost[first_step]
+            after = start_cost[last_step]
+        before += forward[last] - forward[first]
+        after += backward[last] - backward[first]
+        if last + 1 < count:
+            before += cost[last_step][order[last + 1]]
+            after += cost[first_step][order[last + 1]]
+        return before, after
+
+    for _ in range(MAX_PASSES):
+        forward, backward = _sums()
+        improved = False
+        for first in range(count - 1):
+            for last in range(first + 1, count):
+                before, after = _lengths(first, last)
+                if after < before - 1e-6:
+                    order[first:last + 1] = reversed(order[first:last + 1])
+                    forward, backward = _sums()
+                    improved = True
+                    break
+        if not improved:
+            break
+    return order
+
+
+def order_steps(stops: Sequence[Stop],
+                reads: Sequence[Set[Hashable]],
+                writes: Sequence[Set[Hashable]],
+                start: Optional[Point] = None)\
+        -> Tuple[List[int], PathOptimization]:
+    """ Find a short order to visit some steps in.
+
+    :param stops: Where each step starts and ends
+    :param reads: The wells each step aspirates from
+    :param writes: The wells each step dispenses to
+    :param start: Where the pipette is before the first step, if it is
+                  known
+    :returns: The indices of the steps in their new order, and how much
+              shorter it is. The steps are left in their original order if
+              no shorter order is found.
+    """
+    original_order = list(range(len(stops)))
+    original = path_length(stops, original_order, start)
+    predecessors = _predecessors(reads, writes)
+    order = _nearest_neighbour(stops, predecessors, start)
+    if not any(predecessors):
+        order = _two_opt(stops, order, start)
+    optimized = path_length(stops, order, start)
+    if optimized >= original:
+        return original_order, PathOptimization(original, original)
+    return order, PathOptimization(original, optimized)
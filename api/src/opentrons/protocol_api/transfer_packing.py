@@ -0,0 +1,83 @@
+""" Grouping the dispenses of a distribute into aspirates.
+
+A distribute aspirates enough liquid for several destinations at once and
+dispenses it to them one after another. Taking destinations in the order
+given and starting a new aspirate whenever the next one does not fit wastes
+space in the tip when volumes differ; first-fit-decreasing packing places
+the largest volumes first and fills the gaps they leave with smaller ones.
+
+So that the pipette does not go back and forth across a plate, packing only
+combines destinations within a window of nearby steps, and each group is
+dispensed in the order its destinations were given.
+"""
+from typing import List, NamedTuple, Sequence
+
+#: How many consecutive steps first-fit-decreasing packing combines
+PACKING_WINDOW = 24
+
+
+class Packing(NamedTuple):
+    """ How many aspirates a distribute takes in the order given and after
+    packing
+    """
+    in_order: int
+    packed: int
+
+
+def _fits(volumes: Sequence[float], group: List[int], idx: int,
+          reserved: float, max_volume: float) -> bool:
+    # Summed in the order the group will be aspirated so the check agrees
+    # exactly with the volume aspirated
+    total = sum(volumes[member] for member in sorted(group + [idx]))
+    return total + reserved <= max_volume
+
+
+def pack_in_order(volumes: Sequence[float],
+                  reserved: float,
+                  max_volume: float) -> List[List[int]]:
+    """ Group steps in the order given, starting a new group whenever the
+    next volume does not fit.
+
+    :param volumes: The volume of each step
+    :param reserved: The volume each aspirate needs beyond the volumes
+                     dispensed, like a disposal volume and air gap
+    :param max_volume: The most each aspirate can hold
+    :returns: Each group as a list of step indices
+    """
+    groups: List[List[int]] = []
+    current: List[int] = []
+    for idx, volume in enumerate(volumes):
+        if current and sum(volumes[member] for member in current)\
+                + reserved + volume > max_volume:
+            groups.append(current)
+            current = []
+        current.append(idx)
+    if current:
+        groups.append(current)
+    return groups
+
+
+def pack_first_fit_decreasing(volumes: Sequence[float],
+                              reserved: float,
+                              max_volume: float,
+                              window: int = PACKING_WINDOW)\
+        -> List[List[int]]:
+    """ Group steps by first-fit-decreasing packing within windows of
+    `window` steps.
+
+    Arguments and return value are as :py:func:`pack_in_order`. Groups are
+    ordered by their first step and hold their steps in order.
+    """
+    groups: List[List[int]] = []
+    for start in range(0, len(volumes), window):
+        indices = range(start, min(start + window, len(volumes)))
+        bins: List[List[int]] = []
+        for idx in sorted(indices, key=lambda idx: (-volumes[idx], idx)):
+            for group in bins:
+                if _fits(volumes, group, idx, reserved, max_volume):
+                    group.append(idx)
+                    break
+            else:
+                bins.append([idx])
+        groups.extend(sorted(sorted(group) for group in bins))
+    return groups
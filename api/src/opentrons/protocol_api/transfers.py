@@ -2,11 +2,14 @@ import enum
 from typing import (Any, Dict, List, Optional, Union, NamedTuple,
                     Callable, Generator, Iterator, Tuple,
                     TYPE_CHECKING)
-from .labware import Well
+from .labware import Labware, ModuleGeometry, Well
+from .transfer_order import PathOptimization, Stop, order_steps
+from .transfer_packing import (Packing, pack_first_fit_decreasing,
+                               pack_in_order)
 from opentrons import types
 
 if TYPE_CHECKING:
-    from .contexts import InstrumentContext  #noqa (F501)
+    from .contexts import InstrumentContext, ProtocolContext  #noqa (F501)
 
 
 class MixStrategy(enum.Enum):
@@ -33,6 +36,11 @@ class BlowOutStrategy(enum.Enum):
     CUSTOM_LOCATION = enum.auto()
 
 
+class PackingStrategy(enum.Enum):
+    IN_ORDER = enum.auto()
+    FIRST_FIT_DECREASING = enum.auto()
+
+
 class TransferMode(enum.Enum):
     DISTRIBUTE = enum.auto()
     CONSOLIDATE = enum.auto()
@@ -54,6 +62,8 @@ class Transfer(NamedTuple):
     drop_tip_strategy: DropTipStrategy = DropTipStrategy.TRASH
     blow_out_strategy: BlowOutStrategy = BlowOutStrategy.NONE
     touch_tip_strategy: TouchTipStrategy = TouchTipStrategy.NEVER
+    optimize_path: bool = False
+    packing_strategy: PackingStrategy = PackingStrategy.IN_ORDER
 
 
 Transfer.new_tip.__doc__ = """
@@ -180,6 +190,34 @@ Transfer.touch_tip_strategy.__doc__ = """
     :py:attr:`.TransferOptions.touch_tip`.
     """
 
+Transfer.optimize_path.__doc__ = """
+    Controls whether to reorder the steps of the transfer to shorten the
+    path the pipette travels between wells.
+
+    Steps are only reordered as a whole, so a volume split for
+    :py:attr:`.carryover` and the tips picked up for
+    :py:attr:`.new_tip` stay with their step. A step that aspirates from a
+    well another step dispenses to keeps its place relative to that step.
+
+    When a tip is shared between steps, reordering changes which wells it
+    carries liquid between. The estimated distance saved is in
+    :py:attr:`TransferPlan.path_optimization`.
+    """
+
+Transfer.packing_strategy.__doc__ = """
+    Controls how a distribute groups its dispenses into aspirates
+
+    :py:attr:`PackingStrategy.IN_ORDER`
+        Take destinations in the order given, aspirating again whenever
+        the next volume does not fit in the tip.
+
+    :py:attr:`PackingStrategy.FIRST_FIT_DECREASING`
+        Pack nearby destinations into as few aspirates as possible, largest
+        volumes first. This takes fewer aspirates when volumes differ. See
+        :py:mod:`.transfer_packing`; the number of aspirates with and
+        without packing is in :py:attr:`TransferPlan.packing`.
+    """
+
 
 class PickUpTipOpts(NamedTuple):
     """
@@ -354,7 +392,7 @@ class TransferPlan:
     the various little commands that can be involved in a transfer. It can be
     iterated to resolve methods to call to execute the plan.
     """
-    def __init__(self,
+    def __init__(self,  # noqa(C901)
                  volume,
                  sources,
                  dests,
@@ -414,6 +452,90 @@ class TransferPlan:
                 self._mode = TransferMode.TRANSFER
         else:
             self._mode = TransferMode[mode.upper()]
+        # The volume in the pipette while compiling; see _current_volume
+        self._tracked_volume: Optional[float] = None
+
+        #: How much :py:attr:`.Transfer.optimize_path` shortened the path,
+        #: or ``None`` if it was not used
+        self.path_optimization: Optional[PathOptimization] = None
+        if self._strategy.optimize_path:
+            self._optimize_path()
+
+        #: The number of aspirates :py:attr:`.Transfer.packing_strategy`
+        #: saved, or ``None`` if a distribute was not packed
+        self.packing: Optional[Packing] = None
+        if self._mode == TransferMode.DISTRIBUTE:
+            self._distribute_groups = self._pack_distribute()
+
+    def _optimize_path(self):
+        """ Reorder the steps of the plan; see :py:mod:`.transfer_order` """
+        def _point(target):
+            if isinstance(target, types.Location):
+                return target.point
+            return target.top().point
+
+        def _well(target):
+            if isinstance(target, types.Location):
+                return target.labware
+            return target
+
+        start = None
+        if self._mode == TransferMode.TRANSFER:
+            pairs = list(zip(self._sources, self._dests))
+            stops = [Stop(_point(src), _point(dest)) for src, dest in pairs]
+        elif self._mode == TransferMode.DISTRIBUTE:
+            # Each aspirate is from the source, so start there
+            start = _point(self._sources[0])
+            pairs = [(self._sources[0], dest) for dest in self._dests]
+            stops = [Stop(_point(dest), _point(dest)) for dest in self._dests]
+        else:
+            pairs = [(src, self._dests[0]) for src in self._sources]
+            stops = [Stop(_point(src), _point(src)) for src in self._sources]
+        order, self.path_optimization = order_steps(
+            stops,
+            [{_well(src)} for src, _ in pairs],
+            [{_well(dest)} for _, dest in pairs],
+            start)
+
+        self._volumes = [self._volumes[idx] for idx in order]
+        if self._mode != TransferMode.DISTRIBUTE:
+            self._sources = [self._sources[idx] for idx in order]
+        if self._mode != TransferMode.CONSOLIDATE:
+            self._dests = [self._dests[idx] for idx in order]
+
+    def compile(self) -> 'CompiledTransfer':
+        """ Plan the whole transfer up front.
+
+        Iterating a plan decides some steps, like mixing after a dispense,
+        from the volume in the pipette at the time, so it has to be
+        interleaved with running them. Compiling tracks that volume itself
+        instead, starting from the volume in the pipette now.
+        """
+        start_volume = self._instr.current_volume
+        self._tracked_volume = start_volume
+        try:
+            return CompiledTransfer.from_commands(
+                self._track_volume(iter(self)), start_volume, self._options)
+        finally:
+            self._tracked_volume = None
+
+    def _track_volume(self, commands):
+        for cmd in commands:
+            yield cmd
+            # This mirrors how the hardware controller counts volume, so
+            # the plan makes the same decisions it would have while running
+            method, args = cmd['method'], cmd['args']
+            if method in ('aspirate', 'air_gap'):
+                self._tracked_volume += args[0]
+            elif method == 'dispense':
+                self._tracked_volume -= min(self._tracked_volume, args[0])
+            elif method in ('blow_out', 'drop_tip', 'return_tip'):
+                self._tracked_volume = 0
+
+    def _current_volume(self) -> float:
+        if self._tracked_volume is None:
+            return self._instr.current_volume
+        return self._tracked_volume
 
     def __iter__(self):
         if self._strategy.new_tip == types.TransferTipPolicy.ONCE:
@@ -514,40 +636,47 @@ class TransferPlan:
                *.. Dispense air gap -> Dispense -> Touch tip -> Air gap ->
                .. Dispense air gap -> ...*
 
+        """
+        if self._strategy.new_tip == types.TransferTipPolicy.ALWAYS:
+            yield self._format_dict('pick_up_tip', kwargs=self._tip_opts)
+        for asp_grouped in self._distribute_groups:
+            yield from self._aspirate_actions(sum(a[0] for a in asp_grouped) +
+                                              self._strategy.disposal_volume,
+                                              self._sources[0])
+            for idx, step in enumerate(asp_grouped):
+                yield from self._dispense_actions(
+                    step[0], step[1], idx != len(asp_grouped) - 1)
+        yield from self._new_tip_action()
+
+    def _pack_distribute(self):
+        """ Group the dispenses of a distribute into aspirates; see
+        :py:mod:`.transfer_packing`
         """
         # TODO: decide whether default disposal vol for distribute should be
         # pipette min_vol or should we leave it to being 0 by default and
         # recommend users to specify a disposal vol when using distribute.
         # First method keeps distribute consistent with current behavior while
         # the other maintains consistency in default behaviors of all functions
-        plan_iter = self._expand_for_volume_constraints(
+        steps = list(self._expand_for_volume_constraints(
             self._volumes, self._dests,
             self._instr.max_volume
             - self._strategy.disposal_volume
-            - self._strategy.air_gap)
-
-        done = False
-        current_xfer = next(plan_iter)
-        if self._strategy.new_tip == types.TransferTipPolicy.ALWAYS:
-            yield self._format_dict('pick_up_tip', kwargs=self._tip_opts)
-        while not done:
-            asp_grouped = []
-            try:
-                while (sum(a[0] for a in asp_grouped) +
-                       self._strategy.disposal_volume +
-                       self._strategy.air_gap +
-                       current_xfer[0]) <= self._max_volume:
-                    asp_grouped.append(current_xfer)
-                    current_xfer = next(plan_iter)
-            except StopIteration:
-                done = True
-            yield from self._aspirate_actions(sum(a[0] for a in asp_grouped) +
-                                              self._strategy.disposal_volume,
-                                              self._sources[0])
-            for step in asp_grouped:
-                yield from self._dispense_actions(step[0], step[1],
-                                                  step is not asp_grouped[-1])
-        yield from self._new_tip_action()
+            - self._strategy.air_gap))
+        volumes = [step[0] for step in steps]
+        reserved = self._strategy.disposal_volume + self._strategy.air_gap
+        groups = pack_in_order(volumes, reserved, self._max_volume)
+        if self._strategy.packing_strategy\
+                == PackingStrategy.FIRST_FIT_DECREASING:
+            packed = pack_first_fit_decreasing(
+                volumes, reserved, self._max_volume)
+            # Windows can stop packing from combining steps that taking
+            # them in order would have, so keep whichever is fewer
+            if len(packed) < len(groups):
+                self.packing = Packing(len(groups), len(packed))
+                groups = packed
+            else:
+                self.packing = Packing(len(groups), len(groups))
+        return [[steps[idx] for idx in group] for group in groups]
 
     @staticmethod
     def _expand_for_volume_constraints(
@@ -649,7 +778,7 @@ class TransferPlan:
     def _before_aspirate(self, loc):
         if self._strategy.mix_strategy == MixStrategy.BEFORE or \
                 self._strategy.mix_strategy == MixStrategy.BOTH:
-            if self._instr.current_volume == 0:
+            if self._current_volume() == 0:
                 mix_before_opts = self._mix_before_opts._asdict()
                 mix_before_opts['location'] = loc
                 yield self._format_dict(
@@ -670,7 +799,7 @@ class TransferPlan:
         if not is_disp_next:
             # If the next command is an aspirate, we are switching
             # between aspirate and dispense.
-            if self._instr.current_volume == 0:
+            if self._current_volume() == 0:
                 # If we're empty, then this is when after mixes come into play
                 if self._strategy.mix_strategy == MixStrategy.AFTER or \
                         self._strategy.mix_strategy == MixStrategy.BOTH:
@@ -789,3 +918,266 @@ class TransferPlan:
 
     def _is_first_row(self, well: Well):
         return well in well.parent.rows()[0]
+
+
+class Opcode(enum.IntEnum):
+    """ The :py:class:`InstrumentContext` method a compiled step calls """
+    PICK_UP_TIP = 0
+    DROP_TIP = 1
+    RETURN_TIP = 2
+    ASPIRATE = 3
+    DISPENSE = 4
+    AIR_GAP = 5
+    TOUCH_TIP = 6
+    MIX = 7
+    BLOW_OUT = 8
+
+
+#: The location index of a step that does not move
+NO_LOCATION = -1
+
+#: The flag for a mix step that uses the mix after dispense options
+MIX_AFTER = 1
+
+
+class Step(NamedTuple):
+    """ One step of a :py:class:`CompiledTransfer` """
+    opcode: Opcode
+    #: The volume to aspirate, dispense or air gap, or 0
+    volume: float
+    #: The index of the step's location in
+    #: :py:attr:`CompiledTransfer.locations`, or :py:data:`NO_LOCATION`
+    location: int
+    flags: int
+
+
+_Target = Union[Well, types.Location]
+
+
+def _well_index(well: Well, indices: Dict[Labware, Dict[Well, int]]) -> int:
+    """ The index of `well` in its labware, using and filling `indices` to
+    avoid searching the labware's wells each time
+    """
+    if well.parent not in indices:
+        indices[well.parent] = {
+            lw_well: idx for idx, lw_well in enumerate(well.parent.wells())}
+    return indices[well.parent][well]
+
+
+class CompiledTransfer:
+    """ A transfer planned up front, by :py:meth:`TransferPlan.compile`.
+
+    A compiled transfer is a sequence of :py:class:`Step` that refer to
+    wells and locations by their index in :py:attr:`locations`. It can be
+    run any number of times with :py:meth:`execute`, moved to other labware
+    with :py:meth:`with_labware`, and saved with :py:meth:`to_json`.
+    """
+    def __init__(self,
+                 steps: List[Step],
+                 locations: List[_Target],
+                 start_volume: float,
+                 options: Dict[str, Any]) -> None:
+        #: The steps, in order
+        self.steps = tuple(steps)
+        #: The wells and locations the steps refer to
+        self.locations = tuple(locations)
+        #: The volume in the pipette the transfer was planned for
+        self.start_volume = start_volume
+        # Arguments that are the same for every step with the same opcode
+        self._options = options
+
+    @classmethod  # noqa(C901)
+    def from_commands(cls,
+                      commands: Iterator[Dict[str, Any]],
+                      start_volume: float,
+                      options: TransferOptions) -> 'CompiledTransfer':
+        """ Compile the commands of a :py:class:`TransferPlan` """
+        locations: List[_Target] = []
+        location_indices: Dict[int, int] = {}
+
+        def _index(loc):
+            if loc is None:
+                return NO_LOCATION
+            if id(loc) not in location_indices:
+                location_indices[id(loc)] = len(locations)
+                locations.append(loc)
+            return location_indices[id(loc)]
+
+        def _params(opts):
+            return {key: val for key, val in opts._asdict().items() if val}
+
+        compiled_options = {
+            'pick_up_tip': {key: val for key, val
+                            in _params(options.pick_up_tip).items()
+                            if key != 'location'},
+            'touch_tip': _params(options.touch_tip),
+            'mix_before': _params(options.mix.mix_before),
+            'mix_after': _params(options.mix.mix_after),
+            'aspirate_rate': options.aspirate.rate,
+            'dispense_rate': options.dispense.rate}
+
+        steps = []
+        for cmd in commands:
+            method, args, kwargs = cmd['method'], cmd['args'], cmd['kwargs']
+            if method in ('aspirate', 'dispense'):
+                steps.append(Step(
+                    Opcode[method.upper()], args[0],
+                    _index(args[1] if len(args) > 1 else None), 0))
+            elif method == 'air_gap':
+                steps.append(Step(Opcode.AIR_GAP, args[0], NO_LOCATION, 0))
+            elif method == 'mix':
+                mix_opts = {key: val for key, val in kwargs.items()
+                            if key != 'location'}
+                # If the before and after options are the same it does not
+                # matter which are used
+                flags = 0 if mix_opts == compiled_options['mix_before']\
+                    else MIX_AFTER
+                steps.append(Step(
+                    Opcode.MIX, 0, _index(kwargs['location']), flags))
+            elif method == 'blow_out':
+                loc = args[0] if args else kwargs.get('location')
+                steps.append(Step(Opcode.BLOW_OUT, 0, _index(loc), 0))
+            elif method == 'pick_up_tip':
+                steps.append(Step(
+                    Opcode.PICK_UP_TIP, 0, _index(kwargs.get('location')), 0))
+            else:
+                steps.append(Step(Opcode[method.upper()], 0, NO_LOCATION, 0))
+        return cls(steps, locations, start_volume, compiled_options)
+
+    def __iter__(self) -> Iterator[Step]:
+        return iter(self.steps)
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def execute(self, instr: 'InstrumentContext'):  # noqa(C901)
+        """ Run the transfer with `instr`
+
+        :raises RuntimeError: If `instr` does not hold the volume the
+                              transfer was planned for
+        """
+        if instr.current_volume != self.start_volume:
+            raise RuntimeError(
+                'This transfer was planned for a pipette holding {}uL but'
+                ' the pipette holds {}uL'.format(
+                    self.start_volume, instr.current_volume))
+        locations = self.locations
+        aspirate_rate = self._options['aspirate_rate']
+        dispense_rate = self._options['dispense_rate']
+        for opcode, volume, location, flags in self.steps:
+            loc = locations[location] if location != NO_LOCATION else None
+            if opcode == Opcode.ASPIRATE:
+                instr.aspirate(volume, loc, aspirate_rate)
+            elif opcode == Opcode.DISPENSE:
+                if loc is None:
+                    instr.dispense(volume)
+                else:
+                    instr.dispense(volume, loc, dispense_rate)
+            elif opcode == Opcode.MIX:
+                instr.mix(location=loc, **self._options[
+                    'mix_after' if flags & MIX_AFTER else 'mix_before'])
+            elif opcode == Opcode.BLOW_OUT:
+                instr.blow_out(loc)
+            elif opcode == Opcode.AIR_GAP:
+                instr.air_gap(volume)
+            elif opcode == Opcode.TOUCH_TIP:
+                instr.touch_tip(**self._options['touch_tip'])
+            elif opcode == Opcode.PICK_UP_TIP:
+                instr.pick_up_tip(loc, **self._options['pick_up_tip'])
+            elif opcode == Opcode.DROP_TIP:
+                instr.drop_tip()
+            elif opcode == Opcode.RETURN_TIP:
+                instr.return_tip()
+
+    def with_labware(self, replacements: Dict[Labware, Labware])\
+            -> 'CompiledTransfer':
+        """ The same transfer with wells in some labware replaced by the
+        wells in the same positions of other labware
+
+        :param replacements: A dict of labware to the labware to use instead
+        """
+        indices: Dict[Labware, Dict[Well, int]] = {}
+        new_wells = {old: new.wells() for old, new in replacements.items()}
+
+        def _replace(loc):
+            well = loc.labware if isinstance(loc, types.Location) else loc
+            if not isinstance(well, Well) or well.parent not in replacements:
+                return loc
+            new_well = new_wells[well.parent][_well_index(well, indices)]
+            if isinstance(loc, types.Location):
+                return types.Location(
+                    loc.point - well.top().point + new_well.top().point,
+                    new_well)
+            return new_well
+
+        return CompiledTransfer(
+            list(self.steps), [_replace(loc) for loc in self.locations],
+            self.start_volume, self._options)
+
+    def to_json(self) -> Dict[str, Any]:
+        """ A description of the transfer that can be saved as JSON and
+        loaded with :py:meth:`from_json`. Wells are described by the slot
+        and load name of their labware and their index in it.
+
+        :raises ValueError: If a location is not in a well
+        """
+        labware: List[Labware] = []
+        indices: Dict[Labware, Dict[Well, int]] = {}
+        locations = []
+        for loc in self.locations:
+            well = loc.labware if isinstance(loc, types.Location) else loc
+            if not isinstance(well, Well):
+                raise ValueError(
+                    'Cannot save a transfer to {}, which is not in a well'
+                    .format(loc))
+            if well.parent not in labware:
+                labware.append(well.parent)
+            desc: Dict[str, Any] = {
+                'labware': labware.index(well.parent),
+                'well': _well_index(well, indices)}
+            if isinstance(loc, types.Location):
+                desc['offset'] = list(loc.point - well.top().point)
+            locations.append(desc)
+
+        def _slot(lw):
+            parent = lw.parent
+            if isinstance(parent, ModuleGeometry):
+                parent = parent.parent
+            return parent
+
+        return {
+            'labware': [{'slot': _slot(lw), 'loadName': lw.name}
+                        for lw in labware],
+            'locations': locations,
+            'steps': [list(step) for step in self.steps],
+            'startVolume': self.start_volume,
+            'options': self._options}
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any], ctx: 'ProtocolContext')\
+            -> 'CompiledTransfer':
+        """ Load a transfer saved with :py:meth:`to_json`, using the labware
+        loaded in `ctx`.
+
+        :raises ValueError: If the labware in a slot is not what the
+                            transfer was planned with
+        """
+        wells = []
+        for lw_desc in data['labware']:
+            lw = ctx.loaded_labwares.get(int(lw_desc['slot']))
+            if not isinstance(lw, Labware)\
+                    or lw.name != lw_desc['loadName']:
+                raise ValueError('This transfer uses {} in slot {}'.format(
+                    lw_desc['loadName'], lw_desc['slot']))
+            wells.append(lw.wells())
+        locations: List[_Target] = []
+        for desc in data['locations']:
+            well = wells[desc['labware']][desc['well']]
+            if 'offset' in desc:
+                locations.append(types.Location(
+                    well.top().point + types.Point(*desc['offset']), well))
+            else:
+                locations.append(well)
+        steps = [Step(Opcode(opcode), volume, location, flags)
+                 for opcode, volume, location, flags in data['steps']]
+        return cls(steps, locations, data['startVolume'], data['options'])
@@ -3,14 +3,27 @@ opentrons.protocols.parse: functions and state for parsing protocols
 """
 
 import ast
+import functools
 import json
 import pkgutil
+import threading
 from typing import Any, Dict, Union
 
 import jsonschema  # type: ignore
 
+from .parse_cache import ParseCache, cache_key
 from .types import Protocol, PythonProtocol, JsonProtocol, Metadata
 
+# Validators resolve $refs with a stack of scopes, so only one validation
+# can run at a time
+_validation_lock = threading.Lock()
+
+# The python types of the json schema types checked before validating
+_SCHEMA_TYPES = {'object': dict, 'array': list, 'string': str}
+
+#: Protocols parsed by :py:func:`parse`
+parse_cache = ParseCache()
+
 
 def _parse_json(
         protocol_contents: str, filename: str = None) -> JsonProtocol:
@@ -59,6 +72,15 @@ def parse(
         protocol_str = protocol_contents.decode('utf-8')
     else:
         protocol_str = protocol_contents
+    key = cache_key(protocol_str, filename)
+    protocol = parse_cache.get(key, protocol_str)
+    if protocol is None:
+        protocol = _parse(protocol_str, filename)
+        parse_cache.put(key, protocol)
+    return protocol
+
+
+def _parse(protocol_str: str, filename: str = None) -> Protocol:
     if filename and filename.endswith('.json'):
         return _parse_json(protocol_str, filename)
     elif filename and filename.endswith('.py'):
@@ -178,22 +200,85 @@ def _get_schema_for_protocol(version_num: int) -> Dict[Any, Any]:
     return json.loads(schema.decode('utf-8'))
 
 
-def validate_json(protocol_json: Dict[Any, Any]) -> int:
-    """ Validates a json protocol and returns its schema version """
-    version_num = _get_protocol_schema_version(protocol_json)
-    protocol_schema = _get_schema_for_protocol(version_num)
-    # instruct schema how to resolve all $ref's used in protocol schemas
+@functools.lru_cache(maxsize=None)
+def _get_labware_schema_v2() -> Dict[Any, Any]:
     schema_body = pkgutil.get_data(  # type: ignore
         'opentrons',
         'shared_data/labware/schemas/2.json').decode('utf-8')
-    labware_schema_v2 = json.loads(schema_body)
+    return json.loads(schema_body)
+
+
+def _build_validator(schema: Dict[Any, Any], check: bool = True, **kwargs):
+    """ Check a schema and build a validator for it, as
+    :py:func:`jsonschema.validate` does for each document it validates
+    """
+    cls = jsonschema.validators.validator_for(schema)
+    if check:
+        cls.check_schema(schema)
+    return cls(schema, **kwargs)
 
+
+@functools.lru_cache(maxsize=None)
+def _get_protocol_validator(version_num: int):
+    protocol_schema = _get_schema_for_protocol(version_num)
+    # instruct schema how to resolve all $ref's used in protocol schemas
     resolver = jsonschema.RefResolver(
         protocol_schema.get('$id', ''),
         protocol_schema,
         store={
-            "opentronsLabwareSchemaV2": labware_schema_v2
+            "opentronsLabwareSchemaV2": _get_labware_schema_v2()
         })
-    # do the validation
-    jsonschema.validate(protocol_json, protocol_schema, resolver=resolver)
+    return _build_validator(protocol_schema, resolver=resolver)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_labware_validator():
+    # The labware schema is a draft 7 schema, which versions of jsonschema
+    # that only know draft 4 reject, so it is not checked
+    return _build_validator(_get_labware_schema_v2(), check=False)
+
+
+def _check_structure(document: Any, schema: Dict[Any, Any]):
+    """ Check the top level of a document against its schema.
+
+    This finds documents that are missing whole sections, or are not json
+    objects at all, without validating everything in them first.
+    """
+    if not isinstance(document, dict):
+        raise jsonschema.ValidationError(
+            f'{document!r} is not of type {"object"!r}')
+    for key in schema.get('required', []):
+        if key not in document:
+            raise jsonschema.ValidationError(
+                f'{key!r} is a required property')
+    for key, prop in schema.get('properties', {}).items():
+        schema_type = prop.get('type')
+        if key in document and isinstance(schema_type, str)\
+                and schema_type in _SCHEMA_TYPES\
+                and not isinstance(document[key], _SCHEMA_TYPES[schema_type]):
+            raise jsonschema.ValidationError(
+                f'{document[key]!r} is not of type {schema_type!r}')
+
+
+def _validate(document: Any, validator):
+    _check_structure(document, validator.schema)
+    with _validation_lock:
+        validator.validate(document)
+
+
+def validate_json(protocol_json: Dict[Any, Any]) -> int:
+    """ Validates a json protocol and returns its schema version """
+    if not isinstance(protocol_json, dict):
+        raise jsonschema.ValidationError(
+            f'{protocol_json!r} is not of type {"object"!r}')
+    version_num = _get_protocol_schema_version(protocol_json)
+    _validate(protocol_json, _get_protocol_validator(version_num))
     return version_num
+
+
+def validate_labware_definition(labware_def: Dict[Any, Any]):
+    """ Validates a labware definition against the labware v2 schema
+
+    :raises jsonschema.ValidationError: If the definition is not valid
+    """
+    _validate(labware_def, _get_labware_validator())
@@ -0,0 +1,198 @@
+"""
+opentrons.protocols.parse_cache: a cache of parsed protocols
+
+Parsing a python protocol compiles it, and parsing a json protocol validates
+it against its schema. The same protocol is often parsed again, by another
+session or another run of the command line tools, so parsed protocols are
+kept in memory and, as marshalled code objects, in files named by a hash of
+the protocol, the API version and the interpreter's bytecode version.
+"""
+import hashlib
+import importlib.util
+import json
+import logging
+import marshal
+import os
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+from opentrons.config import CONFIG
+
+from .types import Protocol, PythonProtocol, JsonProtocol
+
+MODULE_LOG = logging.getLogger(__name__)
+
+#: Change this whenever the contents of an entry change
+ENTRY_VERSION = 1
+
+#: The most parsed protocols to keep in memory
+MEMORY_ENTRIES = 32
+
+#: The most parsed protocols to keep on disk
+DISK_ENTRIES = 200
+
+# What is kept about a protocol: everything but its text, in types that
+# marshal can save
+Record = Tuple[Any, ...]
+
+
+def cache_key(text: str, filename: Optional[str]) -> str:
+    """ Hash a protocol and everything parsing it depends on """
+    # opentrons is still being imported when this module is
+    from opentrons import __version__
+    inputs = {
+        'entry_version': ENTRY_VERSION,
+        'api_version': __version__,
+        'implementation': sys.implementation.cache_tag,
+        'magic': importlib.util.MAGIC_NUMBER.hex(),
+        'filename': filename,
+    }
+    hasher = hashlib.sha256(
+        json.dumps(inputs, sort_keys=True).encode('utf-8'))
+    hasher.update(text.encode('utf-8'))
+    return hasher.hexdigest()
+
+
+def _to_record(protocol: Protocol) -> Record:
+    if isinstance(protocol, PythonProtocol):
+        return ('python', protocol.filename, dict(protocol.metadata),
+                protocol.api_level, protocol.contents)
+    return ('json', protocol.filename, protocol.schema_version)
+
+
+def _from_record(record: Record, text: str) -> Protocol:
+    """ Build a protocol from a record. Nothing mutable is shared between
+    the protocols built from one record.
+    """
+    if record[0] == 'python':
+        _, filename, metadata, api_level, code = record
+        return PythonProtocol(
+            text=text, filename=filename, contents=code,
+            metadata=dict(metadata), api_level=api_level)
+    _, filename, schema_version = record
+    return JsonProtocol(
+        text=text, filename=filename, contents=json.loads(text),
+        schema_version=schema_version)
+
+
+class ParseCache:
+    """ Parsed protocols kept in memory and, optionally, on disk.
+
+    Problems reading or writing files are logged and treated as misses,
+    since the cache is only ever an optimization.
+    """
+    def __init__(self,
+                 persist: bool = True,
+                 directory: Path = None,
+                 memory_entries: int = MEMORY_ENTRIES,
+                 disk_entries: int = DISK_ENTRIES) -> None:
+        self._persist = persist
+        self._directory = directory
+        self._memory_entries = memory_entries
+        self._disk_entries = disk_entries
+        self._records: 'OrderedDict[str, Record]' = OrderedDict()
+        # RPC calls parse protocols from several threads
+        self._records_lock = threading.Lock()
+
+    @property
+    def directory(self) -> Path:
+        # Looked up each time since the config can be reloaded
+        return Path(self._directory or CONFIG['parse_cache_dir'])
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f'{key}.marshal'
+
+    def _remember(self, key: str, record: Record):
+        with self._records_lock:
+            self._records[key] = record
+            self._records.move_to_end(key)
+            while len(self._records) > self._memory_entries:
+                self._records.popitem(last=False)
+
+    def _recall(self, key: str) -> Optional[Record]:
+        with self._records_lock:
+            record = self._records.get(key)
+            if record is not None:
+                self._records.move_to_end(key)
+            return record
+
+    def get(self, key: str, text: str) -> Optional[Protocol]:
+        """ The parsed protocol stored under `key`, which must be the key
+        for `text`, or ``None``
+        """
+        record = self._recall(key)
+        if record is None and self._persist:
+            record = self._load(key)
+            if record is not None:
+                self._remember(key, record)
+        if record is None:
+            return None
+        return _from_record(record, text)
+
+    def _load(self, key: str) -> Optional[Record]:
+        path = self._path(key)
+        try:
+            with path.open('rb') as f:
+                record = marshal.load(f)
+            # Mark the entry as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError, TypeError):
+            MODULE_LOG.exception(f'Could not read parse cache {path}')
+            return None
+        if not isinstance(record, tuple)\
+                or record[:1] not in (('python',), ('json',)):
+            return None
+        return record
+
+    def put(self, key: str, protocol: Protocol):
+        record = _to_record(protocol)
+        self._remember(key, record)
+        if self._persist:
+            self._save(key, record)
+
+    def _save(self, key: str, record: Record):
+        path = self._path(key)
+        tmp_path: Optional[Path] = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Batch simulation workers can save the same protocol at once,
+            # so each writer needs its own temporary file
+            fd, tmp_name = tempfile.mkstemp(
+                dir=str(path.parent), prefix=f'{key}.', suffix='.tmp')
+            tmp_path = Path(tmp_name)
+            with os.fdopen(fd, 'wb') as f:
+                marshal.dump(record, f)
+            os.replace(tmp_path, path)
+            self._prune()
+        except (OSError, ValueError):
+            MODULE_LOG.exception(f'Could not write parse cache {path}')
+            if tmp_path and tmp_path.exists():
+                tmp_path.unlink()
+
+    def _prune(self):
+        entries = []
+        for path in self.directory.glob('*.marshal'):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                # Pruned by another process
+                pass
+        entries.sort()
+        for _, path in entries[:-self._disk_entries]:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        with self._records_lock:
+            self._records.clear()
+        if self._persist and self.directory.is_dir():
+            for path in self.directory.glob('*.marshal'):
+                path.unlink()
@@ -274,10 +274,7 @@ class RPCServer(object):
             response['$']['status'] = 'error'
             call_result = {
                 'message': str(eipe),
-                'traceback': ''.join(traceback.format_exception(
-                    type(eipe.original_exc),
-                    eipe.original_exc,
-                    eipe.original_tb))
+                'traceback': eipe.format_traceback()
             }
         except Exception as e:
             log.exception("Exception during RPC call:")
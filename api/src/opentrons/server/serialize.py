@@ -15,7 +15,9 @@ def _get_object_tree(max_depth, path, refs, depth, obj):  # noqa C901
     if isinstance(obj, (str, int, bool, float, complex)) or obj is None:
         return obj
 
-    # If we have ourself in path, it's a circular reference
+    # If we have ourself in path, it's a circular reference. Path holds
+    # every object visited so far, which makes it large for a session with
+    # many commands, so it is a set
     # we are terminating it with a valid id but a value of None
     if hasattr(obj, '__dict__') and id(obj) in path:
         return object_container(None)
@@ -24,7 +26,7 @@ def _get_object_tree(max_depth, path, refs, depth, obj):  # noqa C901
     object_tree = functools.partial(
         _get_object_tree, max_depth, path, refs, depth + 1)
 
-    path += [id(obj)]
+    path.add(id(obj))
 
     # Cut-off at max_depth
     # If max_depth == 0 (evaluates to False) — keep going
@@ -59,5 +61,5 @@ def _get_object_tree(max_depth, path, refs, depth, obj):  # noqa C901
 
 def get_object_tree(obj, max_depth=0):
     refs = {}
-    tree = _get_object_tree(max_depth, [], refs, 0, obj)
+    tree = _get_object_tree(max_depth, set(), refs, 0, obj)
     return (tree, refs)
@@ -5,18 +5,35 @@ a protocol from the command line.
 """
 
 import argparse
+import contextlib
+import datetime
+import functools
+import io
+import json
+import multiprocessing
 import sys
 import logging
 import queue
-from typing import Any, List, Mapping, TextIO
+import time
+from pathlib import Path
+from typing import (Any, Callable, Dict, Iterable, List, Mapping, Optional,
+                    TextIO, Tuple)
 
 import opentrons
 import opentrons.legacy_api.protocols
 import opentrons.commands
 import opentrons.broker
+from opentrons.hardware_control.fast_simulator import FastSimulator
 from opentrons.protocols import parse
 from opentrons.protocols.types import JsonProtocol
 import opentrons.protocol_api.execute
+from opentrons.protocol_api import labware
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None  # type: ignore
 
 
 class AccumulatingHandler(logging.Handler):
@@ -43,27 +60,36 @@ class CommandScraper:
     The :py:attr:`commands` property contains the list of commands
     and log messages integrated together. Each element of the list is
     a dict following the pattern in the docs of :py:meth:`simulate`.
+
+    If a motion clock is given, each command also gets the time it is
+    expected to take on a real robot.
     """
     def __init__(self,
                  logger: logging.Logger,
                  level: str,
-                 broker: opentrons.broker.Broker) -> None:
+                 broker: opentrons.broker.Broker,
+                 motion_clock: Callable[[], float] = None) -> None:
         """ Build the scraper.
 
         :param logger: The :py:class:`logging.logger` to scrape
         :param level: The log level to scrape
         :param broker: Which broker to subscribe to
+        :param motion_clock: A callable returning the estimated seconds of
+                             motion commanded so far, like
+                             :py:attr:`.API.estimated_motion_time`. Delays
+                             are added on top of it from their commands.
         """
         self._logger = logger
         self._broker = broker
+        self._motion_clock = motion_clock
+        self._delay_time = 0.0
+        self._running: List[Tuple[Dict[str, Any], float]] = []
         self._queue = queue.Queue()  # type: ignore
         if level != 'none':
             level = getattr(logging, level.upper(), logging.WARNING)
             self._logger.setLevel(level)
-            logger.addHandler(
-                AccumulatingHandler(
-                    level,
-                    self._queue))
+            self._handler = AccumulatingHandler(level, self._queue)
+            logger.addHandler(self._handler)
         self._depth = 0
         self._commands: List[Mapping[str, Mapping[str, Any]]] = []
         self._unsub = self._broker.subscribe(
@@ -75,29 +101,51 @@ class CommandScraper:
         """ The list of commands. See :py:meth:`simulate` """
         return self._commands
 
-    def __del__(self):
+    def close(self):
+        """ Stop scraping. The commands scraped so far are kept. """
         if hasattr(self, '_handler'):
             self._logger.removeHandler(self._handler)
+            del self._handler
         if hasattr(self, '_unsub'):
             self._unsub()
+            del self._unsub
+
+    def __del__(self):
+        self.close()
+
+    def _now(self) -> float:
+        motion_time = self._motion_clock() if self._motion_clock else 0.0
+        return motion_time + self._delay_time
 
     def _command_callback(self, message):
         """ The callback subscribed to the broker """
         payload = message['payload']
         if message['$'] == 'before':
-            self._commands.append({'level': self._depth,
-                                   'payload': payload,
-                                   'logs': []})
+            command: Dict[str, Any] = {'level': self._depth,
+                                       'payload': payload,
+                                       'logs': []}
+            self._commands.append(command)
             self._depth += 1
+            if self._motion_clock:
+                self._running.append((command, self._now()))
+                if message['name'] == opentrons.commands.command_types.DELAY:
+                    # simulated delays do not wait, so they are not on the
+                    # motion clock
+                    self._delay_time += (payload.get('seconds', 0)
+                                         + payload.get('minutes', 0) * 60)
         else:
             while not self._queue.empty():
                 self._commands[-1]['logs'].append(self._queue.get())
             self._depth = max(self._depth-1, 0)
+            if self._running:
+                command, started = self._running.pop()
+                command['duration'] = self._now() - started
 
 
 def simulate(protocol_file: TextIO,
              propagate_logs=False,
-             log_level='warning') -> List[Mapping[str, Any]]:
+             log_level='warning',
+             fast=False) -> List[Mapping[str, Any]]:
     """
     Simulate the protocol itself.
 
@@ -125,6 +173,9 @@ def simulate(protocol_file: TextIO,
                        a payload do ``payload['text'].format(**payload)``.
         - ``logs``: Any log messages that occurred during execution of this
                     command, as a logging.LogRecord
+        - ``duration``: How long this command (including any nested
+                        commands) is expected to take on a real robot, in
+                        seconds. See :py:func:`estimated_run_time`.
 
     :param file-like protocol_file: The protocol file to simulate.
     :param propagate_logs: Whether this function should allow logs from the
@@ -138,6 +189,12 @@ def simulate(protocol_file: TextIO,
     :param log_level: The level of logs to capture in the runlog. Default:
                       ``'warning'``
     :type log_level: 'debug', 'info', 'warning', or 'error'
+    :param fast: Whether to simulate Protocol API V2 protocols with a
+                 :py:class:`.FastSimulator`, which runs the hardware
+                 simulator in the calling thread instead of on an event
+                 loop thread. The run log is the same either way. Default:
+                 ``False``
+    :type fast: bool
     :returns List[Dict[str, Dict[str, Any]]]: A run log for user output.
     """
     stack_logger = logging.getLogger('opentrons')
@@ -147,23 +204,55 @@ def simulate(protocol_file: TextIO,
     protocol = parse.parse(contents, protocol_file.name)
 
     if opentrons.config.feature_flags.use_protocol_api_v2():
-        context = opentrons.protocol_api.contexts.ProtocolContext()
+        if fast:
+            context = opentrons.protocol_api.contexts.ProtocolContext(
+                hardware=FastSimulator())
+        else:
+            context = opentrons.protocol_api.contexts.ProtocolContext()
         context.home()
-        scraper = CommandScraper(stack_logger, log_level, context.broker)
-        opentrons.protocol_api.execute.run_protocol(protocol,
-                                                    simulate=True,
-                                                    context=context)
+        hardware = context._hw_manager.hardware
+        scraper = CommandScraper(
+            stack_logger, log_level, context.broker,
+            lambda: hardware.estimated_motion_time)
+        try:
+            opentrons.protocol_api.execute.run_protocol(protocol,
+                                                        simulate=True,
+                                                        context=context)
+        finally:
+            scraper.close()
     else:
         opentrons.robot.disconnect()
+        driver = opentrons.robot._driver
         scraper = CommandScraper(stack_logger, log_level,
-                                 opentrons.robot.broker)
-        if isinstance(protocol, JsonProtocol):
-            opentrons.legacy_api.protocols.execute_protocol(protocol)
-        else:
-            exec(protocol.contents, {})
+                                 opentrons.robot.broker,
+                                 lambda: driver.estimated_motion_time)
+        try:
+            if isinstance(protocol, JsonProtocol):
+                opentrons.legacy_api.protocols.execute_protocol(protocol)
+            else:
+                exec(protocol.contents, {})
+        finally:
+            scraper.close()
     return scraper.commands
 
 
+def estimated_run_time(runlog: List[Mapping[str, Any]]) -> float:
+    """
+    Predict how long a simulated protocol will take to run on a robot.
+
+    The estimate adds up the motion planned by each top-level command of the
+    run log (see ``duration`` in :py:meth:`simulate`) using the robot's
+    configured speeds and accelerations, and the time spent in delays. It
+    does not include pauses, which wait for the user, or time spent waiting
+    for modules.
+
+    :param runlog: The output of a call to :py:func:`simulate`
+    :returns float: The estimated run time in seconds
+    """
+    return sum(command.get('duration', 0) for command in runlog
+               if command['level'] == 0)
+
+
 def format_runlog(runlog: List[Mapping[str, Any]]) -> str:
     """
     Format a run log (return value of :py:meth:`simulate``) into a
@@ -185,6 +274,112 @@ def format_runlog(runlog: List[Mapping[str, Any]]) -> str:
     return '\n'.join(to_ret)
 
 
+_warmed_up = False
+
+
+def _warm_up():
+    """ Read every standard labware definition into the definition cache.
+
+    Batch simulation calls this before it starts its workers, so that forked
+    workers share the cache, and in each worker, so that workers that are not
+    forked build their own.
+    """
+    global _warmed_up
+    if _warmed_up:
+        return
+    for def_path in labware.STANDARD_DEFS_PATH.glob('*/*.json'):
+        labware.get_labware_definition(def_path.parent.name,
+                                       labware.OPENTRONS_NAMESPACE,
+                                       int(def_path.stem))
+    _warmed_up = True
+
+
+def _simulate_in_batch(protocol_path: str,
+                       log_level: str,
+                       fast: bool) -> Dict[str, Any]:
+    """ Simulate one protocol of a batch and summarize how it went """
+    if not opentrons.config.feature_flags.use_protocol_api_v2():
+        opentrons.robot.reset()
+    result: Dict[str, Any] = {'protocol': protocol_path}
+    start = time.perf_counter()
+    try:
+        # Output from protocols would be mixed up with the summary
+        with open(protocol_path) as protocol_file,\
+                contextlib.redirect_stdout(io.StringIO()):
+            runlog = simulate(protocol_file, log_level=log_level, fast=fast)
+    except Exception as e:
+        result.update(status='error', error=f'{type(e).__name__}: {e}',
+                      commands=0, estimated_run_time=None)
+    else:
+        result.update(status='ok', error=None, commands=len(runlog),
+                      estimated_run_time=estimated_run_time(runlog))
+    finally:
+        result['duration'] = time.perf_counter() - start
+        result['peak_rss'] = _peak_rss()
+    return result
+
+
+def _peak_rss() -> Optional[int]:
+    """ The peak resident set size of this process so far in bytes, or
+    None where it cannot be measured
+    """
+    if not resource:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def simulate_batch(protocol_paths: Iterable[Path],
+                   jobs: int = None,
+                   log_level: str = 'warning',
+                   fast: bool = False) -> List[Dict[str, Any]]:
+    """
+    Simulate many protocols in a pool of worker processes.
+
+    Each worker simulates one protocol after another, so imports and labware
+    definitions are only loaded once per worker rather than once per
+    protocol.
+
+    :param protocol_paths: The protocol files to simulate
+    :param jobs: How many worker processes to use. If not specified, one per
+                 CPU.
+    :param log_level: See :py:func:`simulate`
+    :param fast: See :py:func:`simulate`
+    :returns: A summary of each protocol, in the order they were given, as a
+              dict with the keys
+
+              - ``protocol``: The path of the protocol file
+              - ``status``: ``'ok'`` if the simulation succeeded, or
+                ``'error'``
+              - ``error``: The exception that stopped the simulation, or
+                ``None``
+              - ``commands``: How many commands are in the run log
+              - ``estimated_run_time``: See :py:func:`estimated_run_time`
+              - ``duration``: How long simulating the protocol took, in
+                seconds
+              - ``peak_rss``: The peak resident set size of the worker that
+                simulated the protocol, in bytes, as of when it finished.
+                Workers simulate several protocols, so this is the most
+                memory any of them needed so far rather than what this
+                protocol needed on its own. ``None`` on Windows.
+    """
+    paths = [str(path) for path in protocol_paths]
+    _warm_up()
+    with multiprocessing.Pool(jobs, initializer=_warm_up) as pool:
+        return pool.map(functools.partial(_simulate_in_batch,
+                                          log_level=log_level, fast=fast),
+                        paths, chunksize=1)
+
+
+def find_protocols(directory: Path) -> List[Path]:
+    """ The Python and JSON protocol files in `directory` and its
+    subdirectories
+    """
+    return sorted(path for path in Path(directory).glob('**/*')
+                  if path.suffix in ('.py', '.json') and path.is_file())
+
+
 def get_arguments(
         parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
     """ Get the argument parser for this module
@@ -203,7 +398,7 @@ def get_arguments(
         help='Specify the level filter for logs to show on the command line. '
         'Log levels below warning can be chatty. If "none", do not show logs')
     parser.add_argument(
-        'protocol', metavar='PROTOCOL',
+        'protocol', metavar='PROTOCOL', nargs='?',
         type=argparse.FileType('rb'),
         help='The protocol file to simulate. If you pass \'-\', you can pipe '
         'the protocol via stdin; this could be useful if you want to use this '
@@ -230,12 +425,37 @@ def main() -> int:
         help='What to output during simulations',
         choices=['runlog', 'nothing'],
         default='runlog')
+    parser.add_argument(
+        '--fast', action='store_true',
+        help='Simulate Protocol API V2 protocols without an event loop '
+        'thread for the hardware simulator. Faster, with the same output')
+    parser.add_argument(
+        '--batch', metavar='DIR', type=Path,
+        help='Instead of PROTOCOL, simulate every protocol in this directory '
+        'and its subdirectories and print a JSON summary of the results')
+    parser.add_argument(
+        '-j', '--jobs', type=int,
+        help='How many protocols to simulate at once with --batch. Default: '
+        'one per CPU')
 
     args = parser.parse_args()
 
-    runlog = simulate(args.protocol, log_level=args.log_level)
+    if args.batch:
+        summary = simulate_batch(find_protocols(args.batch), args.jobs,
+                                 log_level=args.log_level, fast=args.fast)
+        print(json.dumps(summary, indent=2))
+        return 0 if all(result['status'] == 'ok'
+                        for result in summary) else 1
+    if not args.protocol:
+        parser.error('a protocol file or --batch is required')
+
+    runlog = simulate(args.protocol, log_level=args.log_level,
+                      fast=args.fast)
     if args.output == 'runlog':
         print(format_runlog(runlog))
+        run_time = datetime.timedelta(
+            seconds=round(estimated_run_time(runlog)))
+        print(f'Estimated run time: {run_time}')
     return 0
 
 
@@ -14,6 +14,8 @@ class PipetteNotAttachedError(KeyError):
 
 
 class Point(NamedTuple):
+    # Points are made for every position a protocol touches, so the methods
+    # below unpack the tuple rather than go through the named properties
     x: float = 0.0
     y: float = 0.0
     z: float = 0.0
@@ -21,17 +23,21 @@ class Point(NamedTuple):
     def __eq__(self, other: Any) -> bool:
         if not isinstance(other, Point):
             return False
-        return self.x == other.x and self.y == other.y and self.z == other.z
+        return tuple.__eq__(self, other)
 
     def __add__(self, other: Any) -> 'Point':
         if not isinstance(other, Point):
             return NotImplemented
-        return Point(self.x + other.x, self.y + other.y, self.z + other.z)
+        x, y, z = self
+        ox, oy, oz = other
+        return tuple.__new__(Point, (x + ox, y + oy, z + oz))
 
     def __sub__(self, other: Any) -> 'Point':
         if not isinstance(other, Point):
             return NotImplemented
-        return Point(self.x - other.x, self.y - other.y, self.z - other.z)
+        x, y, z = self
+        ox, oy, oz = other
+        return tuple.__new__(Point, (x - ox, y - oy, z - oz))
 
     def __str__(self):
         return '({}, {}, {})'.format(self.x, self.y, self.z)
@@ -81,7 +87,7 @@ class Location(NamedTuple):
             >>> assert loc.point == Point(1, 1, 1)  # True
 
         """
-        return self._replace(point=self.point + point)
+        return tuple.__new__(Location, (self[0] + point, self[1]))
 
 
 class Mount(enum.Enum):
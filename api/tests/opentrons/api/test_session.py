@@ -1,7 +1,10 @@
+import asyncio
 import itertools
 
 import pytest
 
+from opentrons import config
+
 from opentrons.api.session import (
     _accumulate, _get_labware, _dedupe)
 from tests.opentrons.conftest import state
@@ -108,7 +111,11 @@ async def test_load_and_run_v2(
     session = main_router.session_manager.create(
         name='<blank>',
         text=protocol.text)
-    assert main_router.notifications.queue.qsize() == 1
+    # Simulation progress, then the loaded session
+    topics = [n['topic'] for n in main_router.notifications.queue._queue]
+    assert topics.count('session') == 1
+    assert topics[0] == topics[-2] == 'simulation'
+    assert topics[-1] == 'session'
     assert session.state == 'loaded'
     assert session.command_log == {}
 
@@ -121,6 +128,8 @@ async def test_load_and_run_v2(
     res = []
     index = 0
     async for notification in main_router.notifications:
+        if notification['topic'] == 'simulation':
+            continue
         payload = notification['payload']
         index += 1  # Command log in sync with add-command events emitted
         if type(payload) is dict:
@@ -151,7 +160,11 @@ async def test_load_and_run(
     session = main_router.session_manager.create(
         name='<blank>',
         text=protocol.text)
-    assert main_router.notifications.queue.qsize() == 1
+    # Simulation progress, then the loaded session
+    topics = [n['topic'] for n in main_router.notifications.queue._queue]
+    assert topics.count('session') == 1
+    assert topics[0] == topics[-2] == 'simulation'
+    assert topics[-1] == 'session'
     assert session.state == 'loaded'
     assert session.command_log == {}
     main_router.calibration_manager.tip_probe(session.instruments[0])
@@ -166,6 +179,8 @@ async def test_load_and_run(
     res = []
     index = 0
     async for notification in main_router.notifications:
+        if notification['topic'] == 'simulation':
+            continue
         payload = notification['payload']
         index += 1  # Command log in sync with add-command events emitted
         if type(payload) is dict:
@@ -345,7 +360,8 @@ async def test_session_create_error(main_router):
 
     with pytest.raises(TimeoutError):
         # No state change is expected
-        await main_router.wait_until(lambda _: True)
+        await main_router.wait_until(
+            lambda notification: notification['topic'] == 'session')
 
     with pytest.raises(ZeroDivisionError):
         main_router.session_manager.create(
@@ -354,7 +370,8 @@ async def test_session_create_error(main_router):
 
     with pytest.raises(TimeoutError):
         # No state change is expected
-        await main_router.wait_until(lambda _: True)
+        await main_router.wait_until(
+            lambda notification: notification['topic'] == 'session')
 
 
 async def test_session_metadata(main_router):
@@ -380,3 +397,106 @@ def run(ctx):
         name='<blank>',
         text=prot)
     assert session.metadata == expected
+
+
+_CACHED_PROTOCOL = """
+def run(ctx):
+    tiprack = ctx.load_labware('opentrons_96_tiprack_300ul', 1, 'tips')
+    magdeck = ctx.load_module('magdeck', 4)
+    plate = magdeck.load_labware('biorad_96_wellplate_200ul_pcr')
+    other = ctx.load_labware('corning_96_wellplate_360ul_flat', 2)
+    pip = ctx.load_instrument('p300_single', 'right', tip_racks=[tiprack])
+    pip.transfer(50, plate.wells()[:3], other.wells()[:3])
+    magdeck.engage()
+"""
+
+
+def _describe(session):
+    return (session.commands,
+            [(c.name, c.slot, c.position, [i.name for i in c.instruments])
+             for c in session.containers],
+            [(i.name, i.mount, [c.name for c in i.containers],
+              [c.name for c in i.tip_racks])
+             for i in session.instruments],
+            [(m.name, m.slot) for m in session.modules])
+
+
+@pytest.mark.api2_only
+def test_simulation_cache(session_manager, monkeypatch):
+    from opentrons.api import session as session_mod
+    first = _describe(session_manager.create(
+        name='cached.py', text=_CACHED_PROTOCOL))
+
+    def no_simulation(*args, **kwargs):
+        raise AssertionError('simulated a cached protocol')
+
+    monkeypatch.setattr(session_mod, 'run_protocol', no_simulation)
+    session = session_manager.create(name='cached.py', text=_CACHED_PROTOCOL)
+    assert _describe(session) == first
+    labware_objs = {c.name: c._container for c in session.containers}
+    tiprack = labware_objs['opentrons_96_tiprack_300ul']
+    assert session.instruments[0]._instrument.tip_racks == [tiprack]
+    assert str(tiprack) == 'tips on 1'
+    assert labware_objs['biorad_96_wellplate_200ul_pcr'].parent\
+        is session._modules[0]
+
+    # A different protocol is simulated
+    with pytest.raises(AssertionError):
+        session_manager.create(name='cached.py',
+                               text=_CACHED_PROTOCOL + '\n')
+
+
+@pytest.mark.api2_only
+def test_simulation_cache_error(session_manager, monkeypatch):
+    from opentrons.api import session as session_mod
+    from opentrons.api.simulation_cache import CachedSimulationError
+    from opentrons.protocol_api.execute import ExceptionInProtocolError
+    text = """
+def run(ctx):
+    ctx.comment('hi')
+    1/0
+"""
+    with pytest.raises(ExceptionInProtocolError) as first:
+        session_manager.create(name='error.py', text=text)
+
+    def no_simulation(*args, **kwargs):
+        raise AssertionError('simulated a cached protocol')
+
+    monkeypatch.setattr(session_mod, 'run_protocol', no_simulation)
+    with pytest.raises(CachedSimulationError) as cached:
+        session_manager.create(name='error.py', text=text)
+    assert str(cached.value) == str(first.value)\
+        == 'ZeroDivisionError [line 4]: division by zero'
+    assert cached.value.format_traceback()\
+        == first.value.format_traceback()
+
+
+@pytest.mark.api2_only
+async def test_simulation_progress_and_cancel(main_router, loop):
+    from opentrons.api.session import SimulationCancelled
+    text = """
+def run(ctx):
+    for _ in range(1000000):
+        ctx.comment('still going')
+"""
+    creating = loop.run_in_executor(
+        None, main_router.session_manager.create, 'long.py', text)
+
+    # Progress is published from the simulating thread while the event loop
+    # keeps running
+    progress = await main_router.wait_until(
+        lambda n: n['topic'] == 'simulation' and n['payload']['commands'],
+        timeout=5)
+    assert progress[0]['payload'] == {
+        'name': 'long.py', 'state': 'simulating', 'commands': 0}
+    assert progress[-1]['payload']['state'] == 'simulating'
+    main_router.session_manager.cancel_simulation()
+
+    with pytest.raises(SimulationCancelled):
+        await asyncio.wait_for(creating, 5, loop=loop)
+    final = await main_router.wait_until(
+        lambda n: n['payload']['state'] != 'simulating')
+    assert final[-1]['payload']['state'] == 'cancelled'
+    assert main_router.session_manager.session is None
+    # A cancelled simulation is not cached
+    assert not list(config.CONFIG['simulation_cache_dir'].iterdir())
@@ -66,3 +66,45 @@ def test_add_listener():
     fake_obj.A(0, 2)
 
     assert calls == expected, 'No calls expected after unsubscribe()'
+
+
+def test_no_subscribers_skips_payload(monkeypatch):
+    built = []
+
+    def counting_command(arg1, meta=None, arg2='', arg3=''):
+        built.append(arg1)
+        return my_command(arg1, meta, arg2, arg3)
+
+    class Counted(CommandPublisher):
+        def __init__(self):
+            super().__init__(None)
+
+        @commands.publish.both(command=counting_command, meta='{arg1}')
+        def D(self, arg1, arg2=''):
+            return arg1
+
+    fake_obj = Counted()
+    assert not fake_obj.broker.has_subscribers('command')
+    assert fake_obj.D(1) == 1
+    assert built == []
+
+    unsubscribe = fake_obj.broker.subscribe('command', lambda message: None)
+    assert fake_obj.broker.has_subscribers('command')
+    fake_obj.D(2, arg2='x')
+    assert built == [2, 2]
+    unsubscribe()
+    assert not fake_obj.broker.has_subscribers('command')
+
+
+async def test_notifications_from_other_threads(loop):
+    from concurrent.futures import ThreadPoolExecutor
+    from opentrons.broker import Broker, Notifications
+
+    broker = Broker()
+    notifications = Notifications(['topic'], broker, loop=loop)
+    broker.publish('topic', 'from the loop')
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        await loop.run_in_executor(
+            executor, broker.publish, 'topic', 'from a thread')
+    assert await notifications.__anext__() == 'from the loop'
+    assert await notifications.__anext__() == 'from a thread'
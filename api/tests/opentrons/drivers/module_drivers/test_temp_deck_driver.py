@@ -45,6 +45,30 @@ def test_get_temp_deck_temperature():
     assert temp_deck.target == 99
 
 
+def test_read_temp_deck_temperature():
+    # read_temperature does its serial I/O on the calling thread, so the
+    # temperature is up to date as soon as it returns
+    import types
+    from opentrons.drivers.temp_deck import TempDeck
+
+    temp_deck = TempDeck()
+    temp_deck.simulating = False
+    command_log = []
+
+    def _mock_send_command(self, command, timeout=None, tag=None):
+        nonlocal command_log
+        command_log += [command]
+        return 'T:99 C:90'
+
+    temp_deck._send_command = types.MethodType(_mock_send_command, temp_deck)
+
+    assert temp_deck.read_temperature() == ''
+    assert command_log == ['M105']
+    assert temp_deck._update_thread is None
+    assert temp_deck.temperature == 90
+    assert temp_deck.target == 99
+
+
 def test_fail_get_temp_deck_temperature():
     # Get the curent and target temperatures
     # If get fails, temp_deck temperature is not updated
@@ -118,8 +142,9 @@ def test_fail_set_temp_deck_temperature(monkeypatch):
         nonlocal error_msg
         return error_msg
 
-    serial_communication.write_and_return = types.MethodType(
-        _raise_error, serial_communication)
+    monkeypatch.setattr(
+        serial_communication, 'write_and_return',
+        types.MethodType(_raise_error, serial_communication))
 
     from opentrons.drivers.temp_deck import TempDeck
     temp_deck = TempDeck()
@@ -135,8 +160,9 @@ def test_fail_set_temp_deck_temperature(monkeypatch):
         nonlocal error_msg
         return error_msg
 
-    serial_communication.write_and_return = types.MethodType(
-        _raise_error, serial_communication)
+    monkeypatch.setattr(
+        serial_communication, 'write_and_return',
+        types.MethodType(_raise_error, serial_communication))
 
     res = temp_deck.set_temperature(-9)
     assert res == error_msg
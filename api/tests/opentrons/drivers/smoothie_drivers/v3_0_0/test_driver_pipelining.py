@@ -0,0 +1,133 @@
+import time
+
+import pytest
+
+from opentrons.drivers.smoothie_drivers.driver_3_0 import (
+    SmoothieError, DEFAULT_PIPELINE_WINDOW
+)
+
+
+class SimulatedSmoothieSerial:
+    """ A stand-in for a serial.Serial connected to a Smoothieboard.
+
+    Every line written is answered with Smoothie's ack once `latency` seconds
+    have passed since it was written, which is roughly what a round trip over
+    the real UART looks like. Responses for lines containing a key of
+    `responses` get the associated value instead.
+    """
+    def __init__(self, latency=0.0):
+        self.port = 'simulated'
+        self.timeout = 1
+        self.is_open = True
+        self.latency = latency
+        self.responses = {
+            'M114.2': 'ok MCS: X:418 Y:353 Z:218 A:218 B:19 C:19\r\nok\r\n'
+                      'ok\r\n',
+            'G28.6': 'X:1 Y:1 Z:1 A:1 B:1 C:1\r\nok\r\nok\r\n',
+            'M119': 'X_max:0 Y_max:0 Z_max:0 A_max:0 B_max:0 C_max:0 _pins '
+                    '(XL)2.01:0 (YL)2.01:0 (ZL)2.01:0 (AL)2.01:0 (BL)2.01:0 '
+                    '(CL)2.01:0 Probe: 0\r\nok\r\nok\r\n'
+        }
+        self.written = []
+        self.max_in_flight = 0
+        self._pending = []
+
+    def write(self, data):
+        command = data.decode().strip()
+        self.written.append(command)
+        response = 'ok\r\nok\r\n'
+        for key, value in self.responses.items():
+            if key in command:
+                response = value
+        self._pending.append((time.perf_counter() + self.latency,
+                              response.encode()))
+        self.max_in_flight = max(self.max_in_flight, len(self._pending))
+
+    def read_until(self, terminator):
+        if not self._pending:
+            return b''
+        ready_at, response = self._pending.pop(0)
+        remaining = ready_at - time.perf_counter()
+        if remaining > 0:
+            time.sleep(remaining)
+        return response
+
+    def reset_input_buffer(self):
+        self._pending.clear()
+
+    def close(self):
+        pass
+
+    def open(self):
+        pass
+
+
+@pytest.fixture
+def pipelined(smoothie):
+    smoothie.home()
+    smoothie.simulating = False
+    smoothie._connection = SimulatedSmoothieSerial()
+    smoothie.set_pipeline_window(DEFAULT_PIPELINE_WINDOW)
+    yield smoothie
+    smoothie._connection = None
+    smoothie.simulating = True
+
+
+def test_disabled_by_default(smoothie):
+    smoothie.home()
+    smoothie.simulating = False
+    smoothie._connection = SimulatedSmoothieSerial()
+    smoothie.move({'X': 10})
+    smoothie.move({'X': 20})
+    assert smoothie._connection.written[1] == 'M400'
+    assert smoothie._connection.written[3] == 'M400'
+    smoothie._connection = None
+    smoothie.simulating = True
+
+
+def test_moves_are_pipelined(pipelined):
+    conn = pipelined._connection
+    for x in range(10):
+        pipelined.move({'X': x + 1, 'Y': x + 1})
+    assert 'M400' not in conn.written
+    assert len(conn.written) == 10
+    assert conn.max_in_flight == DEFAULT_PIPELINE_WINDOW
+    assert len(pipelined._in_flight) <= DEFAULT_PIPELINE_WINDOW
+    assert pipelined.position['X'] == 10
+
+
+def test_sync_points_flush(pipelined):
+    conn = pipelined._connection
+    pipelined.move({'X': 10})
+    pipelined.move({'B': 5})
+    assert not pipelined.switch_state['X']
+    assert not pipelined._in_flight
+    # both moves, the plunger dwell current, then the forced sync
+    assert conn.written[:3] == [
+        'M907 A0.1 B0.05 C0.05 X1.25 Y0.3 Z0.1 G4P0.005 G0X10',
+        'M907 B0.5 X0.3 G4P0.005 G0B5',
+        'M907 B0.05 G4P0.005',
+    ]
+    assert conn.written[3:] == ['M400', 'M119', 'M400']
+
+
+def test_pipelined_error(pipelined):
+    conn = pipelined._connection
+    conn.responses['G0X10'] = 'error: Hard limit +X\r\nok\r\nok\r\n'
+    pipelined.move({'Y': 10})
+    pipelined.move({'X': 10})
+    with pytest.raises(SmoothieError) as e:
+        pipelined.move({'Y': 20})
+        pipelined.flush_pipeline()
+    # the error names the command that failed, not the one that read it
+    assert 'G0X10' in e.value.command
+    assert 'M999' in conn.written
+    assert not pipelined._in_flight
+
+
+def test_disable_flushes(pipelined):
+    pipelined.move({'X': 10})
+    assert pipelined._in_flight
+    pipelined.set_pipeline_window(0)
+    assert not pipelined._in_flight
+    assert pipelined._connection.written[-1] == 'M400'
@@ -0,0 +1,80 @@
+from math import isclose, sqrt
+
+import pytest
+
+from opentrons.drivers import serial_communication
+from opentrons.drivers.smoothie_drivers import driver_3_0, kinematics
+
+
+def test_trapezoid_duration():
+    # 100mm at 50mm/s, 100mm/s^2: 0.5s ramping each way covers 25mm
+    assert isclose(kinematics.trapezoid_duration(100, 50, 100), 2.5)
+    # too short to reach top speed: accelerate halfway, decelerate halfway
+    assert isclose(kinematics.trapezoid_duration(4, 50, 100),
+                   2 * sqrt(4 / 100))
+    assert kinematics.trapezoid_duration(0, 50, 100) == 0
+    with pytest.raises(ValueError):
+        kinematics.trapezoid_duration(10, 0, 100)
+
+
+def test_move_duration_axis_limits():
+    start = {'X': 0, 'Y': 0, 'Z': 0}
+    max_speeds = {'X': 600, 'Y': 400, 'Z': 100}
+    accelerations = {'X': 10000, 'Y': 10000, 'Z': 10000}
+    # a pure X move runs at the feedrate
+    assert isclose(
+        kinematics.move_duration(start, {'X': 300}, max_speeds,
+                                 accelerations, 300),
+        kinematics.trapezoid_duration(300, 300, 10000))
+    # a pure Z move is capped by Z's max speed
+    assert isclose(
+        kinematics.move_duration(start, {'Z': 100}, max_speeds,
+                                 accelerations, 300),
+        kinematics.trapezoid_duration(100, 100, 10000))
+    # a diagonal is slowed down so Z stays under its max speed
+    diagonal = kinematics.move_duration(
+        start, {'X': 100, 'Z': 100}, max_speeds, accelerations, 300)
+    assert isclose(diagonal, kinematics.trapezoid_duration(
+        sqrt(2) * 100, sqrt(2) * 100, sqrt(2) * 10000))
+    # axes that do not move, or are None, cost nothing
+    assert kinematics.move_duration(
+        start, {'X': 0, 'Y': None}, max_speeds, accelerations, 300) == 0
+
+
+def test_move_wait_timeout(smoothie, monkeypatch):
+    smoothie.home()
+    smoothie.simulating = False
+    waits = []
+
+    def write_with_log(command, ack, connection, timeout, tag=None):
+        if command.startswith(driver_3_0.GCODES['WAIT']):
+            waits.append(timeout)
+        return driver_3_0.SMOOTHIE_ACK
+
+    monkeypatch.setattr(serial_communication, 'write_and_return',
+                        write_with_log)
+
+    before = smoothie.estimated_motion_time
+    smoothie.move({'X': 10})
+    short_move = smoothie.estimated_motion_time - before
+    smoothie.set_speed(1)
+    smoothie.move({'X': 110})
+    long_move = smoothie.estimated_motion_time - before - short_move
+    smoothie.simulating = True
+
+    # the wait after each move scales with how long the move should take;
+    # the waits in between follow current and speed changes
+    assert isclose(short_move, kinematics.trapezoid_duration(
+        408, driver_3_0.DEFAULT_AXES_SPEED, smoothie._acceleration['X']))
+    assert isclose(long_move, 100, rel_tol=0.01)
+    for duration in (short_move, long_move):
+        assert pytest.approx(
+            duration * driver_3_0.MOVEMENT_TIMEOUT_SCALE
+            + driver_3_0.MOVEMENT_TIMEOUT_MARGIN) in waits
+    assert max(waits) == driver_3_0.DEFAULT_WAIT_TIMEOUT
+
+
+def test_delay_is_estimated(smoothie):
+    before = smoothie.estimated_motion_time
+    smoothie.delay(12.5)
+    assert smoothie.estimated_motion_time - before == 12.5
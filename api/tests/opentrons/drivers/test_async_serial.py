@@ -0,0 +1,63 @@
+import os
+import tty
+
+import pytest
+
+from opentrons.drivers import serial_communication
+from opentrons.drivers.serial_communication import (
+    AsyncSerial, SerialNoResponse
+)
+
+
+@pytest.fixture
+def pty(loop):
+    """ An AsyncSerial connected to one end of a pseudoterminal. The other end
+    (a raw file descriptor) plays the device.
+    """
+    device, host = os.openpty()
+    # Raw mode so the line discipline passes bytes through untouched
+    tty.setraw(host)
+    conn = AsyncSerial.connect(os.ttyname(host), loop=loop)
+    yield conn, device
+    conn.close()
+    os.close(device)
+    os.close(host)
+
+
+async def test_write_and_return(pty, loop):
+    conn, device = pty
+
+    def answer():
+        request = os.read(device, 1024)
+        assert request == b'M105\r\n'
+        os.write(device, b'T:25.0 C:20.1\r\nok\r\nok\r\n')
+
+    loop.add_reader(device, answer)
+    try:
+        response = await conn.write_and_return(
+            'M105\r\n', 'ok\r\nok\r\n', timeout=1)
+    finally:
+        loop.remove_reader(device)
+    assert response == 'T:25.0 C:20.1'
+
+
+async def test_buffers_unsolicited_data(pty, loop):
+    conn, device = pty
+    os.write(device, b'ERROR: thermal runaway\r\n')
+    await conn.wait_for_data()
+    line = await conn.read_until('\r\n', timeout=1)
+    assert line == b'ERROR: thermal runaway\r\n'
+    assert conn.in_waiting == 0
+
+
+async def test_timeout(pty, loop):
+    conn, device = pty
+    with pytest.raises(SerialNoResponse):
+        await conn.write_and_return('M105\r\n', 'ok\r\nok\r\n', timeout=0.1)
+    # The loop stayed free while waiting: the request reached the device
+    assert os.read(device, 1024) == b'M105\r\n'
+
+
+def test_ack_is_stripped():
+    assert serial_communication._parse_serial_response(
+        b'\r\nT:1\r\nok\r\nok\r\n', b'ok\r\nok\r\n') == b'T:1'
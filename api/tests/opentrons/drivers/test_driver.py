@@ -152,13 +152,14 @@ def test_dwell_and_activate_axes(smoothie, monkeypatch):
     expected = [
         ['M907 A0.1 B0.05 C0.05 X1.25 Y0.3 Z0.1 G4P0.005'],
         ['M400'],
-        ['M907 A0.1 B0.05 C0.05 X0.3 Y0.3 Z0.1 G4P0.005'],
+        # only currents that changed are sent again
+        ['M907 X0.3 G4P0.005'],
         ['M400'],
-        ['M907 A0.1 B0.5 C0.5 X1.25 Y1.25 Z0.1 G4P0.005'],
+        ['M907 B0.5 C0.5 X1.25 Y1.25 G4P0.005'],
         ['M400'],
-        ['M907 A0.1 B0.5 C0.05 X0.3 Y1.25 Z0.1 G4P0.005'],
+        ['M907 C0.05 X0.3 G4P0.005'],
         ['M400'],
-        ['M907 A0.1 B0.05 C0.05 X0.3 Y0.3 Z0.1 G4P0.005'],
+        ['M907 B0.05 Y0.3 G4P0.005'],
         ['M400'],
     ]
     # from pprint import pprint
@@ -224,23 +225,23 @@ def test_plunger_commands(smoothie, monkeypatch):
     expected = [
         ['M907 A0.8 B0.5 C0.5 X0.3 Y0.3 Z0.8 G4P0.005 G28.2.+[ABCZ].+'],
         ['M400'],
-        ['M907 A0.1 B0.05 C0.05 X0.3 Y0.3 Z0.1 G4P0.005'],
+        ['M907 A0.1 B0.05 C0.05 Z0.1 G4P0.005'],
         ['M400'],
         ['M203.1 Y50'],
         ['M400'],
-        ['M907 A0.1 B0.05 C0.05 X0.3 Y0.8 Z0.1 G4P0.005 G91 G0Y-28 G0Y10 G90'],
+        ['M907 Y0.8 G4P0.005 G91 G0Y-28 G0Y10 G90'],
         ['M400'],
         ['M203.1 X80'],
         ['M400'],
-        ['M907 A0.1 B0.05 C0.05 X1.25 Y0.3 Z0.1 G4P0.005 G28.2X'],
+        ['M907 X1.25 Y0.3 G4P0.005 G28.2X'],
         ['M400'],
         ['M203.1 A125 B40 C40 X600 Y400 Z125'],
         ['M400'],
-        ['M907 A0.1 B0.05 C0.05 X0.3 Y0.3 Z0.1 G4P0.005'],
+        ['M907 X0.3 G4P0.005'],
         ['M400'],
         ['M203.1 Y80'],
         ['M400'],
-        ['M907 A0.1 B0.05 C0.05 X0.3 Y1.25 Z0.1 G4P0.005 G28.2Y'],
+        ['M907 Y1.25 G4P0.005 G28.2Y'],
         ['M400'],
         ['M203.1 Y8'],
         ['M400'],
@@ -250,9 +251,9 @@ def test_plunger_commands(smoothie, monkeypatch):
         ['M400'],
         ['G91 G0Y-3 G90'],
         ['M400'],
-        ['M203.1 A125 B40 C40 X600 Y400 Z125'],
+        ['M203.1 Y400'],
         ['M400'],
-        ['M907 A0.1 B0.05 C0.05 X0.3 Y0.3 Z0.1 G4P0.005'],
+        ['M907 Y0.3 G4P0.005'],
         ['M400'],
         ['M114.2'],
         ['M400'],
@@ -264,7 +265,7 @@ def test_plunger_commands(smoothie, monkeypatch):
 
     smoothie.move({'X': 0, 'Y': 1.123456, 'Z': 2, 'A': 3})
     expected = [
-        ['M907 A0.8 B0.05 C0.05 X1.25 Y1.25 Z0.8 G4P0.005 G0.+'],
+        ['M907 A0.8 X1.25 Y1.25 Z0.8 G4P0.005 G0.+'],
         ['M400'],
     ]
     # from pprint import pprint
@@ -274,9 +275,9 @@ def test_plunger_commands(smoothie, monkeypatch):
 
     smoothie.move({'B': 2})
     expected = [
-        ['M907 A0.1 B0.5 C0.05 X0.3 Y0.3 Z0.1 G4P0.005 G0B2'],
+        ['M907 A0.1 B0.5 X0.3 Y0.3 Z0.1 G4P0.005 G0B2'],
         ['M400'],
-        ['M907 A0.1 B0.05 C0.05 X0.3 Y0.3 Z0.1 G4P0.005'],
+        ['M907 B0.05 G4P0.005'],
         ['M400'],
     ]
     # from pprint import pprint
@@ -296,7 +297,7 @@ def test_plunger_commands(smoothie, monkeypatch):
         ['M907 A0.8 B0.5 C0.5 X1.25 Y1.25 Z0.8 G4P0.005 G0.+[BC].+'],
         ['M400'],
         # Set plunger current low
-        ['M907 A0.8 B0.05 C0.05 X1.25 Y1.25 Z0.8 G4P0.005'],
+        ['M907 B0.05 C0.05 G4P0.005'],
         ['M400'],
     ]
     # from pprint import pprint
@@ -336,15 +337,15 @@ def test_set_active_current(smoothie, monkeypatch):
     expected = [
         ['M907 A2 B2 C2 X2 Y2 Z2 G4P0.005 G0A0B0C0X0Y0Z0'],  # move all
         ['M400'],
-        ['M907 A2 B0 C0 X2 Y2 Z2 G4P0.005'],  # disable BC axes
+        ['M907 B0 C0 G4P0.005'],  # disable BC axes
         ['M400'],
         ['M907 A0 B2 C2 X0 Y0 Z0 G4P0.005 G0B1.3C1.3 G0B1C1'],  # move BC
         ['M400'],
-        ['M907 A0 B0 C0 X0 Y0 Z0 G4P0.005'],  # disable BC axes
+        ['M907 B0 C0 G4P0.005'],  # disable BC axes
         ['M400'],
-        ['M907 A0 B0.42 C0.42 X0 Y0 Z0 G4P0.005 G28.2BC'],  # home BC
+        ['M907 B0.42 C0.42 G4P0.005 G28.2BC'],  # home BC
         ['M400'],
-        ['M907 A0 B0 C0 X0 Y0 Z0 G4P0.005'],  # dwell all axes after home
+        ['M907 B0 C0 G4P0.005'],  # dwell all axes after home
         ['M400'],
         ['M114.2'],  # update the position
         ['M400'],
@@ -405,8 +406,7 @@ def test_set_acceleration(smoothie, monkeypatch):
     expected = [
         ['M204 S10000 A4 B5 C6 X1 Y2 Z3'],
         ['M400'],
-        ['M204 S10000 A4 B5 C6 X1 Y2 Z3'],
-        ['M400'],
+        # popping the same accelerations sends nothing
         ['M204 S10000 A40 B50 C60 X10 Y20 Z30'],
         ['M400'],
         ['M204 S10000 A4 B5 C6 X1 Y2 Z3'],
@@ -417,6 +417,96 @@ def test_set_acceleration(smoothie, monkeypatch):
     fuzzy_assert(result=command_log, expected=expected)
 
 
+def test_unchanged_settings_not_resent(smoothie, monkeypatch):
+    from opentrons.drivers import serial_communication
+    from opentrons.drivers.smoothie_drivers import driver_3_0
+    command_log = []
+    smoothie.home()
+    smoothie.simulating = False
+    fail_next = False
+
+    def write_with_log(command, ack, connection, timeout, tag=None):
+        nonlocal fail_next
+        command_log.append(command.strip())
+        if fail_next and 'G0' in command:
+            fail_next = False
+            return 'error: Hard limit +X'
+        return driver_3_0.SMOOTHIE_ACK
+
+    monkeypatch.setattr(serial_communication, 'write_and_return',
+                        write_with_log)
+    monkeypatch.setattr(smoothie, 'home', lambda axes: None)
+
+    for x in range(3):
+        smoothie.set_speed(50)
+        smoothie.move({'X': x + 1})
+    fail_next = True
+    with pytest.raises(driver_3_0.SmoothieError):
+        smoothie.move({'X': 10})
+    smoothie.set_speed(50)
+    smoothie.move({'X': 20})
+
+    expected = [
+        ['G0F3000'],
+        ['M400'],
+        ['M907 A0.1 B0.05 C0.05 X1.25 Y0.3 Z0.1 G4P0.005 G0X1'],
+        ['M400'],
+        # the same speed and currents are not sent again
+        ['G0X2'],
+        ['M400'],
+        ['G0X3'],
+        ['M400'],
+        ['G0X10'],
+        ['M999'],
+        ['M400'],
+        # after the error, nothing is assumed about the board's settings
+        ['G0F3000'],
+        ['M400'],
+        ['M907 A0.1 B0.05 C0.05 X1.25 Y0.3 Z0.1 G4P0.005 G0X20'],
+        ['M400'],
+    ]
+    # from pprint import pprint
+    # pprint(command_log)
+    fuzzy_assert(result=command_log, expected=expected)
+
+
+def test_move_sends_currents_after_homing_flagged_axes(smoothie, monkeypatch):
+    from opentrons.drivers import serial_communication
+    from opentrons.drivers.smoothie_drivers import driver_3_0
+    command_log = []
+    smoothie.home()
+    smoothie.simulating = False
+
+    def write_with_log(command, ack, connection, timeout, tag=None):
+        command_log.append(command.strip())
+        return driver_3_0.SMOOTHIE_ACK
+
+    def _parse_position_response(arg):
+        return smoothie.position
+
+    monkeypatch.setattr(serial_communication, 'write_and_return',
+                        write_with_log)
+    monkeypatch.setattr(
+        driver_3_0, '_parse_position_response', _parse_position_response)
+    smoothie.update_homed_flags({'Z': False})
+
+    smoothie.move({'X': 50, 'Z': 90}, home_flagged_axes=True)
+    expected = [
+        ['M907 A0.1 B0.05 C0.05 X0.3 Y0.3 Z0.8 G4P0.005 G28.2Z'],
+        ['M400'],
+        ['M907 Z0.1 G4P0.005'],
+        ['M400'],
+        ['M114.2'],
+        ['M400'],
+        # homing left Z dwelling, so the move raises X and Z again
+        ['M907 X1.25 Z0.8 G4P0.005 G0X50Z90'],
+        ['M400'],
+    ]
+    # from pprint import pprint
+    # pprint(command_log)
+    fuzzy_assert(result=command_log, expected=expected)
+
+
 def test_active_dwelling_current_push_pop(smoothie):
     assert smoothie._active_current_settings != \
         smoothie._dwelling_current_settings
@@ -520,6 +610,8 @@ def test_drop_tip_current(model):
     # Instrument in `model` is configured to right mount, which is the A axis
     # on the Smoothie (see `Robot._actuators`)
     expected = [
+        {'C': 0.123},   # home the unhomed plunger before moving
+        {'C': 0.05},    # dwell
         {'C': 0.123},   # move to 'bottom' position
         {'C': 0.05},    # dwell
         {'C': 0.456},   # move to 'drop_tip' position
@@ -745,17 +837,16 @@ def test_clear_limit_switch(smoothie, monkeypatch):
         # recover from failure
         'M999',
         'M400',
-        # set current for homing the failed axis (C)
+        # set current for homing the failed axis (C); the reset means
+        # every current is sent again
         'M907 A0.1 B0.05 C0.5 X0.3 Y0.3 Z0.1 G4P0.005 G28.2C',
         'M400',
         # set current back to idling after home
-        'M907 A0.1 B0.05 C0.05 X0.3 Y0.3 Z0.1 G4P0.005',
+        'M907 C0.05 G4P0.005',
         'M400',
         # update position
         'M114.2',
         'M400',
-        'M907 A0.1 B0.05 C0.05 X0.3 Y0.3 Z0.1 G4P0.005',
-        'M400',
     ]
 
 
@@ -931,7 +1022,7 @@ def test_unstick_axes(model):
 
     current_log = []
 
-    def send_command_mock(self, command, timeout=None):
+    def send_command_mock(self, command, timeout=None, wait_timeout=None):
         nonlocal current_log
         current_log.append(command)
         if 'M119' in command:
@@ -949,7 +1040,7 @@ def test_unstick_axes(model):
         'M203.1 B1 C1',  # slow them down
         'M119',  # get the switch status
         'M907 A0.1 B0.5 C0.5 X0.3 Y0.3 Z0.1 G4P0.005 G0B-1C-1',  # move
-        'M907 A0.1 B0.05 C0.05 X0.3 Y0.3 Z0.1 G4P0.005',  # set plunger current
+        'M907 B0.05 C0.05 G4P0.005',  # set plunger current
         'M203.1 A125 B40 C40 X600 Y400 Z125'  # return to normal speed
     ]
     # from pprint import pprint
@@ -962,14 +1053,14 @@ def test_unstick_axes(model):
     expected = [
         'M203.1 A1 X1 Y1 Z1',  # slow them down
         'M119',  # get the switch status
-        'M907 A0.8 B0.05 C0.05 X1.25 Y1.25 Z0.8 G4P0.005 G0A-1X-1Y-1Z-1',
-        'M203.1 A125 B40 C40 X600 Y400 Z125'  # return to normal speed
+        'M907 A0.8 X1.25 Y1.25 Z0.8 G4P0.005 G0A-1X-1Y-1Z-1',
+        'M203.1 A125 X600 Y400 Z125'  # return to normal speed
     ]
     # from pprint import pprint
     # pprint(current_log)
     assert current_log == expected
 
-    def send_command_mock(self, command, timeout=None):
+    def send_command_mock(self, command, timeout=None, wait_timeout=None):
         nonlocal current_log
         current_log.append(command)
         if 'M119' in command:
@@ -987,17 +1078,17 @@ def test_unstick_axes(model):
     expected = [
         'M203.1 B1 C1',  # set max-speeds
         'M119',  # get switch status
-        'M907 A0.1 B0.5 C0.05 X0.3 Y0.3 Z0.1 G4P0.005 G0B-2',  # MOVE B
-        'M907 A0.1 B0.05 C0.05 X0.3 Y0.3 Z0.1 G4P0.005',  # low current B
-        'M907 A0.1 B0.05 C0.5 X0.3 Y0.3 Z0.1 G4P0.005 G28.2C',  # HOME C
-        'M907 A0.1 B0.05 C0.05 X0.3 Y0.3 Z0.1 G4P0.005',  # low current C
-        'M203.1 A125 B40 C40 X600 Y400 Z125'  # reset max-speeds
+        'M907 A0.1 B0.5 X0.3 Y0.3 Z0.1 G4P0.005 G0B-2',  # MOVE B
+        'M907 B0.05 G4P0.005',  # low current B
+        'M907 C0.5 G4P0.005 G28.2C',  # HOME C
+        'M907 C0.05 G4P0.005',  # low current C
+        'M203.1 B40 C40'  # reset max-speeds
     ]
     # from pprint import pprint
     # pprint(current_log)
     assert current_log == expected
 
-    def send_command_mock(self, command, timeout=None):
+    def send_command_mock(self, command, timeout=None, wait_timeout=None):
         nonlocal current_log
         current_log.append(command)
         if 'M119' in command:
@@ -1015,9 +1106,9 @@ def test_unstick_axes(model):
     expected = [
         'M203.1 B1 C1',  # set max-speeds
         'M119',  # get switch status
-        'M907 A0.1 B0.5 C0.5 X0.3 Y0.3 Z0.1 G4P0.005 G28.2BC',  # HOME BC
-        'M907 A0.1 B0.05 C0.05 X0.3 Y0.3 Z0.1 G4P0.005',  # low current BC
-        'M203.1 A125 B40 C40 X600 Y400 Z125'  # reset max-speeds
+        'M907 B0.5 C0.5 G4P0.005 G28.2BC',  # HOME BC
+        'M907 B0.05 C0.05 G4P0.005',  # low current BC
+        'M203.1 B40 C40'  # reset max-speeds
     ]
     # from pprint import pprint
     # pprint(current_log)
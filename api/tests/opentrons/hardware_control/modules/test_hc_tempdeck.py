@@ -1,4 +1,6 @@
 import asyncio
+import threading
+
 from opentrons.hardware_control import modules
 from opentrons.hardware_control.modules import tempdeck
 
@@ -43,8 +45,33 @@ async def test_poller(monkeypatch):
         nonlocal hit
         hit = True
 
-    monkeypatch.setattr(temp._driver, 'update_temperature', update_called)
+    monkeypatch.setattr(temp._driver, 'read_temperature', update_called)
     await temp._connect()
-    assert temp._poller.is_alive()
+    assert not temp._poller.done()
     await asyncio.sleep(tempdeck.TEMP_POLL_INTERVAL_SECS * 1.1)
     assert hit
+    poller = temp._poller
+    temp._stop_poller()
+    await asyncio.sleep(0)
+    assert poller.cancelled()
+
+
+async def test_pollers_share_a_thread():
+    decks = [modules.tempdeck.TempDeck('', True) for _ in range(3)]
+    threads = set()
+
+    def read_temperature():
+        threads.add(threading.get_ident())
+
+    for deck in decks:
+        deck._driver.read_temperature = read_temperature
+        await deck._connect()
+    await asyncio.sleep(0.1)
+    assert len(threads) == 1
+    assert threading.get_ident() not in threads
+    for deck in decks:
+        poller = deck._poller
+        deck._disconnect()
+        await asyncio.sleep(0)
+        assert poller.cancelled()
+        assert deck._poller is None
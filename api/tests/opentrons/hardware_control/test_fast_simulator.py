@@ -0,0 +1,91 @@
+import pytest
+
+from opentrons.hardware_control import API, adapters, modules, MustHomeError
+from opentrons.hardware_control.fast_simulator import (FastSimulator,
+                                                       InlineAdapter)
+from opentrons.hardware_control.types import CriticalPoint
+from opentrons.types import Mount, Point
+
+
+def _run(hw):
+    """ Run some pipetting and return the state along the way """
+    states = []
+    hw.cache_instruments({Mount.LEFT: 'p10_multi', Mount.RIGHT: 'p300_single'})
+    hw.home()
+    for mount in Mount:
+        hw.move_to(mount, Point(100, 120, 80))
+        hw.pick_up_tip(mount, 50)
+        hw.prepare_for_aspirate(mount)
+        hw.aspirate(mount, 5)
+        hw.dispense(mount, 2)
+        states.append(hw.current_position(mount))
+        states.append(hw.gantry_position(mount, CriticalPoint.NOZZLE))
+        hw.move_rel(mount, Point(1, 2, 3))
+        states.append(hw.attached_instruments)
+        hw.blow_out(mount)
+        hw.drop_tip(mount)
+        states.append(hw.attached_instruments)
+    states.append(hw.estimated_motion_time)
+    return states
+
+
+def test_matches_simulator():
+    api = adapters.SynchronousAdapter.build(API.build_hardware_simulator)
+    assert _run(InlineAdapter(FastSimulator())) == _run(api)
+    api.join()
+
+
+def test_checks():
+    hw = InlineAdapter(FastSimulator({Mount.RIGHT: {'model': 'p300_single_v1.5',
+                                                    'id': 'abc'}}))
+    with pytest.raises(RuntimeError):
+        hw.cache_instruments({Mount.RIGHT: 'p10_single'})
+    hw.cache_instruments()
+    assert hw.attached_instruments[Mount.RIGHT]['pipette_id'] == 'abc'
+    assert hw.attached_instruments[Mount.LEFT] == {}
+    with pytest.raises(MustHomeError):
+        hw.current_position(Mount.RIGHT)
+    hw.move_to(Mount.RIGHT, Point(10, 10, 100))
+    with pytest.raises(RuntimeError):
+        hw.aspirate(Mount.RIGHT, 10)
+    hw.prepare_for_aspirate(Mount.RIGHT)
+    with pytest.raises(AssertionError):
+        hw.aspirate(Mount.RIGHT, 400)
+    with pytest.raises(AssertionError):
+        hw.drop_tip(Mount.RIGHT)
+    hw.pick_up_tip(Mount.RIGHT, 50)
+    with pytest.raises(AssertionError):
+        hw.pick_up_tip(Mount.RIGHT, 50)
+
+
+def test_modules():
+    hw = InlineAdapter(
+        FastSimulator(attached_modules=['tempdeck', 'thermocycler']))
+    discovered = {mod.name(): mod for mod in hw.discover_modules()}
+    assert sorted(discovered) == ['tempdeck', 'thermocycler']
+    tempdeck = discovered['tempdeck']
+    tc = discovered['thermocycler']
+    assert tempdeck.status == 'idle'
+    tempdeck.set_temperature(4)
+    assert (tempdeck.target, tempdeck.status) == (4, 'holding at target')
+    tc.close()
+    tc.cycle_temperatures([{'temperature': 95, 'hold_time_seconds': 10},
+                           {'temperature': 60, 'hold_time_seconds': 10}], 3)
+    assert (tc.lid_status, tc.target, tc.current_cycle_index,
+            tc.current_step_index) == ('closed', 60, 3, 2)
+    magdeck = hw.build_module(modules.magdeck.MagDeck)
+    with pytest.raises(ValueError):
+        magdeck.engage(100)
+    magdeck.engage(10)
+    assert magdeck.status == 'engaged'
+
+
+def test_module_tasks_stopped():
+    sim = FastSimulator(attached_modules=['tempdeck'])
+    InlineAdapter(sim).discover_modules()
+    loop = sim.loop
+    tasks = list(sim._module_tasks)
+    assert tasks
+    del sim
+    assert loop.is_closed()
+    assert all(task.cancelled() for task in tasks)
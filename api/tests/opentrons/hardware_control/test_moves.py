@@ -197,7 +197,7 @@ async def test_deck_cal_applied(monkeypatch, loop):
                       [0, 0, 0, 1]]
     called_with = None
 
-    def mock_move(position, speed=None, home_flagged_axes=True):
+    async def mock_move(position, speed=None, home_flagged_axes=True):
         nonlocal called_with
         called_with = position
 
@@ -374,3 +374,35 @@ async def test_shake_during_drop(hardware_api, monkeypatch):
         mock.call(types.Mount.RIGHT, types.Point(-1, 0, 0), speed=50),
         mock.call(types.Mount.RIGHT, types.Point(0, 0, 20))]
     move_rel.assert_has_calls(move_rel_calls)
+
+
+async def test_trusted_position_cache(hardware_api, monkeypatch):
+    update_position = mock.Mock(
+        side_effect=hardware_api._backend.update_position)
+    monkeypatch.setattr(hardware_api._backend, 'update_position',
+                        update_position)
+    mount = types.Mount.RIGHT
+    await hardware_api.home()
+    await hardware_api.gantry_position(mount, refresh=True)
+    assert update_position.call_count == 1
+
+    hardware_api.trust_position_cache()
+    for x in range(5):
+        await hardware_api.move_to(mount, types.Point(x, 10, 20))
+        assert await hardware_api.gantry_position(mount, refresh=True)\
+            == types.Point(x, 10, 20)
+    assert update_position.call_count == 1
+
+    # Anything that might move the robot behind our back forces a re-read
+    await hardware_api.disengage_axes([Axis.X, Axis.Y])
+    await hardware_api.gantry_position(mount, refresh=True)
+    assert update_position.call_count == 2
+    await hardware_api.gantry_position(mount, refresh=True)
+    assert update_position.call_count == 2
+    hardware_api.halt()
+    await hardware_api.gantry_position(mount, refresh=True)
+    assert update_position.call_count == 3
+
+    hardware_api.trust_position_cache(False)
+    await hardware_api.gantry_position(mount, refresh=True)
+    assert update_position.call_count == 4
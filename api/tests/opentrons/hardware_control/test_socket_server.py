@@ -14,6 +14,7 @@ from opentrons.hardware_control.pipette import Pipette
 from opentrons.hardware_control.types import Axis, CriticalPoint
 import opentrons.hardware_control as hc
 import opentrons.hardware_control.socket_server as sockserv
+from opentrons.hardware_control import socket_client
 
 
 pytestmark = pytest.mark.skipif(sys.platform.startswith('win'),
@@ -242,3 +243,138 @@ def test_serializers(paramtype, native, serializable, config_tempdir):
     serdes = sockserv._SERDES[paramtype]
     assert serdes.serializer(native) == serializable
     assert serdes.deserializer(serializable) == native
+
+
+def test_framer_splits_messages():
+    messages = [{'jsonrpc': '2.0', 'id': 1, 'params': ['a}"b', r'\"{[']},
+                [{'nested': [{'a': 1}, []]}, {'tricky': '\\'}],
+                {'unicode': 'µL'}]
+    stream = b'garbage ' + b' \n'.join(
+        json.dumps(msg, ensure_ascii=False).encode() for msg in messages)
+    # However the stream is chunked, the same messages come out
+    for chunk_size in (1, 2, 3, 7, len(stream)):
+        framer = sockserv.JsonFramer()
+        frames = []
+        for start in range(0, len(stream), chunk_size):
+            framer.feed(stream[start:start+chunk_size])
+            frame = framer.next_frame()
+            while frame is not None:
+                frames.append(json.loads(frame.decode()))
+                frame = framer.next_frame()
+        assert frames == messages
+        assert framer.buffered == b''
+
+
+async def test_decoder_eof(loop):
+    reader = asyncio.StreamReader(loop=loop)
+    reader.feed_data(b'{"done": true} {"partial": ')
+    reader.feed_eof()
+    decoder = sockserv.JsonStreamDecoder(reader)
+    assert await decoder.read_object() == {'done': True}
+    with pytest.raises(asyncio.IncompleteReadError) as e:
+        await decoder.read_object()
+    assert e.value.partial == b'{"partial": '
+
+
+async def test_decoder_large_messages(loop):
+    """ Messages far bigger than one read, full of strings holding brackets
+    and quotes, come out whole and unchanged.
+    """
+    entry = {'model': 'p300_single_v1', 'name': 'p300_single',
+             'tip_length': 51.7, 'aspirate_flow_rate': 150,
+             'fallback': 'a "quoted" \\ string {with [brackets]}'}
+    messages = [{'jsonrpc': '2.0', 'id': i, 'result': [entry] * count}
+                for i, count in enumerate([1, 10000, 3])]
+    reader = asyncio.StreamReader(loop=loop)
+    reader.feed_data(b''.join(json.dumps(m).encode() for m in messages))
+    reader.feed_eof()
+    decoder = sockserv.JsonStreamDecoder(reader)
+    for m in messages:
+        assert await decoder.read_object() == m
+
+
+async def test_replies_in_request_order(hc_stream_server, loop, monkeypatch):
+    sock, server = hc_stream_server
+
+    async def slow_first_dispatch(call_str):
+        # The first request finishes last
+        await asyncio.sleep(0.05 if '"first"' in call_str else 0)
+        return call_str
+
+    monkeypatch.setattr(server, '_dispatch', slow_first_dispatch)
+    reader, writer = await asyncio.open_unix_connection(sock)
+    writer.write(b'{"id": "first"}{"id": "second"}{"id": "third"}')
+    decoder = sockserv.JsonStreamDecoder(reader)
+    replies = [await decoder.read_object() for _ in range(3)]
+    assert [reply['id'] for reply in replies] == ['first', 'second', 'third']
+
+
+async def test_dispatch_splits_only_batches(hc_stream_server, monkeypatch):
+    sock, server = hc_stream_server
+    dispatched = []
+
+    async def fake_dispatch_one(call_str):
+        dispatched.append(call_str)
+        return call_str
+
+    monkeypatch.setattr(server, '_dispatch_one', fake_dispatch_one)
+    # a single call is passed through untouched
+    single = '{"id": 1,  "method": "home"}'
+    assert await server._dispatch(single) == single
+    assert dispatched == [single]
+
+    dispatched.clear()
+    await server._dispatch(' [{"id": 1}, {"id": 2}]')
+    assert [json.loads(call) for call in dispatched] == [{'id': 1},
+                                                         {'id': 2}]
+
+
+async def test_call_sequencer(loop):
+    sequencer = sockserv.CallSequencer()
+    events = []
+
+    def call(name, duration):
+        async def _call():
+            events.append(f'start {name}')
+            await asyncio.sleep(duration)
+            events.append(f'end {name}')
+            return name
+        return _call
+
+    # Calls are ordered when they start, so start them in order
+    tasks = [loop.create_task(coro) for coro in (
+        sequencer.write(call('move', 0.02)),
+        sequencer.read(call('read1', 0.01)),
+        sequencer.read(call('read2', 0)),
+        sequencer.write(call('home', 0)))]
+    results = await asyncio.gather(*tasks, loop=loop)
+    assert results == ['move', 'read1', 'read2', 'home']
+    # Reads wait for the move, overlap with each other, and the home waits
+    # for both of them
+    assert events == ['start move', 'end move',
+                      'start read1', 'start read2', 'end read2', 'end read1',
+                      'start home', 'end home']
+
+
+async def test_client(hc_stream_server, loop):
+    sock, server = hc_stream_server
+    client = await socket_client.Client.connect(sock, loop=loop)
+    try:
+        assert await client.call('get_is_simulator') is True
+        # Read-only calls in a batch see the effects of the calls before them
+        _, position, lights = await client.batch([
+            ('home', {}),
+            ('gantry_position', {'mount': 'RIGHT'}),
+            ('get_lights', {})])
+        assert position == [418, 353, 218]
+        assert lights == {'button': False, 'rails': False}
+        # Many calls can be in flight at once
+        results = await asyncio.gather(
+            *[client.call('get_engaged_axes') for _ in range(20)],
+            loop=loop)
+        assert all(result == results[0] for result in results)
+        with pytest.raises(socket_client.JsonRpcError) as e:
+            await client.call('not_a_method')
+        assert e.value.code == -32601
+    finally:
+        await client.close()
@@ -54,9 +54,9 @@ async def test_moves_to_hotspot(hardware_api, monkeypatch,
         rel_calls.append((which_mount, delta))
         return await old_move_rel(which_mount, delta)
 
-    def fake_probe(ax, dist):
+    async def fake_probe(ax, dist):
         probe_calls.append((ax, dist))
-        return old_probe(ax, dist)
+        return await old_probe(ax, dist)
 
     monkeypatch.setattr(hardware_api, 'move_to', fake_move_to)
     monkeypatch.setattr(hardware_api, 'move_rel', fake_move_rel)
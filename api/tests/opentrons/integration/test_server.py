@@ -21,6 +21,9 @@ async def test_notifications(session, session_manager, protocol, root, connect,
     res = await session.socket.receive_json()  # Skip ack
 
     res = await session.socket.receive_json()  # Get notification
+    # Skip simulation progress
+    while res['data']['v']['topic'] == 'simulation':
+        res = await session.socket.receive_json()
     assert res['$']['type'] == rpc.NOTIFICATION_MESSAGE
     assert res['data']['v']['payload']['v']['state'] == 'loaded'
 
@@ -0,0 +1,54 @@
+import json
+import pkgutil
+
+from opentrons import commands as cmds
+from opentrons import protocol_api as papi
+from opentrons.types import Mount
+
+
+def _load_def(load_name):
+    return json.loads(pkgutil.get_data(
+        'opentrons',
+        f'shared_data/labware/definitions/2/{load_name}/1.json'))
+
+
+def test_publish_skipped_without_subscribers(loop):
+    """ With nobody subscribed, publishing a command does not build its
+    message at all
+    """
+    ctx = papi.ProtocolContext(loop=loop)
+    ctx.home()
+    tiprack = ctx.load_labware_from_definition(
+        _load_def('opentrons_96_tiprack_300ul'), 1)
+    plate = ctx.load_labware_from_definition(
+        _load_def('corning_96_wellplate_360ul_flat'), 2)
+    instr = ctx.load_instrument('p300_single', Mount.RIGHT,
+                                tip_racks=[tiprack])
+    ctx._unsubscribe_commands()
+    ctx._unsubscribe_commands = None
+
+    built = []
+
+    def aspirate(instrument, volume, location, rate):
+        built.append(volume)
+        return cmds.aspirate(instrument, volume, location, rate)
+
+    def publish():
+        cmds.do_publish(ctx.broker, aspirate, instr.aspirate,
+                        'before', None, None, instr, 50, plate['A1'], 1.0)
+
+    ctx.broker.logger.setLevel('WARNING')
+    try:
+        assert not ctx.broker.has_subscribers(cmds.types.COMMAND)
+        publish()
+        assert built == []
+
+        heard = []
+        unsubscribe = ctx.broker.subscribe(cmds.types.COMMAND, heard.append)
+        publish()
+        unsubscribe()
+    finally:
+        ctx.broker.logger.setLevel('NOTSET')
+    assert len(built) == 1
+    assert len(heard) == 1
+    assert heard[0]['$'] == 'before'
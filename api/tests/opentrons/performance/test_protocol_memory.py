@@ -0,0 +1,28 @@
+import sys
+
+import pytest
+
+from opentrons.protocol_api import labware
+from opentrons.types import Location, Point
+
+
+def test_position_types_are_compact():
+    """ Wells, locations and points are made in large numbers, so none of
+    them carries a per-instance dict
+    """
+    plate = labware.Labware(
+        labware.get_labware_definition('corning_384_wellplate_112ul_flat'),
+        Location(Point(0, 0, 0), 'Test Slot'))
+    well = plate['A1']
+    location = well.top()
+    for value in (well, location, location.point):
+        assert not hasattr(value, '__dict__')
+    with pytest.raises(AttributeError):
+        well.volume = 10
+    assert sys.getsizeof(well)\
+        < sys.getsizeof({slot: None for slot in labware.Well.__slots__})
+    assert sys.getsizeof(location) == sys.getsizeof((None, None))
+    assert sys.getsizeof(location.point) == sys.getsizeof((0.0, 0.0, 0.0))
+
+    assert location == Location(location.point, well)
+    assert location.move(Point(1, 0, 0)).point == location.point + Point(1)
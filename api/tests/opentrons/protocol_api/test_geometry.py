@@ -244,3 +244,90 @@ def test_direct_cp():
     assert to_normal[0][1] == CriticalPoint.XY_CENTER
     assert to_normal[1][1] is None
     assert to_normal[2][1] is None
+
+
+def test_arc_plans_cached(monkeypatch):
+    deck = Deck()
+    trough = labware.load(trough_name, deck.position_for(1))
+    deck[1] = trough
+    lw1 = labware.load(labware_name, deck.position_for(3))
+    deck[3] = lw1
+    walks = []
+
+    def counting_quirks(loc):
+        walks.append(loc)
+        return labware.quirks_from_any_parent(loc)
+
+    monkeypatch.setattr(
+        'opentrons.protocol_api.geometry.quirks_from_any_parent',
+        counting_quirks)
+    for well in lw1.wells()[:8]:
+        moves = plan_moves(trough.wells()[0].top(), well.top(), deck)
+        assert moves[0][1] == CriticalPoint.XY_CENTER
+        assert moves[1][0].z == deck.highest_z + 10.0
+    assert len(walks) == 2
+
+    # Changing the deck changes the plans
+    version = deck.version
+    tall = labware.load('opentrons_96_tiprack_300ul', deck.position_for(2))
+    deck[2] = tall
+    assert deck.version > version
+    moves = plan_moves(trough.wells()[0].top(), lw1.wells()[0].top(), deck)
+    assert moves[1][0].z == tall.highest_z + 10.0
+    assert len(walks) == 4
+    version = deck.version
+    del deck[2]
+    assert deck.version > version
+    version = deck.version
+    deck.recalculate_high_z()
+    assert deck.version > version
+    moves = plan_moves(trough.wells()[0].top(), lw1.wells()[0].top(), deck)
+    assert moves[1][0].z == deck.highest_z + 10.0
+
+
+def test_arc_clears_only_what_it_passes():
+    deck = Deck()
+    plates = {}
+    for slot in (1, 2, 3, 4, 5):
+        plates[slot] = labware.load(labware_name, deck.position_for(slot))
+        deck[slot] = plates[slot]
+    tall = labware.load('opentrons_96_tiprack_300ul', deck.position_for(9))
+    deck[9] = tall
+    thermocycler = labware.load_module('thermocycler', deck.position_for(7))
+    deck[7] = thermocycler
+    plate_z = plates[1].highest_z
+    assert deck.highest_z == thermocycler.highest_z > tall.highest_z
+
+    def arc_z(from_slot, to_slot):
+        from_loc = plates[from_slot].wells()[0].top()
+        to_loc = plates[to_slot].wells()[0].top()
+        moves = plan_moves(from_loc, to_loc, deck)
+        check_arc_basic(moves, from_loc, to_loc)
+        return moves[1][0].z
+
+    # Along the front row, nothing taller than the plates is nearby
+    assert arc_z(1, 3) == pytest.approx(plate_z + 10.0)
+    # A multichannel reaching back from slot 4 could hit the thermocycler
+    assert arc_z(4, 1) == pytest.approx(thermocycler.highest_z + 10.0)
+    # which covers slot 8 as well as slot 7
+    assert arc_z(5, 2) == pytest.approx(thermocycler.highest_z + 10.0)
+    del deck[7]
+    assert arc_z(5, 2) == pytest.approx(plate_z + 10.0)
+    assert arc_z(4, 1) == pytest.approx(plate_z + 10.0)
+    # Moving from somewhere high stays that high
+    home = Location(Point(400, 80, 200), None)
+    moves = plan_moves(home, plates[3].wells()[0].top(), deck)
+    assert moves[0][0].z == 200
+
+
+def test_segment_hits_rect():
+    from opentrons.protocol_api.geometry import _segment_hits_rect
+    rect = (0, 0, 10, 10)
+    assert _segment_hits_rect(Point(-5, 5), Point(15, 5), rect)
+    assert _segment_hits_rect(Point(5, 5), Point(5, 5), rect)
+    assert _segment_hits_rect(Point(-5, -5), Point(15, 15), rect)
+    assert not _segment_hits_rect(Point(-5, 11), Point(15, 11), rect)
+    assert not _segment_hits_rect(Point(-5, 5), Point(-1, 5), rect)
+    # passes by the corner
+    assert not _segment_hits_rect(Point(-5, 8), Point(3, 16), rect)
+    assert _segment_hits_rect(Point(-5, 4), Point(3, 12), rect)
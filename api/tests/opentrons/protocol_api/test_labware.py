@@ -1,5 +1,7 @@
+import copy
 import json
 import pkgutil
+import random
 
 import pytest
 
@@ -401,3 +403,158 @@ def test_tiprack_list():
     with pytest.raises(labware.OutOfTipsError):
         labware.select_tiprack_from_list(
             [tiprack], 1, tiprack.wells()[95])
+
+
+def _first_run(columns, num, has_tip, start=None):
+    """ The first well starting a run of `num` wells with (or without) tips,
+    found by looking at every well
+    """
+    for column in columns:
+        if start is not None:
+            if start not in column:
+                continue
+            column = column[column.index(start):]
+            start = None
+        states = [well.has_tip for well in column]
+        if has_tip not in states:
+            continue
+        first = states.index(has_tip)
+        run = states[first:first + num]
+        if len(run) == num and all(state == has_tip for state in run):
+            return column[first]
+    return None
+
+
+def test_tip_tracker_matches_wells():
+    """ Check next_tip and previous_tip on a 384-tip rack against a search
+    over the wells, after random picks and returns
+    """
+    rack_def = copy.deepcopy(
+        labware.get_labware_definition('corning_384_wellplate_112ul_flat'))
+    rack_def['parameters']['isTiprack'] = True
+    rack_def['parameters']['tipLength'] = 50
+    rack_def['parameters']['tipOverlap'] = 5
+    tiprack = labware.Labware(rack_def, Location(Point(0, 0, 0), 'Test Slot'))
+    columns = tiprack.columns()
+
+    rand = random.Random(384)
+    for _ in range(300):
+        well = rand.choice(tiprack.wells())
+        channels = rand.choice([1, 8])
+        column = columns[[well in col for col in columns].index(True)]
+        span = column[column.index(well):][:channels]
+        if rand.random() < 0.7:
+            if all(w.has_tip for w in span):
+                tiprack.use_tips(well, channels)
+            else:
+                with pytest.raises(AssertionError):
+                    tiprack.use_tips(well, channels)
+        elif not any(w.has_tip for w in span):
+            tiprack.return_tips(well, channels)
+        else:
+            with pytest.raises(AssertionError):
+                tiprack.return_tips(well, channels)
+        for num in (1, 8, 16):
+            assert tiprack.next_tip(num) is _first_run(columns, num, True)
+            assert tiprack.previous_tip(num) is _first_run(columns, num, False)
+        assert tiprack.next_tip(1, well) is _first_run(columns, 1, True, well)
+
+    tiprack.reset()
+    assert all(well.has_tip for well in tiprack.wells())
+
+    while tiprack.next_tip(8):
+        tiprack.use_tips(tiprack.next_tip(8), 8)
+    assert not any(well.has_tip for well in tiprack.wells())
+
+
+def test_well_indexes():
+    plate = labware.Labware(
+        labware.get_labware_definition('corning_96_wellplate_360ul_flat'),
+        Location(Point(0, 0, 0), 'Test Slot'))
+    assert plate.columns() == plate.columns()
+    assert plate.columns()[0] == plate.columns_by_name()['1']
+    assert plate.rows()[1] == plate.rows_by_name()['B']
+    assert plate.rows()[1][2] is plate.wells_by_name()['B3'] is plate['B3']
+    assert plate.columns('2', '3') == [plate.columns()[1],
+                                       plate.columns()[2]]
+    # The shared indexes cannot be changed
+    for index in (plate.wells_by_name(), plate.rows_by_name(),
+                  plate.columns_by_name()):
+        with pytest.raises(TypeError):
+            index['Z'] = None
+    with pytest.raises(TypeError):
+        plate.rows_by_name()['A'].append(None)
+    # but the lists handed out can, without changing what comes next
+    for index in (plate.wells(), plate.columns(), plate.columns()[0],
+                  plate.rows(), plate.rows()[0]):
+        index.reverse()
+        index.pop()
+        index[0] = None
+    assert plate.wells()[0] is plate['A1']
+    assert plate.columns()[0][-1] is plate['H1']
+    assert len(plate.rows()) == 8
+
+    a1 = plate['A1']
+    old_top = a1.top().point
+    plate.set_calibration(Point(1, 2, 3))
+    assert plate['A1'] is a1
+    assert plate.columns()[0][0] is a1
+    assert a1.top().point == old_top + Point(1, 2, 3)
+
+
+def test_well_lists_can_be_extended():
+    plate = labware.Labware(
+        labware.get_labware_definition('corning_96_wellplate_360ul_flat'),
+        Location(Point(0, 0, 0), 'Test Slot'))
+    plate2 = labware.Labware(plate._definition,
+                             Location(Point(0, 0, 0), 'Test Slot'))
+    dests = plate.wells()
+    dests += plate2.wells()
+    assert len(dests) == 192
+    assert dests[96] is plate2['A1']
+    assert len(plate.wells()) == 96
+    row = plate.rows_by_name()['A']
+    row += plate.rows_by_name()['B']
+    row *= 2
+    assert len(row) == 48
+    assert len(plate.rows_by_name()['A']) == 12
+
+
+def test_well_hash_survives_calibration():
+    plate = labware.Labware(
+        labware.get_labware_definition('corning_96_wellplate_360ul_flat'),
+        Location(Point(0, 0, 0), 'Test Slot'))
+    visited = {plate['A1']: 'first', plate['B1']: 'second'}
+    plate.set_calibration(Point(1, 2, 3))
+    assert visited[plate['A1']] == 'first'
+    assert plate['B1'] in visited
+    assert plate['A1'] != plate['B1']
+    other = labware.Labware(plate._definition,
+                            Location(Point(0, 0, 0), 'Test Slot'))
+    assert other['A1'] not in visited
+
+
+def test_wells_built_when_used():
+    plate = labware.Labware(
+        labware.get_labware_definition('corning_384_wellplate_112ul_flat'),
+        Location(Point(0, 0, 0), 'Test Slot'))
+    assert not plate._well_cache
+    assert 'P24' in plate.wells_by_name()
+    assert len(plate.wells_by_name()) == 384
+    b2 = plate['B2']
+    assert plate.wells_by_name()['B2'] is plate.wells('B2')[0] is b2
+    assert plate.well(16 + 1) is b2
+    assert len(plate.rows_by_name()['C']) == 24
+    assert len(plate._well_cache) == 25
+    with pytest.raises(KeyError):
+        plate['Q1']
+
+    # Calibration moves the wells that exist, and the ones built after it
+    # are built where they should be
+    plate.set_calibration(Point(0, 0, 10))
+    assert plate['B2'] is b2
+    uncalibrated = labware.Labware(plate._definition,
+                                   Location(Point(0, 0, 0), 'Test Slot'))
+    assert b2.top().point == uncalibrated['B2'].top().point + Point(0, 0, 10)
+    assert plate['B3'].top().point.z == b2.top().point.z
+    assert len(plate.wells()) == 384
@@ -0,0 +1,72 @@
+import json
+import shutil
+
+import pytest
+
+from opentrons.protocol_api import labware, labware_bundle
+
+
+@pytest.fixture
+def bundle(tmpdir):
+    path = tmpdir.join('2.bundle')
+    labware_bundle.build_bundle(labware.STANDARD_DEFS_PATH, path)
+    bundle = labware_bundle.LabwareBundle(path)
+    yield bundle
+    bundle.close()
+
+
+def test_bundle_matches_definitions(bundle):
+    def_paths = list(labware.STANDARD_DEFS_PATH.glob('*/*.json'))
+    assert len(bundle) == len(def_paths)
+    for def_path in def_paths:
+        load_name, version = def_path.parent.name, int(def_path.stem)
+        assert (load_name, version) in bundle
+        assert bundle.load(load_name, version)\
+            == json.loads(def_path.read_text())
+    assert ('not_a_labware', 1) not in bundle
+    with pytest.raises(KeyError):
+        bundle.load('not_a_labware', 1)
+
+
+def test_definitions_come_from_bundle(bundle, monkeypatch, tmpdir):
+    labware._definition_cache.clear()
+    monkeypatch.setattr(labware, '_get_standard_bundle', lambda: bundle)
+
+    def no_loose_files(*args, **kwargs):
+        raise AssertionError('read a loose definition')
+
+    monkeypatch.setattr(labware.json, 'load', no_loose_files)
+    dfn = labware.get_labware_definition('opentrons_96_tiprack_300ul')
+    assert dfn['parameters']['loadName'] == 'opentrons_96_tiprack_300ul'
+    assert labware.get_labware_definition(
+        'opentrons_96_tiprack_300ul') is dfn
+    with pytest.raises(TypeError):
+        dfn['parameters']['tipLength'] = 10
+
+
+def test_falls_back_to_loose_definitions(monkeypatch, tmpdir):
+    labware._definition_cache.clear()
+    # A bundle that is missing most definitions
+    partial = tmpdir.mkdir('partial')
+    shutil.copytree(
+        str(labware.STANDARD_DEFS_PATH / 'opentrons_96_tiprack_300ul'),
+        str(partial.join('opentrons_96_tiprack_300ul')))
+    labware_bundle.build_bundle(partial, tmpdir.join('partial.bundle'))
+    bundle = labware_bundle.LabwareBundle(tmpdir.join('partial.bundle'))
+    monkeypatch.setattr(labware, '_get_standard_bundle', lambda: bundle)
+    dfn = labware.get_labware_definition('corning_96_wellplate_360ul_flat')
+    assert dfn['parameters']['loadName'] == 'corning_96_wellplate_360ul_flat'
+    bundle.close()
+
+
+def test_bad_bundle(monkeypatch, tmpdir):
+    monkeypatch.setattr(labware, 'STANDARD_BUNDLE_PATH',
+                        tmpdir.join('missing.bundle'))
+    labware._get_standard_bundle.cache_clear()
+    assert labware._get_standard_bundle() is None
+    tmpdir.join('bad.bundle').write('{"not": "a bundle"}')
+    monkeypatch.setattr(labware, 'STANDARD_BUNDLE_PATH',
+                        tmpdir.join('bad.bundle'))
+    labware._get_standard_bundle.cache_clear()
+    assert labware._get_standard_bundle() is None
+    labware._get_standard_bundle.cache_clear()
@@ -1,3 +1,8 @@
+import copy
+import json
+import os
+
+import jsonschema
 import pytest
 from opentrons import protocol_api as papi, types
 
@@ -40,3 +45,63 @@ def test_deprecated_load(loop):
     ctx = papi.ProtocolContext(loop=loop)
     labware = ctx.load_labware_by_name(labware_name, '1', 'my cool labware')
     assert 'my cool labware' in str(labware)
+
+
+def test_definitions_are_cached(monkeypatch):
+    papi.labware._definition_cache.clear()
+    first = papi.labware.get_labware_definition(labware_name)
+
+    def no_reading(*args, **kwargs):
+        raise AssertionError('definition read again')
+
+    monkeypatch.setattr(papi.labware.json, 'load', no_reading)
+    assert papi.labware.get_labware_definition(labware_name) is first
+    # The shared copy is protected, but still behaves like json
+    with pytest.raises(TypeError):
+        first['parameters']['tipLength'] = 10
+    with pytest.raises(TypeError):
+        first['ordering'].append(['Z1'])
+    assert json.loads(json.dumps(first)) == first
+    mutable = copy.deepcopy(first)
+    mutable['parameters']['loadName'] = 'mine'
+    assert first['parameters']['loadName'] == labware_name
+
+
+def test_custom_definition_cache_invalidation():
+    custom = copy.deepcopy(papi.labware.get_labware_definition(labware_name))
+    custom['namespace'] = 'custom_beta'
+    custom['parameters']['loadName'] = 'cached_plate'
+    custom['metadata']['displayName'] = 'first'
+    papi.labware.save_definition(custom)
+    assert papi.labware.get_labware_definition('cached_plate')[
+        'metadata']['displayName'] == 'first'
+
+    custom['metadata']['displayName'] = 'second'
+    papi.labware.save_definition(custom, force=True)
+    assert papi.labware.get_labware_definition('cached_plate')[
+        'metadata']['displayName'] == 'second'
+
+    # Edits made behind our back are noticed from the file's mtime
+    path = papi.labware._get_path_to_labware(
+        'cached_plate', 'custom_beta', 1)
+    custom['metadata']['displayName'] = 'third'
+    path.write_text(json.dumps(custom))
+    stat = path.stat()
+    os.utime(str(path), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert papi.labware.get_labware_definition('cached_plate')[
+        'metadata']['displayName'] == 'third'
+
+    papi.labware.delete_all_custom_labware()
+    with pytest.raises(FileNotFoundError):
+        papi.labware.get_labware_definition('cached_plate')
+
+
+def test_save_invalid_definition():
+    custom = copy.deepcopy(papi.labware.get_labware_definition(labware_name))
+    custom['namespace'] = 'custom_beta'
+    custom['parameters']['loadName'] = 'invalid_plate'
+    del custom['ordering']
+    with pytest.raises(jsonschema.ValidationError):
+        papi.labware.save_definition(custom)
+    with pytest.raises(FileNotFoundError):
+        papi.labware.get_labware_definition('invalid_plate')
@@ -175,15 +175,17 @@ def test_load_calibration(monkeypatch, clear_calibration):
     assert test_labware.tip_length == test_tip_length
 
 
-def test_wells_rebuilt_with_offset():
+def test_wells_moved_with_offset():
     test_labware = labware.Labware(minimalLabwareDef,
                                    Location(Point(0, 0, 0), 'deck'))
-    old_wells = test_labware._wells
+    old_wells = list(test_labware.wells())
+    old_top = old_wells[0].top().point
     assert test_labware._offset == Point(10, 10, 5)
     assert test_labware._calibrated_offset == Point(10, 10, 5)
     labware.save_calibration(test_labware, Point(2, 2, 2))
-    new_wells = test_labware._wells
-    assert old_wells[0] != new_wells[0]
+    new_wells = test_labware.wells()
+    assert old_wells[0] is new_wells[0]
+    assert new_wells[0].top().point == old_top + Point(2, 2, 2)
     assert test_labware._offset == Point(10, 10, 5)
     assert test_labware._calibrated_offset == Point(12, 12, 7)
 
@@ -0,0 +1,57 @@
+import itertools
+import random
+
+from opentrons.protocol_api import transfer_order as to
+from opentrons.types import Point
+
+
+def _stop(x, y):
+    return to.Stop(Point(x, y, 0), Point(x, y, 0))
+
+
+def test_orders_along_a_line():
+    xs = [0, 40, 10, 30, 20]
+    order, opt = to.order_steps([_stop(x, 0) for x in xs],
+                                [set() for _ in xs],
+                                [{x} for x in xs],
+                                start=Point(0, 0, 50))
+    assert [xs[idx] for idx in order] == [0, 10, 20, 30, 40]
+    assert opt == to.PathOptimization(100, 40)
+    assert opt.saved == 60
+
+
+def test_never_longer():
+    # Already in the best order: nearest neighbour from the start would
+    # go the wrong way first
+    stops = [_stop(x, 0) for x in (10, 0, 30, 60)]
+    order, opt = to.order_steps(stops, [set()] * 4, [set()] * 4,
+                                start=Point(5.1, 0, 0))
+    assert opt.optimized <= opt.original
+    assert opt.optimized == to.path_length(stops, order, Point(5.1, 0, 0))
+
+
+def test_keeps_dependent_steps_in_order():
+    # A serial dilution along a row, given back to front along the deck
+    xs = [90, 0, 45, 9, 72]
+    stops = [to.Stop(Point(x, 0, 0), Point(x + 9, 0, 0)) for x in xs]
+    reads = [{x} for x in xs]
+    writes = [{x + 9} for x in xs]
+    order, _ = to.order_steps(stops, reads, writes)
+    assert order.index(3) > order.index(1)
+    # Independent steps are free to move
+    order, opt = to.order_steps(stops, reads, [{'dest', x} for x in xs])
+    assert order == [1, 3, 2, 4, 0]
+    assert opt.saved > 0
+
+
+def test_two_opt_matches_best_order():
+    random.seed(4)
+    stops = [to.Stop(Point(random.uniform(0, 100), random.uniform(0, 100), 0),
+                     Point(random.uniform(0, 100), random.uniform(0, 100), 0))
+             for _ in range(7)]
+    order, opt = to.order_steps(stops, [set()] * 7, [set()] * 7)
+    assert sorted(order) == list(range(7))
+    best = min(to.path_length(stops, perm)
+               for perm in itertools.permutations(range(7)))
+    # A heuristic, so close to rather than at the best
+    assert opt.optimized <= best * 1.2
@@ -0,0 +1,40 @@
+from opentrons.protocol_api import transfer_packing as tp
+
+
+def test_pack_in_order():
+    assert tp.pack_in_order([100, 150, 60, 40, 200], 10, 300)\
+        == [[0, 1], [2, 3], [4]]
+    assert tp.pack_in_order([], 10, 300) == []
+
+
+def test_pack_first_fit_decreasing():
+    volumes = [150, 200, 140, 100, 60, 50]
+    assert len(tp.pack_in_order(volumes, 0, 300)) == 4
+    groups = tp.pack_first_fit_decreasing(volumes, 0, 300)
+    assert groups == [[0, 2], [1, 3], [4, 5]]
+    assert sorted(idx for group in groups for idx in group)\
+        == list(range(len(volumes)))
+    for group in groups:
+        assert sum(volumes[idx] for idx in group) <= 300
+
+
+def test_packing_window():
+    volumes = [200, 100, 200, 100]
+    assert tp.pack_first_fit_decreasing(volumes, 0, 300, window=4)\
+        == [[0, 1], [2, 3]]
+    # The window keeps steps with their neighbours
+    volumes = [200, 200, 100, 100]
+    assert tp.pack_first_fit_decreasing(volumes, 0, 300, window=2)\
+        == [[0], [1], [2, 3]]
+    assert tp.pack_first_fit_decreasing(volumes, 0, 300, window=4)\
+        == [[0, 2], [1, 3]]
+
+
+def test_reserved_volume():
+    # Volumes are added up in the order they will be aspirated, where
+    # 0.1 + 0.2 + 0.3 is a little more than 0.6
+    assert tp.pack_first_fit_decreasing([0.1, 0.2, 0.3], 0, 0.6)\
+        == [[0], [1, 2]]
+    # Room for disposal volume and an air gap is kept in each aspirate
+    assert tp.pack_first_fit_decreasing([100, 100, 100], 30, 300)\
+        == [[0, 1], [2]]
@@ -1,4 +1,6 @@
 """ Test the Transfer class and its functions """
+import json
+
 import pytest
 import opentrons.protocol_api as papi
 from opentrons.types import Mount, TransferTipPolicy
@@ -686,3 +688,210 @@ def test_oversized_transfer(_instr_labware):
              'args': [200, lw1.wells_by_index()['C1'], 1.0], 'kwargs': {}},
             {'method': 'drop_tip', 'args': [], 'kwargs': {}}]
     assert xfer_plan_list == exp1
+
+
+def _run_transfer(loop, method, *args, live=False, **kwargs):
+    ctx = papi.ProtocolContext(loop)
+    lw1 = ctx.load_labware('biorad_96_wellplate_200ul_pcr', 1)
+    lw2 = ctx.load_labware('corning_96_wellplate_360ul_flat', 2)
+    tiprack = ctx.load_labware('opentrons_96_tiprack_300ul', 3)
+    instr = ctx.load_instrument('p300_single', Mount.RIGHT,
+                                tip_racks=[tiprack])
+    ctx.home()
+
+    def execute_live(plan):
+        for cmd in plan:
+            getattr(instr, cmd['method'])(*cmd['args'], **cmd['kwargs'])
+
+    if live:
+        instr._execute_transfer = execute_live
+    getattr(instr, method)(
+        args[0], lw1.wells()[args[1]], lw2.wells()[args[2]], **kwargs)
+    return ctx.commands()
+
+
+@pytest.mark.parametrize('method,args,kwargs', [
+    ('transfer', (100, slice(0, 8), slice(8, 16)), {}),
+    ('transfer', (250, slice(0, 3), slice(3, 6)),
+     {'new_tip': 'always', 'mix_before': (2, 50), 'mix_after': (3, 100),
+      'blow_out': True, 'touch_tip': True, 'air_gap': 20}),
+    ('transfer', ([20, 80, 140, 200, 260, 320], slice(0, 6), slice(0, 6)),
+     {'trash': False, 'mix_after': (1, 30)}),
+    ('distribute', (40, 0, slice(0, 12)),
+     {'mix_before': (2, 100), 'air_gap': 10, 'touch_tip': True}),
+    ('distribute', (30, 0, slice(0, 12)), {'disposal_volume': 0,
+                                           'blow_out': True}),
+    ('consolidate', (60, slice(0, 12), 0),
+     {'mix_after': (2, 100), 'air_gap': 5}),
+])
+def test_compiled_matches_live(loop, method, args, kwargs):
+    assert _run_transfer(loop, method, *args, **kwargs)\
+        == _run_transfer(loop, method, *args, live=True, **kwargs)
+
+
+def test_compiled_transfer_replay(_instr_labware):
+    ctx = _instr_labware['ctx']
+    instr = _instr_labware['instr']
+    lw1 = _instr_labware['lw1']
+    lw2 = _instr_labware['lw2']
+    ctx.home()
+    plan = tx.TransferPlan(
+        50, lw1.wells()[:4], [lw2.wells()[0].bottom(2)] + lw2.wells()[1:4],
+        instr, max_volume=instr.hw_pipette['working_volume'],
+        options=tx.TransferOptions(
+            transfer=tx.Transfer(mix_strategy=tx.MixStrategy.AFTER),
+            mix=tx.Mix(mix_after=tx.MixOpts(repetitions=2, volume=20))))
+    compiled = plan.compile()
+    assert [step.opcode for step in compiled][:4] == [
+        tx.Opcode.PICK_UP_TIP, tx.Opcode.ASPIRATE, tx.Opcode.DISPENSE,
+        tx.Opcode.MIX]
+    assert compiled.steps[3].flags == tx.MIX_AFTER
+    assert compiled.locations[compiled.steps[1].location] is lw1.wells()[0]
+
+    # Saved and loaded into another protocol with the same labware
+    other_ctx = papi.ProtocolContext(ctx._loop)
+    other_lw1 = other_ctx.load_labware('biorad_96_wellplate_200ul_pcr', 1)
+    other_lw2 = other_ctx.load_labware('corning_96_wellplate_360ul_flat', 2)
+    loaded = tx.CompiledTransfer.from_json(
+        json.loads(json.dumps(compiled.to_json())), other_ctx)
+    assert loaded.steps == compiled.steps
+    assert loaded.locations[1].labware is other_lw2.wells()[0]
+    assert loaded.locations[1].point == other_lw2.wells()[0].bottom(2).point
+    assert loaded.locations[0] is other_lw1.wells()[0]
+    with pytest.raises(ValueError):
+        tx.CompiledTransfer.from_json(compiled.to_json(),
+                                      papi.ProtocolContext(ctx._loop))
+
+    # Moved to another plate
+    lw3 = ctx.load_labware('corning_96_wellplate_360ul_flat', 4)
+    moved = compiled.with_labware({lw2: lw3})
+    assert moved.locations[0] is lw1.wells()[0]
+    assert moved.locations[1].labware is lw3.wells()[0]
+    assert moved.locations[1].point == lw3.wells()[0].bottom(2).point
+
+    moved.execute(instr)
+    assert instr.current_volume == 0
+    instr.pick_up_tip()
+    instr.aspirate(10, lw1.wells()[0])
+    with pytest.raises(RuntimeError):
+        compiled.execute(instr)
+
+
+def _moves(plan):
+    return [(cmd['method'], cmd['args'][0], cmd['args'][1])
+            for cmd in plan if cmd['method'] in ('aspirate', 'dispense')
+            and len(cmd['args']) > 1]
+
+
+def test_optimize_path(_instr_labware):
+    _instr_labware['ctx'].home()
+    lw1 = _instr_labware['lw1']
+    lw2 = _instr_labware['lw2']
+    instr = _instr_labware['instr']
+    max_volume = instr.hw_pipette['working_volume']
+    sources = [lw1.wells()[idx] for idx in (95, 0, 47, 8, 88, 16)]
+    dests = [lw2.wells()[idx] for idx in (0, 95, 40, 7, 80, 15)]
+
+    def _plan(volume, sources, dests, mode=None, **kwargs):
+        return tx.TransferPlan(
+            volume, sources, dests, instr, max_volume, mode,
+            tx.TransferOptions(
+                transfer=tx.Transfer(optimize_path=True, **kwargs)))
+
+    plan = _plan([10, 20, 30, 400, 50, 60], sources, dests,
+                 new_tip=TransferTipPolicy.ALWAYS)
+    assert plan.path_optimization.saved > 0
+    commands = list(plan)
+    # Each step keeps its own tip and its split volume
+    assert sorted(_moves(commands), key=repr) == sorted(_moves(
+        tx.TransferPlan([10, 20, 30, 400, 50, 60], sources, dests,
+                        instr, max_volume,
+                        options=tx.TransferOptions(transfer=tx.Transfer(
+                            new_tip=TransferTipPolicy.ALWAYS)))),
+        key=repr)
+    assert [cmd['method'] for cmd in commands] == [
+        'pick_up_tip', 'aspirate', 'dispense', 'drop_tip'] * 7
+    split = [idx for idx, move in enumerate(_moves(commands))
+             if move == ('aspirate', 200, lw1.wells()[8])]
+    assert split == [split[0], split[0] + 2]
+
+    # A serial dilution is left alone
+    row = lw1.rows()[0]
+    plan = _plan(20, row[:-1], row[1:])
+    assert plan.path_optimization.saved == 0
+    assert _moves(plan) == [
+        (method, 20, well) for src, dest in zip(row[:-1], row[1:])
+        for method, well in (('aspirate', src), ('dispense', dest))]
+
+    plan = _plan(20, lw1.wells()[0], dests, 'distribute')
+    assert plan.path_optimization.saved > 0
+    assert sorted((well for method, _, well in _moves(plan)
+                   if method == 'dispense'), key=repr)\
+        == sorted(dests, key=repr)
+
+    plan = _plan(20, sources, lw2.wells()[0], 'consolidate')
+    assert plan.path_optimization.saved > 0
+    assert sorted((well for method, _, well in _moves(plan)
+                   if method == 'aspirate'), key=repr)\
+        == sorted(sources, key=repr)
+    assert tx.TransferPlan(20, sources, dests, instr, max_volume)\
+        .path_optimization is None
+
+    plans = []
+    instr._execute_transfer = plans.append
+    instr.transfer(20, sources, dests, optimize_path=True)
+    instr.distribute(20, lw1.wells()[0], dests)
+    assert plans[0].path_optimization.saved > 0
+    assert plans[1].path_optimization is None
+
+
+def test_distribute_packing(_instr_labware):
+    _instr_labware['ctx'].home()
+    lw1 = _instr_labware['lw1']
+    lw2 = _instr_labware['lw2']
+    instr = _instr_labware['instr']
+    volumes = [150, 200, 140, 100, 60, 50] * 2
+
+    def _plan(strategy, **kwargs):
+        return tx.TransferPlan(
+            volumes, lw1.wells()[0], lw2.wells()[:12], instr,
+            instr.hw_pipette['working_volume'], 'distribute',
+            tx.TransferOptions(transfer=tx.Transfer(
+                packing_strategy=strategy, **kwargs)))
+
+    in_order = list(_plan(tx.PackingStrategy.IN_ORDER))
+    packed_plan = _plan(tx.PackingStrategy.FIRST_FIT_DECREASING)
+    packed = list(packed_plan)
+    assert _plan(tx.PackingStrategy.IN_ORDER).packing is None
+    assert packed_plan.packing == tx.Packing(in_order=7, packed=5)
+
+    def _aspirates(commands):
+        return [cmd['args'][0] for cmd in commands
+                if cmd['method'] == 'aspirate']
+
+    def _dispenses(commands):
+        return sorted((cmd['args'][0], repr(cmd['args'][1]))
+                      for cmd in commands if cmd['method'] == 'dispense')
+
+    assert len(_aspirates(in_order)) == 7
+    assert _aspirates(packed) == [300, 300, 280, 220, 300]
+    assert _dispenses(packed) == _dispenses(in_order)
+
+    # Disposal volume and air gaps still fit
+    packed_plan = _plan(tx.PackingStrategy.FIRST_FIT_DECREASING,
+                        disposal_volume=20, air_gap=10)
+    assert packed_plan.packing.packed < packed_plan.packing.in_order
+    assert max(_aspirates(packed_plan)) <= 270 + 20
+
+    plans = []
+    execute = instr._execute_transfer
+
+    def _capture(plan):
+        plans.append(plan)
+        execute(plan)
+
+    instr._execute_transfer = _capture
+    instr.distribute(volumes, lw1.wells()[0], lw2.wells()[:12],
+                     disposal_volume=0, packing='first_fit_decreasing')
+    assert plans[0].packing == tx.Packing(in_order=7, packed=5)
+    assert instr.current_volume == 0
@@ -1,13 +1,16 @@
 import ast
+import copy
 import json
 
 import jsonschema
 import pytest
 
+from opentrons.protocols import parse as parse_module
 from opentrons.protocols.parse import (extract_metadata,
                                        infer_version,
                                        _get_protocol_schema_version,
                                        validate_json,
+                                       validate_labware_definition,
                                        parse)
 from opentrons.protocols.types import (JsonProtocol, PythonProtocol)
 
@@ -218,3 +221,53 @@ def test_parse_json_details(get_json_protocol_fixture,
     assert parsed.filename == fname
     assert parsed.contents == json.loads(protocol)
     parsed.schema_version == int(protocol_details[0])
+
+
+def test_validators_are_reused(get_json_protocol_fixture, monkeypatch):
+    v3 = get_json_protocol_fixture('3', 'testAllAtomicSingleV3')
+    assert validate_json(v3) == 3
+
+    def no_schema_loads(*args, **kwargs):
+        raise AssertionError('loaded a schema')
+
+    monkeypatch.setattr(parse_module.pkgutil, 'get_data', no_schema_loads)
+    assert validate_json(v3) == 3
+    assert parse_module._get_protocol_validator(3)\
+        is parse_module._get_protocol_validator(3)
+    labware_def = v3['labwareDefinitions'][
+        next(iter(v3['labwareDefinitions']))]
+    validate_labware_definition(labware_def)
+
+
+def test_structure_checked_first(get_json_protocol_fixture, monkeypatch):
+    v3 = get_json_protocol_fixture('3', 'testAllAtomicSingleV3')
+    validator = parse_module._get_protocol_validator(3)
+
+    def no_validation(document):
+        raise AssertionError('validated a malformed protocol')
+
+    monkeypatch.setattr(validator, 'validate', no_validation)
+    del v3['commands']
+    with pytest.raises(jsonschema.ValidationError,
+                       match="'commands' is a required property"):
+        validate_json(v3)
+    v3['commands'] = {}
+    with pytest.raises(jsonschema.ValidationError,
+                       match="is not of type 'array'"):
+        validate_json(v3)
+    with pytest.raises(jsonschema.ValidationError):
+        validate_json([v3])
+
+
+def test_validate_labware_definition(get_json_protocol_fixture):
+    v3 = get_json_protocol_fixture('3', 'testAllAtomicSingleV3')
+    labware_def = copy.deepcopy(v3['labwareDefinitions'][
+        next(iter(v3['labwareDefinitions']))])
+    validate_labware_definition(labware_def)
+    labware_def['wells']['A1']['depth'] = 'deep'
+    with pytest.raises(jsonschema.ValidationError):
+        validate_labware_definition(labware_def)
+    del labware_def['wells']
+    with pytest.raises(jsonschema.ValidationError,
+                       match="'wells' is a required property"):
+        validate_labware_definition(labware_def)
@@ -0,0 +1,147 @@
+import threading
+from collections import OrderedDict
+
+import pytest
+
+from opentrons.protocols import parse as parse_module, parse_cache
+from opentrons.protocols.parse import parse
+from opentrons.protocols.types import JsonProtocol, PythonProtocol
+
+_PROTOCOL = '''
+metadata = {'protocolName': 'Cached', 'apiLevel': '2'}
+
+def run(ctx):
+    pass
+'''
+
+
+@pytest.fixture
+def cache_dir(tmpdir):
+    return tmpdir.mkdir('protocols')
+
+
+@pytest.fixture
+def cache(monkeypatch, cache_dir):
+    cache = parse_cache.ParseCache(directory=cache_dir)
+    monkeypatch.setattr(parse_module, 'parse_cache', cache)
+    return cache
+
+
+def _no_parsing(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError('parsed a cached protocol')
+
+    monkeypatch.setattr(parse_module, '_parse_python', fail)
+    monkeypatch.setattr(parse_module, 'validate_json', fail)
+
+
+def test_python_protocol_cached(cache, monkeypatch, cache_dir):
+    first = parse(_PROTOCOL, 'cached.py')
+    assert len(cache_dir.listdir()) == 1
+    _no_parsing(monkeypatch)
+    second = parse(_PROTOCOL.encode('utf-8'), 'cached.py')
+    assert isinstance(second, PythonProtocol)
+    assert second == first
+    assert second.metadata is not first.metadata
+
+    # A new process reads it from disk
+    monkeypatch.setattr(parse_module, 'parse_cache',
+                        parse_cache.ParseCache(directory=cache_dir))
+    from_disk = parse(_PROTOCOL, 'cached.py')
+    assert from_disk.metadata == {'protocolName': 'Cached', 'apiLevel': '2'}
+    assert from_disk.api_level == '2'
+    assert from_disk.contents.co_filename == 'cached.py'
+    namespace = {}
+    exec(from_disk.contents, namespace)
+    assert namespace['metadata'] == first.metadata
+
+    # Different text or names are parsed again
+    with pytest.raises(AssertionError):
+        parse(_PROTOCOL, 'renamed.py')
+    with pytest.raises(AssertionError):
+        parse(_PROTOCOL + '\n', 'cached.py')
+
+
+def test_json_protocol_cached(cache, monkeypatch, get_json_protocol_fixture):
+    text = get_json_protocol_fixture('3', 'testAllAtomicSingleV3',
+                                     decode=False)
+    first = parse(text, 'protocol.json')
+    _no_parsing(monkeypatch)
+    second = parse(text, 'protocol.json')
+    assert isinstance(second, JsonProtocol)
+    assert second == first
+    assert second.contents is not first.contents
+
+
+def test_errors_not_cached(cache):
+    for _ in range(2):
+        with pytest.raises(SyntaxError):
+            parse('def run(ctx)\n', 'broken.py')
+
+
+def test_memory_only_and_limits(monkeypatch, cache_dir):
+    cache = parse_cache.ParseCache(persist=False, directory=cache_dir,
+                                   memory_entries=2)
+    monkeypatch.setattr(parse_module, 'parse_cache', cache)
+    for idx in range(3):
+        parse(_PROTOCOL + f'# {idx}\n', 'cached.py')
+    assert cache_dir.listdir() == []
+    _no_parsing(monkeypatch)
+    parse(_PROTOCOL + '# 2\n', 'cached.py')
+    with pytest.raises(AssertionError):
+        parse(_PROTOCOL + '# 0\n', 'cached.py')
+
+
+def test_bad_files_are_misses(cache, cache_dir):
+    key = parse_cache.cache_key(_PROTOCOL, 'cached.py')
+    cache_dir.join(f'{key}.marshal').write('not marshal data')
+    assert cache.get(key, _PROTOCOL) is None
+    parse(_PROTOCOL, 'cached.py')
+    assert cache.get(key, _PROTOCOL).api_level == '2'
+    cache.clear()
+    assert cache.get(key, _PROTOCOL) is None
+
+
+def test_writers_do_not_share_temporary_files(cache, cache_dir):
+    key = parse_cache.cache_key(_PROTOCOL, 'cached.py')
+    # Another process is part way through saving the same protocol
+    other_writer = cache_dir.join(f'{key}.tmp')
+    other_writer.write('half written')
+    parse(_PROTOCOL, 'cached.py')
+    assert other_writer.read() == 'half written'
+    assert sorted(path.basename for path in cache_dir.listdir())\
+        == [f'{key}.marshal', f'{key}.tmp']
+    fresh = parse_cache.ParseCache(directory=cache_dir)
+    assert fresh.get(key, _PROTOCOL).api_level == '2'
+
+
+def test_key_includes_interpreter(monkeypatch):
+    key = parse_cache.cache_key(_PROTOCOL, 'cached.py')
+    monkeypatch.setattr(parse_cache.importlib.util, 'MAGIC_NUMBER',
+                        b'\x00\x00\r\n')
+    assert parse_cache.cache_key(_PROTOCOL, 'cached.py') != key
+
+
+def test_shared_between_threads():
+    cache = parse_cache.ParseCache(persist=False, memory_entries=1)
+    protocol = parse_module._parse_python(_PROTOCOL, 'cached.py')
+    key = parse_cache.cache_key(_PROTOCOL, 'cached.py')
+    other_key = parse_cache.cache_key(_PROTOCOL, 'other.py')
+    cache.put(key, protocol)
+
+    class Records(OrderedDict):
+        def get(self, *args):
+            record = super().get(*args)
+            # Another thread evicts the entry just after it was looked up;
+            # the cache has to make it wait until the lookup is done
+            evictor = threading.Thread(
+                target=cache.put, args=(other_key, protocol))
+            evictor.start()
+            evictor.join(0.1)
+            self.evictor = evictor
+            return record
+
+    cache._records = Records(cache._records)
+    assert cache.get(key, _PROTOCOL) == protocol
+    cache._records.evictor.join()
+    assert list(cache._records) == [other_key]
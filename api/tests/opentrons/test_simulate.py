@@ -0,0 +1,105 @@
+import io
+
+import pytest
+
+from opentrons import simulate
+
+
+@pytest.mark.parametrize('protocol_file', ['testosaur_v2.py'])
+def test_simulate_estimates_run_time(protocol, protocol_file, ensure_api2):
+    fobj = io.StringIO(protocol.text)
+    fobj.name = protocol.filename
+    runlog = simulate.simulate(fobj)
+    assert all(command['duration'] >= 0 for command in runlog)
+    pick_up = next(command for command in runlog
+                   if command['payload']['text'].startswith('Picking up'))
+    assert pick_up['duration'] > 0
+    assert simulate.estimated_run_time(runlog)\
+        == pytest.approx(sum(command['duration'] for command in runlog
+                             if command['level'] == 0))
+
+
+def test_delays_are_estimated(ensure_api2):
+    fobj = io.StringIO('def run(ctx):\n    ctx.delay(minutes=1, seconds=30)\n')
+    fobj.name = 'delay.py'
+    runlog = simulate.simulate(fobj)
+    assert simulate.estimated_run_time(runlog) == 90
+
+
+_MODULES_PROTOCOL = '''
+def run(ctx):
+    tempdeck = ctx.load_module('tempdeck', 4)
+    magdeck = ctx.load_module('magdeck', 1)
+    tc = ctx.load_module('thermocycler')
+    plate = magdeck.load_labware('biorad_96_wellplate_200ul_pcr')
+    tc_plate = tc.load_labware('biorad_96_wellplate_200ul_pcr')
+    cold = tempdeck.load_labware('corning_96_wellplate_360ul_flat')
+    tips = [ctx.load_labware('opentrons_96_tiprack_300ul', slot)
+            for slot in (2, 3)]
+    single = ctx.load_instrument('p300_single', 'right', tip_racks=tips)
+    multi = ctx.load_instrument('p50_multi', 'left', tip_racks=tips)
+    tempdeck.set_temperature(4)
+    tempdeck.wait_for_temp()
+    tc.open_lid()
+    single.transfer(20, cold.wells()[:8], tc_plate.wells()[:8],
+                    mix_after=(2, 10), new_tip='always')
+    multi.distribute(15, plate['A1'], tc_plate.columns()[1:4])
+    tc.close_lid()
+    tc.set_lid_temperature(105)
+    tc.execute_profile(steps=[{'temperature': 95, 'hold_time_seconds': 30},
+                              {'temperature': 57, 'hold_time_seconds': 30}],
+                       repetitions=2)
+    tc.deactivate()
+    magdeck.engage(height=10)
+    ctx.delay(seconds=5)
+    magdeck.disengage()
+    single.pick_up_tip()
+    single.aspirate(100, plate['A1'])
+    single.blow_out(ctx.fixed_trash['A1'])
+    single.drop_tip()
+    tempdeck.deactivate()
+'''
+
+
+@pytest.mark.parametrize('protocol_file', ['testosaur_v2.py'])
+def test_fast_simulation_matches(protocol, protocol_file, ensure_api2):
+    for text, name in ((protocol.text, protocol.filename),
+                       (_MODULES_PROTOCOL, 'modules.py')):
+        runlogs = []
+        for fast in (False, True):
+            fobj = io.StringIO(text)
+            fobj.name = name
+            runlogs.append(simulate.simulate(fobj, fast=fast))
+        full, fast = runlogs
+        assert [(c['level'], c['payload']['text'].format(**c['payload']))
+                for c in fast]\
+            == [(c['level'], c['payload']['text'].format(**c['payload']))
+                for c in full]
+        assert [c['duration'] for c in fast]\
+            == pytest.approx([c['duration'] for c in full])
+
+
+def test_simulate_batch(tmpdir, ensure_api2):
+    protocols = tmpdir.mkdir('protocols')
+    protocols.join('good.py').write(
+        'def run(ctx):\n'
+        '    print("not in the summary")\n'
+        '    ctx.delay(seconds=10)\n'
+        '    ctx.comment("hello")\n')
+    protocols.mkdir('more').join('bad.py').write(
+        'def run(ctx):\n'
+        '    ctx.load_labware("not_a_labware", 1)\n')
+    protocols.join('notes.txt').write('not a protocol')
+    paths = simulate.find_protocols(protocols)
+    assert [path.name for path in paths] == ['good.py', 'bad.py']
+    good, bad = simulate.simulate_batch(paths, jobs=2, fast=True)
+    assert good['protocol'] == str(paths[0])
+    assert good['status'] == 'ok'
+    assert good['error'] is None
+    assert good['commands'] == 2
+    assert good['estimated_run_time'] == 10
+    assert good['duration'] > 0
+    assert good['peak_rss'] > 0
+    assert bad['status'] == 'error'
+    assert 'not_a_labware' in bad['error']
+    assert bad['commands'] == 0